@@ -0,0 +1,109 @@
+"""
+Measure checkout throughput with several terminals on one data directory.
+
+Every worker process plays a cashier: it takes an order number, lowers the
+stock of one menu item and appends the order, like Transaction does. At the
+end the data is checked for lost updates.
+
+Usage: python -m benchmarks.concurrency [--workers 4] [--orders 50] [--writer direct|queue]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MENU = ["Nasi Goreng", "Mie Ayam", "Es Teh", "Kopi"]
+STOCK = 1_000_000
+
+
+def checkout(data_path: str, writer: str, orders: int) -> None:
+    os.environ["KASIR_DATA_DIR"] = data_path
+    os.environ["KASIR_WRITER"] = writer
+    import pandas as pd
+    from modulekasir.db_controller import Controller
+    from modulekasir.schema import TRANSACTION_SCHEMA
+    from modulekasir.sequence import Sequence
+
+    menu = Controller("data_menu")
+    transaksi = Controller("data_transaksi")
+    order_number = Sequence(transaksi, "No. Pembelian")
+    for i in range(orders):
+        nama = MENU[(os.getpid() + i) % len(MENU)]
+        number = order_number.next()
+        menu.adjust_many({nama: -1}, "Stok", "Nama Menu")
+        transaksi.add_data(
+            [number, nama, 10000, 1, 10000, pd.Timestamp.now().floor("s")],
+            list(TRANSACTION_SCHEMA))
+
+
+def serve(data_path: str) -> None:
+    os.environ["KASIR_DATA_DIR"] = data_path
+    from modulekasir.writer import WriteQueue
+
+    WriteQueue(data_path).serve()
+
+
+def run(workers: int, orders: int, writer: str) -> dict:
+    data_path = tempfile.mkdtemp(prefix="kasir-bench-")
+    os.environ["KASIR_DATA_DIR"] = data_path
+    from modulekasir.db_controller import Controller
+    from modulekasir.schema import MENU_SCHEMA
+
+    Controller("data_menu", writer="direct").save_data(
+        [[nama, "Makanan", 10000, STOCK] for nama in MENU], list(MENU_SCHEMA))
+
+    server = None
+    if writer == "queue":
+        server = multiprocessing.Process(target=serve, args=(data_path,))
+        server.start()
+
+    processes = [
+        multiprocessing.Process(target=checkout, args=(data_path, writer, orders))
+        for _ in range(workers)]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    if server is not None:
+        server.terminate()
+        server.join()
+
+    Controller.clear_cache()
+    menu = Controller("data_menu", writer="direct").read_data()
+    transaksi = Controller("data_transaksi", writer="direct").read_data()
+    total = workers * orders
+    return {
+        "backend": os.environ.get("KASIR_STORAGE", "csv"),
+        "writer": writer,
+        "workers": workers,
+        "orders": total,
+        "seconds": round(elapsed, 3),
+        "orders_per_second": round(total / elapsed, 1),
+        "rows_written": len(transaksi),
+        "unique_order_numbers": int(transaksi["No. Pembelian"].nunique()),
+        "stock_sold": int(STOCK * len(MENU) - menu["Stok"].astype("int64").sum()),
+        "lost_updates": bool(
+            len(transaksi) != total
+            or transaksi["No. Pembelian"].nunique() != total
+            or STOCK * len(MENU) - menu["Stok"].astype("int64").sum() != total),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--writer", choices=["direct", "queue"], default="direct")
+    args = parser.parse_args()
+    print(json.dumps(run(args.workers, args.orders, args.writer)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Generate realistic menu and transaction data for benchmarks.
+
+Usage: python -m benchmarks.generate --rows 100000 [--menu 50] [--days 90] [--seed 1]
+Writes into KASIR_DATA_DIR (or data/), replacing data_menu and data_transaksi.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAKANAN = ["Nasi Goreng", "Mie Ayam", "Soto", "Sate", "Bakso", "Gado-gado", "Rendang", "Pecel"]
+MINUMAN = ["Es Teh", "Kopi", "Es Jeruk", "Jus Alpukat", "Teh Tarik", "Air Mineral"]
+
+
+def generate_menu(count: int = 50, seed: int = 1) -> DataFrame:
+    """
+    Generate a menu with food and drinks, prices and stock.
+
+    Args:
+        - count (int): The number of menu items.
+        - seed (int): The random seed.
+
+    Returns:
+        DataFrame: The data_menu columns.
+    """
+    rng = np.random.default_rng(seed)
+    names = MAKANAN + MINUMAN
+    rows = []
+    for i in range(count):
+        base = names[i % len(names)]
+        nama = base if i < len(names) else f"{base} {i // len(names) + 1}"
+        jenis = "Makanan" if base in MAKANAN else "Minuman"
+        harga = int(rng.integers(3, 50)) * 1000 if jenis == "Makanan" else int(rng.integers(2, 20)) * 1000
+        rows.append([nama, jenis, harga, 1_000_000_000])
+    return DataFrame(rows, columns=["Nama Menu", "Jenis Menu", "Harga", "Stok"])
+
+
+def generate_transactions(
+        rows: int,
+        menu: DataFrame,
+        days: int = 90,
+        seed: int = 1) -> DataFrame:
+    """
+    Generate order lines over a number of days ending today.
+
+    Orders have 1 to 5 lines, popular items sell more often (Zipf-like
+    weights) and most orders fall around lunch and dinner.
+
+    Args:
+        - rows (int): The number of order lines.
+        - menu (DataFrame): The menu to order from.
+        - days (int): The number of days the orders are spread over.
+        - seed (int): The random seed.
+
+    Returns:
+        DataFrame: The data_transaksi columns.
+    """
+    rng = np.random.default_rng(seed)
+    lines_per_order = rng.integers(1, 6, size=rows)
+    order_of_line = np.repeat(np.arange(rows), lines_per_order)[:rows]
+
+    weights = 1.0 / np.arange(1, len(menu) + 1)
+    item = rng.choice(len(menu), size=rows, p=weights / weights.sum())
+    jumlah = rng.integers(1, 4, size=rows)
+    harga = menu["Harga"].to_numpy()[item]
+
+    orders = order_of_line[-1] + 1
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=days - 1)
+    day = np.sort(rng.integers(0, days, size=orders))
+    hour = np.where(rng.random(orders) < 0.5,
+                    rng.normal(12.5, 1.0, orders),
+                    rng.normal(19.0, 1.5, orders)).clip(8, 22)
+    seconds = (day * 86400 + hour * 3600).astype("int64")
+    tanggal = start + pd.to_timedelta(seconds[order_of_line], unit="s")
+
+    return DataFrame({
+        "No. Pembelian": order_of_line + 1,
+        "Nama Menu": menu["Nama Menu"].to_numpy()[item],
+        "Harga": harga,
+        "Jumlah": jumlah,
+        "Total": harga * jumlah,
+        "Tanggal": tanggal,
+    })
+
+
+def write_dataset(rows: int, menu_count: int = 50, days: int = 90, seed: int = 1) -> dict:
+    """
+    Replace data_menu and data_transaksi with generated data.
+
+    The rollups and the order number sequence are rebuilt to match.
+
+    Args:
+        - rows (int): The number of order lines.
+        - menu_count (int): The number of menu items.
+        - days (int): The number of days the orders are spread over.
+        - seed (int): The random seed.
+
+    Returns:
+        dict: The sizes of the generated tables.
+    """
+    from modulekasir.db_controller import Controller
+    from modulekasir.rollup import Rollup
+    from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+    from modulekasir.sequence import Sequence
+
+    menu = generate_menu(menu_count, seed)
+    transaksi = generate_transactions(rows, menu, days, seed)
+    Controller("data_menu").save_data(menu, list(MENU_SCHEMA))
+    controller = Controller("data_transaksi")
+    controller.save_data(transaksi, list(TRANSACTION_SCHEMA))
+    Rollup().rebuild()
+    Sequence(controller, "No. Pembelian").recover()
+    return {
+        "menu": len(menu),
+        "rows": len(transaksi),
+        "orders": int(transaksi["No. Pembelian"].iloc[-1]) if rows else 0,
+        "days": days,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--menu", type=int, default=50)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(write_dataset(args.rows, args.menu, args.days, args.seed))
+
+
+if __name__ == "__main__":
+    main()
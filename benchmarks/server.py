@@ -0,0 +1,116 @@
+"""
+Measure the latency of the HTTP service with many concurrent clients.
+
+A server is started on a temporary data directory. Every client keeps one
+connection open and sends a mix of menu reads and orders.
+
+Usage: python -m benchmarks.server [--clients 200] [--requests 20] [--order-ratio 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MENU = ["Nasi Goreng", "Mie Ayam", "Es Teh", "Kopi"]
+
+
+async def request(reader, writer, method: str, path: str, body: dict | None = None):
+    content = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(content)}\r\n\r\n".encode() + content)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port: int, requests: int, order_ratio: float, latencies: dict) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(requests):
+        if random.random() < order_ratio:
+            kind = "order"
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/orders", {
+                "items": [{"menu": random.choice(MENU), "jumlah": 1}]})
+        else:
+            kind = "menu"
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, "GET", "/menu")
+        latencies[kind].append(time.perf_counter() - started)
+        if status >= 400:
+            latencies["errors"].append(status)
+    writer.close()
+
+
+def percentiles(values: list) -> dict:
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda p: round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 2)
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "count": len(values)}
+
+
+async def run(clients: int, requests: int, order_ratio: float, port: int) -> dict:
+    latencies = {"menu": [], "order": [], "errors": []}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, requests, order_ratio, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    total = clients * requests
+    return {
+        "clients": clients,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "menu": percentiles(latencies["menu"]),
+        "order": percentiles(latencies["order"]),
+        "errors": len(latencies["errors"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--order-ratio", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    data_path = tempfile.mkdtemp(prefix="kasir-bench-")
+    os.environ["KASIR_DATA_DIR"] = data_path
+    from modulekasir.db_controller import Controller
+    from modulekasir.schema import MENU_SCHEMA
+
+    Controller("data_menu").save_data(
+        [[nama, "Makanan", 10000, 1_000_000] for nama in MENU], list(MENU_SCHEMA))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "modulekasir.server", "--port", str(args.port)],
+        cwd=ROOT, stdout=subprocess.PIPE)
+    try:
+        server.stdout.readline()
+        result = asyncio.run(run(args.clients, args.requests, args.order_ratio, args.port))
+    finally:
+        server.terminate()
+        server.wait()
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
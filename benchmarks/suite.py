@@ -0,0 +1,189 @@
+"""
+Time the core paths of Controller, Transaction and History on generated data.
+
+For every dataset size the data directory is filled by benchmarks.generate,
+then each operation runs several times. The report has latency percentiles,
+throughput and the memory high-water mark of every operation as JSON.
+
+Usage: python -m benchmarks.suite [--rows 1000,100000] [--repeat 5] [--output result.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(function, repeat: int, setup=None) -> dict:
+    """
+    Time a function and record its memory high-water mark.
+
+    The timed runs don't trace memory, which would slow them down; one
+    extra traced run measures the peak of Python allocations.
+
+    Args:
+        - function: The operation to time.
+        - repeat (int): How many timed runs.
+        - setup: Called before every run, untimed.
+
+    Returns:
+        dict: Latency percentiles in ms, runs per second and peak memory in MB.
+    """
+    latencies = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    pick = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+    return {
+        "runs": repeat,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "per_second": round(repeat / sum(latencies), 2),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def scripted(function, answers: str):
+    """
+    Run an interactive function with prepared answers and no screen output.
+    """
+    def run():
+        with mock.patch("sys.stdin", io.StringIO(answers)), \
+                mock.patch("os.system"), \
+                contextlib.redirect_stdout(io.StringIO()):
+            function()
+    return run
+
+
+def run_size(rows: int, repeat: int, menu_count: int) -> dict:
+    from benchmarks.generate import write_dataset
+    from modulekasir.db_controller import Controller
+    from modulekasir.history import History
+    from modulekasir.rollup import Rollup
+    from modulekasir.schema import TRANSACTION_SCHEMA
+    from modulekasir.transaction import Transaction
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        dataset = write_dataset(rows, menu_count)
+    generate_seconds = time.perf_counter() - started
+
+    transaksi = Controller("data_transaksi")
+    menu = Controller("data_menu")
+    columns = list(TRANSACTION_SCHEMA)
+    nama = menu.read_data()["Nama Menu"].iloc[0]
+    row = [0, nama, 1000, 1, 1000, time.strftime("%d-%m-%Y %H:%M:%S")]
+    history = History()
+
+    results = {
+        "read_data_cold": measure(
+            lambda: transaksi.read_data(), repeat, setup=Controller.clear_cache),
+        "read_data_warm": measure(lambda: transaksi.read_data(), repeat),
+        "read_data_month": measure(
+            lambda: transaksi.read_data(
+                columns=["Nama Menu", "Jumlah", "Total"],
+                start=history.period_range("bulan")[0],
+                end=history.period_range("bulan")[1]),
+            repeat),
+        "add_data": measure(lambda: transaksi.add_data(row, columns), repeat),
+        "update_data": measure(
+            lambda: transaksi.update_data(0, row), repeat),
+        "delete_data": measure(
+            lambda: transaksi.delete_data(len(transaksi.read_data()) - 1), repeat),
+        "menu_update_data": measure(
+            lambda: menu.update_data(0, 1_000_000_000, "Stok"), repeat),
+        "transaction_place_order": measure(
+            lambda: Transaction().place_order([(nama, 1)]), repeat),
+        "transaction_scripted": measure(
+            scripted(Transaction().transaction, f"{nama}, 1\nn\n1000000\n\n"), repeat),
+        "history_report_month": measure(lambda: history.report("bulan"), repeat),
+        "history_report_all": measure(lambda: history.report("semua"), repeat),
+        "history_show": measure(
+            scripted(lambda: history.show_history("semua", page_size=None), "\n"), repeat),
+        "rollup_rebuild": measure(Rollup().rebuild, max(1, repeat // 2)),
+    }
+    return {
+        "dataset": dict(dataset, generate_seconds=round(generate_seconds, 3)),
+        "results": results,
+    }
+
+
+def run(sizes: list, repeat: int, menu_count: int) -> dict:
+    """
+    Run the suite for every dataset size, each in a fresh data directory.
+    """
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": os.environ.get("KASIR_STORAGE", "csv"),
+        "partition": os.environ.get("KASIR_PARTITION", "month"),
+        "repeat": repeat,
+        "sizes": {},
+    }
+    from modulekasir.db_controller import Controller
+
+    for rows in sizes:
+        data_path = tempfile.mkdtemp(prefix="kasir-bench-")
+        os.environ["KASIR_DATA_DIR"] = data_path
+        Controller.clear_cache()
+        try:
+            report["sizes"][str(rows)] = run_size(rows, repeat, menu_count)
+        finally:
+            Controller.clear_cache()
+            shutil.rmtree(data_path, ignore_errors=True)
+    if resource is not None:
+        # ru_maxrss is in kB on Linux and bytes on macOS.
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report["max_rss_mb"] = round(
+            maxrss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="1000,100000",
+                        help="Comma separated numbers of order lines")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--menu", type=int, default=50)
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.rows.split(",")]
+    report = run(sizes, args.repeat, args.menu)
+    content = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(content)
+    print(content)
+
+
+if __name__ == "__main__":
+    main()
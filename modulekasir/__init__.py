@@ -1,3 +1,18 @@
-from .history import History
-from .inputdata import InputData
-from .transaction import Transaction
+import importlib
+
+# The classes load pandas, so they are only imported when first used. This
+# keeps "import modulekasir" and the command line start fast.
+_EXPORTS = {
+    "History": ".history",
+    "InputData": ".inputdata",
+    "Rollup": ".rollup",
+    "Transaction": ".transaction",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
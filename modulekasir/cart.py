@@ -0,0 +1,137 @@
+import pandas as pd
+from .schema import TRANSACTION_SCHEMA
+
+
+class CartLine:
+    """
+    A class used to represent one menu item of a cart.
+
+    Attributes:
+        - harga (int): The price of the first line of the item.
+        - jumlah (int): The quantity of the item.
+        - total (int): The price of the quantity.
+    """
+
+    __slots__ = ("harga", "jumlah", "total")
+
+    def __init__(self, harga: int, jumlah: int, total: int) -> None:
+        self.harga = harga
+        self.jumlah = jumlah
+        self.total = total
+
+
+class Cart:
+    """
+    A class used to build an order one line at a time.
+
+    Lines of a menu item already in the cart are merged into it as they are
+    added, and the totals are kept up to date, so adding a line costs the
+    same however large the order is. The order becomes a DataFrame once, at
+    checkout.
+
+    Attributes:
+        - nomor (int | None): The order number, set when the order is accepted.
+        - tanggal (str | None): The order time, set when the order is accepted.
+        - jumlah (int): The quantity of all lines.
+        - total (int): The price of all lines.
+        - _lines (dict): Maps each menu name to its CartLine, in the order added.
+
+    Methods:
+        - __init__(nomor: int | None, tanggal: str | None): Initializes the Cart class.
+        - add(menu: str, harga: int, jumlah: int): Add a line, merging it with the same menu item.
+        - taken(menu: str): Get the quantity of a menu item in the cart.
+        - stock_taken(): Get the quantity of every menu item in the cart.
+        - rows(): Get the order lines as data_transaksi rows.
+        - to_frame(carts: list): Get the lines of several carts as one DataFrame.
+    """
+
+    __slots__ = ("nomor", "tanggal", "jumlah", "total", "_lines")
+
+    def __init__(self, nomor: int | None = None, tanggal: str | None = None) -> None:
+        self.nomor = nomor
+        self.tanggal = tanggal
+        self.jumlah = 0
+        self.total = 0
+        self._lines = {}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def add(self, menu: str, harga: int, jumlah: int) -> None:
+        """
+        Add a line, merging it with the line of the same menu item.
+
+        Args:
+            - menu (str): The name of the menu item.
+            - harga (int): The price of one item.
+            - jumlah (int): The quantity.
+        """
+        # Python ints can't overflow; the money columns they are saved to are int64.
+        harga, jumlah = int(harga), int(jumlah)
+        total = harga * jumlah
+        line = self._lines.get(menu)
+        if line is None:
+            self._lines[menu] = CartLine(harga, jumlah, total)
+        else:
+            line.jumlah += jumlah
+            line.total += total
+        self.jumlah += jumlah
+        self.total += total
+
+    def taken(self, menu: str) -> int:
+        """
+        Get the quantity of a menu item in the cart.
+
+        Args:
+            - menu (str): The name of the menu item.
+
+        Returns:
+            int: The quantity, 0 if the item is not in the cart.
+        """
+        line = self._lines.get(menu)
+        return 0 if line is None else line.jumlah
+
+    def stock_taken(self) -> dict:
+        """
+        Get the quantity of every menu item in the cart.
+
+        Returns:
+            dict: Maps each menu name to its quantity.
+        """
+        return {menu: line.jumlah for menu, line in self._lines.items()}
+
+    def rows(self) -> list:
+        """
+        Get the order lines as data_transaksi rows.
+
+        Returns:
+            list: One [No. Pembelian, Nama Menu, Harga, Jumlah, Total, Tanggal]
+                row per menu item, in the order the items were added.
+        """
+        return [
+            [self.nomor, menu, line.harga, line.jumlah, line.total, self.tanggal]
+            for menu, line in self._lines.items()]
+
+    @staticmethod
+    def to_frame(carts: list) -> pd.DataFrame:
+        """
+        Get the lines of several carts as one DataFrame.
+
+        Args:
+            - carts (list): The carts, each with its order number and time set.
+
+        Returns:
+            DataFrame: The order lines with the data_transaksi columns.
+        """
+        nomor, menu, harga, jumlah, total, tanggal = [], [], [], [], [], []
+        for cart in carts:
+            count = len(cart._lines)
+            nomor += [cart.nomor] * count
+            tanggal += [cart.tanggal] * count
+            menu += cart._lines.keys()
+            for line in cart._lines.values():
+                harga.append(line.harga)
+                jumlah.append(line.jumlah)
+                total.append(line.total)
+        return pd.DataFrame(
+            dict(zip(TRANSACTION_SCHEMA, [nomor, menu, harga, jumlah, total, tanggal])))
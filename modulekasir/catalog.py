@@ -0,0 +1,320 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import Iterator
+from .db_controller import Controller
+from .locking import FileLock
+from .schema import MENU_SCHEMA
+
+MAGIC = b"KASIRMC1"
+
+# magic, version, source digest, item count, index offset, strings offset.
+HEADER = struct.Struct("<8sQ8sIII")
+
+# row label, name offset, name length, type offset, type length, price, stock.
+RECORD = struct.Struct("<qIIIIqq")
+
+# Where the digest sits in the header and the stock in a record; both are
+# written in place when only the stock changes.
+DIGEST_OFFSET = struct.calcsize("<8sQ")
+STOCK_OFFSET = struct.calcsize("<qIIIIq")
+
+
+class MenuCatalog:
+    """
+    A class used to read the menu from a memory-mapped file shared by every
+    process on the machine.
+
+    The catalog (data/data_menu.catalog) holds the menu in a fixed binary
+    layout: a header, one fixed-size record per item in menu order, the
+    record numbers sorted by name, and the UTF-8 names and types. Processes
+    map it read-only, so the operating system keeps one copy in memory for
+    all of them and a lookup reads a few bytes of it, without pandas.
+
+    The header carries a version stamp (the time of the rebuild) and a
+    digest of the (mtime, size) signature of the menu it was built from.
+    When the menu changes, the first process to notice rebuilds the catalog
+    under a temporary name and renames it over the old one; the others map
+    the new file the next time they read.
+
+    Attributes:
+        - _maps (dict): The mapped catalog of every menu, keyed by path.
+        - _controller (Controller): An instance of the Controller class for data_menu.
+        - path (str): The path to the catalog file.
+        - _lock (FileLock): Lets one process at a time rebuild the catalog.
+
+    Methods:
+        - __init__(): Initializes the MenuCatalog class.
+        - version(): Get the version stamp of the catalog, raised by every rebuild.
+        - lookup(name: str): Find a menu item by name.
+        - update_stock(change, menus): Change the stock of menu items and patch the catalog in place.
+        - names(): Get the names of the menu items.
+        - rows(): Get the menu items in menu order.
+    """
+
+    _maps: dict = {}
+
+    def __init__(self) -> None:
+        self._controller = Controller("data_menu")
+        self.path = os.path.join(self._controller.get_data_path(), "data_menu.catalog")
+        self._lock = FileLock(self._controller.get_data_path(), "data_menu.catalog")
+
+    def __len__(self) -> int:
+        current = self._current()
+        return 0 if current is None else current["count"]
+
+    def _digest(self, signature: tuple) -> bytes:
+        return hashlib.blake2b(repr(signature).encode(), digest_size=8).digest()
+
+    def _encode(self, data, version: int, digest: bytes) -> bytes:
+        """
+        Lay the menu out as a catalog: header, records, sorted index, strings.
+        """
+        names = [str(name).encode("utf-8") for name in data["Nama Menu"].tolist()]
+        types = [str(jenis).encode("utf-8") for jenis in data["Jenis Menu"].tolist()]
+        count = len(names)
+        index_offset = HEADER.size + count * RECORD.size
+        strings_offset = index_offset + count * 4
+
+        records = bytearray()
+        strings = bytearray()
+        for label, name, jenis, harga, stok in zip(
+                data.index.tolist(), names, types,
+                data["Harga"].tolist(), data["Stok"].tolist()):
+            records += RECORD.pack(
+                label, len(strings), len(name), len(strings) + len(name), len(jenis),
+                int(harga), int(stok))
+            strings += name + jenis
+        # Equal names keep the first row, like Controller.get_index.
+        order = sorted(range(count), key=lambda position: (names[position], position))
+        header = HEADER.pack(MAGIC, version, digest, count, index_offset, strings_offset)
+        return header + records + struct.pack(f"<{count}I", *order) + strings
+
+    def _header(self, buffer) -> dict | None:
+        """
+        Read the header of a catalog, or get None if it is not a whole catalog.
+        """
+        if len(buffer) < HEADER.size:
+            return None
+        magic, version, _, count, index_offset, strings_offset = HEADER.unpack_from(buffer)
+        if magic != MAGIC or strings_offset > len(buffer):
+            return None
+        return {
+            "buffer": buffer,
+            "version": version,
+            "count": count,
+            "index": index_offset,
+            "strings": strings_offset,
+        }
+
+    def _digest_of(self, current: dict) -> bytes:
+        """
+        Read the digest of a mapped catalog; it changes in place with the stock.
+        """
+        return current["buffer"][DIGEST_OFFSET:DIGEST_OFFSET + 8]
+
+    def _attach(self) -> dict | None:
+        """
+        Map the catalog file as it is on disk, reusing the mapping if the
+        file was not replaced.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        current = MenuCatalog._maps.get(self.path)
+        if current is not None and current.get("inode") == (stat.st_ino, stat.st_size):
+            return current
+        with open(self.path, "rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return None
+        current = self._header(buffer)
+        if current is not None:
+            current["inode"] = (stat.st_ino, stat.st_size)
+            MenuCatalog._maps[self.path] = current
+        return current
+
+    def _rebuild(self, digest: bytes) -> dict | None:
+        with self._lock.exclusive():
+            current = self._attach()
+            if current is not None and self._digest_of(current) == digest:
+                return current
+            # The menu may have changed since the digest was taken; take it
+            # again with the data, while no one can change the menu.
+            with self._controller._lock.shared():
+                digest = self._digest(self._controller._file_signature())
+                data = self._controller.read_data(list(MENU_SCHEMA))
+            version = time.time_ns()
+            if current is not None:
+                version = max(version, current["version"] + 1)
+            content = self._encode(data, version, digest)
+            temp = self.path + ".tmp"
+            with open(temp, "wb") as f:
+                f.write(content)
+            try:
+                os.replace(temp, self.path)
+            except PermissionError:
+                # Windows doesn't replace a file other processes have
+                # mapped; read this version from memory until it can.
+                os.remove(temp)
+                current = self._header(content)
+                MenuCatalog._maps[self.path] = current
+                return current
+            return self._attach()
+
+    def _current(self) -> dict | None:
+        """
+        Get the mapped catalog of the menu as it is now, or None if there is
+        no menu.
+        """
+        if not self._controller.is_file_exists():
+            return None
+        digest = self._digest(self._controller._file_signature())
+        current = MenuCatalog._maps.get(self.path)
+        if current is not None and self._digest_of(current) == digest:
+            return current
+        current = self._attach()
+        if current is not None and self._digest_of(current) == digest:
+            return current
+        return self._rebuild(digest)
+
+    def _record(self, current: dict, position: int) -> tuple:
+        """
+        Read a record as (row label, {column: value}).
+        """
+        buffer = current["buffer"]
+        strings = current["strings"]
+        label, name, name_length, jenis, jenis_length, harga, stok = RECORD.unpack_from(
+            buffer, HEADER.size + position * RECORD.size)
+        return label, {
+            "Nama Menu": buffer[strings + name:strings + name + name_length].decode("utf-8"),
+            "Jenis Menu": buffer[strings + jenis:strings + jenis + jenis_length].decode("utf-8"),
+            "Harga": harga,
+            "Stok": stok,
+        }
+
+    def _name(self, current: dict, position: int) -> bytes:
+        buffer = current["buffer"]
+        name, length = struct.unpack_from("<II", buffer, HEADER.size + position * RECORD.size + 8)
+        start = current["strings"] + name
+        return buffer[start:start + length]
+
+    def version(self) -> int:
+        """
+        Get the version stamp of the catalog, raised by every rebuild.
+
+        Returns:
+            int: The version, or 0 if there is no menu.
+        """
+        current = self._current()
+        return 0 if current is None else current["version"]
+
+    def lookup(self, name: str) -> tuple | None:
+        """
+        Find a menu item by name with a binary search of the catalog.
+
+        Args:
+            - name (str): The name of the menu item.
+
+        Returns:
+            tuple | None: (row index, row dict) like Controller.lookup, or
+                None if there is no such item.
+        """
+        current = self._current()
+        if current is None:
+            return None
+        position = self._position(current, name)
+        return None if position is None else self._record(current, position)
+
+    def _position(self, current: dict, name: str) -> int | None:
+        """
+        Get the record number of a name with a binary search of the sorted index.
+        """
+        key = str(name).encode("utf-8")
+        index = current["index"]
+        low, high = 0, current["count"]
+        while low < high:
+            middle = (low + high) // 2
+            position, = struct.unpack_from("<I", current["buffer"], index + middle * 4)
+            if self._name(current, position) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == current["count"]:
+            return None
+        position, = struct.unpack_from("<I", current["buffer"], index + low * 4)
+        return position if self._name(current, position) == key else None
+
+    def update_stock(self, change, menus) -> None:
+        """
+        Change the stock of some menu items and write the new values into
+        the catalog in place, so no process has to rebuild it.
+
+        Stock is a fixed-size field, so the new values and the digest of the
+        changed menu are written over the old ones; processes that mapped
+        the catalog see them on their next read. If the catalog was already
+        out of date, it is left to be rebuilt.
+
+        With KASIR_WRITER=queue the change is made by the writer process,
+        which takes the menu lock itself, so it can't run while this process
+        holds the lock. The catalog is then left to the digest check, which
+        rebuilds it on the next read.
+
+        Args:
+            - change: Changes only the Stok column of data_menu, e.g. a
+              call to Controller.adjust_many.
+            - menus: The names of the menu items it changes.
+        """
+        if self._controller._writer == "queue":
+            change()
+            return
+        with self._controller._lock.exclusive():
+            current = None
+            if self._controller.is_file_exists():
+                digest = self._digest(self._controller._file_signature())
+                current = self._attach()
+                if current is not None and self._digest_of(current) != digest:
+                    current = None
+            change()
+            if current is None:
+                return
+            rows = self._controller.get_index("Nama Menu")
+            with open(self.path, "r+b") as f:
+                for menu in menus:
+                    position = self._position(current, menu)
+                    found = rows.get(menu)
+                    if position is None or found is None:
+                        continue
+                    f.seek(HEADER.size + position * RECORD.size + STOCK_OFFSET)
+                    f.write(struct.pack("<q", int(found[1]["Stok"])))
+                f.seek(DIGEST_OFFSET)
+                f.write(self._digest(self._controller._file_signature()))
+
+    def names(self) -> list:
+        """
+        Get the names of the menu items, in menu order.
+        """
+        current = self._current()
+        if current is None:
+            return []
+        return [
+            self._name(current, position).decode("utf-8")
+            for position in range(current["count"])]
+
+    def rows(self) -> Iterator[list]:
+        """
+        Get the menu items in menu order.
+
+        Yields:
+            list: [row index, Nama Menu, Jenis Menu, Harga, Stok].
+        """
+        current = self._current()
+        if current is None:
+            return
+        for position in range(current["count"]):
+            label, record = self._record(current, position)
+            yield [label] + list(record.values())
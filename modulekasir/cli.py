@@ -0,0 +1,267 @@
+"""
+Command line of the cashier.
+
+Without a command, the interactive menu runs in a loop. Commands:
+    menu list [--cari TEKS] [--urut KOLOM [--turun]] [--halaman N]
+                                 Show the menu.
+    menu edit                    Add, change or delete menu items.
+    order                        Make a transaction.
+    report [--periode PERIODE] [--urut KOLOM [--turun]] [--halaman N]
+                                 Show the transaction history.
+    rebuild                      Recompute the report totals.
+    stok [--semua] [--halaman N] Show the menu items to reorder.
+    ingest FILE [--dry-run]      Save a CSV or JSONL file of orders.
+    export KIND FILE [...]       Export orders for accounting (see modulekasir.export).
+    serve [--port PORT]          Run the HTTP/JSON service.
+
+Only the standard library is imported at startup; pandas and the modules
+that need it are imported by the command that uses them.
+"""
+import os
+import sys
+from .render import PAGE_SIZE
+
+
+def data_path() -> str:
+    """
+    Get the data directory, the same one the Controller class uses.
+    """
+    return os.environ.get("KASIR_DATA_DIR") or os.path.join(
+        os.path.split(os.path.dirname(os.path.abspath(__file__)))[0], "data")
+
+
+def has_journal() -> bool:
+    """
+    Check if orders are waiting in the journal to be applied to the tables.
+    """
+    path = os.path.join(data_path(), "journal.jsonl")
+    return os.path.isfile(path) and os.path.getsize(path) > 0
+
+
+def list_menu(
+        cari: str | None = None,
+        urut: str | None = None,
+        turun: bool = False,
+        halaman: int | None = None) -> None:
+    """
+    Show the menu.
+
+    A CSV menu without a search, a sort, pending changes in its change
+    log or orders in the journal is read with the csv module and printed as it is read, so the list
+    appears without waiting for pandas to load or for the whole file to be
+    parsed.
+
+    Args:
+        - cari (str | None): Only menus whose name contains this text.
+        - urut (str | None): Sort by this column.
+        - turun (bool): Sort from the largest value.
+        - halaman (int | None): Rows per page, or None to print every row.
+    """
+    path = os.path.join(data_path(), "data_menu.csv")
+    if (cari or urut or os.environ.get("KASIR_STORAGE", "csv") != "csv"
+            or not os.path.isfile(path)
+            or os.path.isfile(os.path.join(data_path(), "data_menu_log.csv"))
+            or has_journal()):
+        from .inputdata import InputData
+
+        InputData().show_data(
+            {"Nama Menu": cari} if cari else None, urut, turun, halaman)
+        return
+
+    import csv
+    from .render import print_table
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            print("Data masih kosong.")
+            return
+        rows = ([number] + row for number, row in enumerate(reader) if row)
+        print_table(["No."] + header, rows, page_size=halaman)
+
+
+def edit_menu() -> None:
+    from . import inputdata
+
+    inputdata.menu()
+
+
+def order() -> None:
+    from .transaction import Transaction
+
+    Transaction().transaction()
+
+
+def report(
+        periode: str | None = None,
+        urut: str | None = None,
+        turun: bool = False,
+        halaman: int | None = PAGE_SIZE) -> None:
+    from .history import History
+
+    History().show_history(periode, halaman, urut, turun)
+
+
+def rebuild() -> None:
+    from .history import History
+
+    History().rebuild_history()
+
+
+def stock(semua: bool = False, halaman: int | None = PAGE_SIZE) -> None:
+    from .inventory import Inventory
+    from .journal import checkpoint as apply_journal
+
+    apply_journal()
+    Inventory().show_reorder(semua, halaman)
+
+
+def ingest(path: str, dry_run: bool = False) -> None:
+    from .ingest import Ingest
+
+    print(Ingest().ingest_file(path, dry_run))
+
+
+def export(
+        kind: str,
+        path: str,
+        periode: str,
+        dari: str | None,
+        sampai: str | None,
+        chunksize: int | None) -> None:
+    from .export import run
+
+    if chunksize is None:
+        run(kind, path, periode, dari, sampai)
+    else:
+        run(kind, path, periode, dari, sampai, chunksize)
+
+
+def serve(host: str, port: int) -> None:
+    import asyncio
+    from .server import Server
+
+    try:
+        asyncio.run(Server().serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+ACTIONS = {
+    1: ("Edit Data Menu Restoran", edit_menu),
+    2: ("Hitung Pembelian", order),
+    3: ("Lihat Daftar Pengunjung", report),
+    4: ("Hitung Ulang Rekap Transaksi", rebuild),
+    5: ("Lihat Stok yang Perlu Dipesan", stock),
+}
+
+
+def interactive() -> None:
+    """
+    Show the main menu until the user exits.
+
+    Every action returns to this loop, so a long shift doesn't grow the stack.
+    """
+    while True:
+        os.system("cls")
+        print("Selamat Datang di Menu Restoran Laperpedia")
+        print("Apa yang ingin Anda lakukan?")
+        print("=" * 28)
+        for number, (label, _) in ACTIONS.items():
+            print(f"[{number}] {label}")
+        print("[0] Exit")
+        print("=" * 28)
+        try:
+            pilih_menu = int(input("Pilih menu >> "))
+            if pilih_menu == 0:
+                return
+            if pilih_menu not in ACTIONS:
+                input("Input tidak valid! Tekan enter untuk kembali...")
+                continue
+            _, action = ACTIONS[pilih_menu]
+            action()
+            if action in (rebuild, stock):
+                input("Tekan enter untuk kembali...")
+        except ValueError:
+            input("Input tidak valid! Tekan enter untuk kembali...")
+        except EOFError:
+            return
+
+
+def main(argv: list | None = None) -> None:
+    """
+    Run a command, or the interactive menu if none is given.
+
+    Args:
+        - argv (list | None): The arguments, defaults to sys.argv[1:].
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive()
+        return
+
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="Kasir.py", description="Kasir Restoran Laperpedia")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    menu_parser = commands.add_parser("menu", help="Data menu restoran")
+    menu_parser.add_argument("action", choices=["list", "edit"])
+    menu_parser.add_argument("--cari", help="tampilkan menu yang namanya memuat teks ini")
+    menu_parser.add_argument("--urut", help="urutkan menurut kolom ini")
+    menu_parser.add_argument("--turun", action="store_true", help="urutkan dari yang terbesar")
+    menu_parser.add_argument("--halaman", type=int, help="jumlah baris per halaman")
+    commands.add_parser("order", help="Hitung pembelian")
+    report_parser = commands.add_parser("report", help="Riwayat transaksi")
+    report_parser.add_argument("--periode", choices=["hari", "bulan", "semua"])
+    report_parser.add_argument("--urut", help="urutkan rekap per menu menurut kolom ini")
+    report_parser.add_argument("--turun", action="store_true", help="urutkan dari yang terbesar")
+    report_parser.add_argument("--halaman", type=int, help="jumlah baris per halaman")
+    commands.add_parser("rebuild", help="Hitung ulang rekap transaksi")
+    stock_parser = commands.add_parser("stok", help="Menu yang perlu dipesan ulang")
+    stock_parser.add_argument("--semua", action="store_true", help="tampilkan semua menu")
+    stock_parser.add_argument("--halaman", type=int, help="jumlah baris per halaman")
+    ingest_parser = commands.add_parser("ingest", help="Simpan file pesanan sekaligus")
+    ingest_parser.add_argument("path")
+    ingest_parser.add_argument("--dry-run", action="store_true")
+    export_parser = commands.add_parser("export", help="Ekspor transaksi untuk pembukuan")
+    export_parser.add_argument("kind", choices=["transaksi", "order", "harian", "menu"])
+    export_parser.add_argument("path", help="file .csv, .json atau .jsonl tujuan")
+    export_parser.add_argument("--periode", choices=["hari", "bulan", "semua"], default="semua")
+    export_parser.add_argument("--dari", help="tanggal pertama (DD-MM-YYYY)")
+    export_parser.add_argument("--sampai", help="tanggal terakhir (DD-MM-YYYY)")
+    export_parser.add_argument("--chunksize", type=int, help="baris yang dibaca sekaligus")
+    serve_parser = commands.add_parser("serve", help="Jalankan layanan HTTP/JSON")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "menu" and args.action == "list":
+            list_menu(args.cari, args.urut, args.turun, args.halaman)
+        elif args.command == "menu":
+            edit_menu()
+        elif args.command == "order":
+            order()
+        elif args.command == "report":
+            report(args.periode, args.urut, args.turun, args.halaman)
+        elif args.command == "rebuild":
+            rebuild()
+        elif args.command == "stok":
+            stock(args.semua, args.halaman)
+        elif args.command == "ingest":
+            ingest(args.path, args.dry_run)
+        elif args.command == "export":
+            export(
+                args.kind, args.path, args.periode, args.dari, args.sampai,
+                args.chunksize)
+        elif args.command == "serve":
+            serve(args.host, args.port)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    except BrokenPipeError:
+        # The reader (e.g. head) stopped early; tables are printed as they
+        # are read, so this is not an error.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
@@ -1,7 +1,17 @@
 import os
+import threading
 import pandas as pd
 from pandas import DataFrame
-from prettytable import PrettyTable
+from typing import Iterator
+from .locking import FileLock
+from .metrics import InstrumentedStorage, instrumented
+from .render import print_table
+from .schema import DATE_FORMAT, KEYED_TABLES, PARTITIONED_TABLES, TABLE_SCHEMAS
+from .schema import apply_schema, is_datetime_type
+from .storage import STORAGE_BACKENDS, KeyedStorage, PartitionedStorage
+
+# A keyed table is compacted once this share of its stored records is dead.
+COMPACT_RATIO = 0.5
 
 
 class Controller:
@@ -9,8 +19,16 @@ class Controller:
     A class that provides methods for controlling data in a database.
 
     Attributes:
+        - _cache (dict): Parsed data files shared by all instances, keyed by path.
+        - _cache_stats (dict): Cache hit/miss counters, keyed by filename.
         - _current_path (str): The current path of the file.
         - _data_path (str): The path to the data directory.
+        - _storage (Storage): The storage backend of the data file.
+        - _lock (FileLock): Shared lock for reads, exclusive lock for writes.
+        - _writer (str): "direct" or "queue".
+        - _key (str | None): The key column of a table in KEYED_TABLES.
+        - _compacting (set): Cache keys of the tables being compacted in the background.
+        - name (str): The name of the table.
         - filename (str): The name of the data file.
 
     Methods:
@@ -19,6 +37,8 @@ class Controller:
         - is_data_exists(): Check if the data file exists in the data directory.
         - is_data_empty(): Check if the data file is empty.
         - get_data_path(): Get the path to the data directory.
+        - get_file_path(): Get the path to the data file.
+        - read_header(): Read the column names from the data file.
         - create_dir(): Create the data directory if it doesn't exist.
         - create_file(): Create a new file in the data directory.
         - save_data(data: DataFrame | list): Save data to the data file.
@@ -28,21 +48,90 @@ class Controller:
         - read_data(): Read data from the data file.
         - delete_data(index: int): Delete data from the data file.
         - update_data(index: int, newdata: list): Update data in the data file.
-        - add_data(newdata: list): Add data to the data file.
-        - show_data(): Display data from the data file.
+        - update_many(newdata: dict): Update several rows with a single write.
+        - update_key(key, newdata: list): Update the row of a keyed table that has a key.
+        - delete_key(key): Delete the row of a keyed table that has a key.
+        - compact(): Rewrite a keyed table without its dead records.
+        - adjust_many(deltas: dict, columns: str, key_column: str): Add deltas to a column under the lock.
+        - accumulate(newdata: list, columns_name: list, aggregation: dict): Merge rows into a table of totals.
+        - add_data(newdata: list): Append data to the end of the data file.
+        - iter_data(chunksize: int, filters: dict, sort_by: str, columns: list, start, end): Read the data a chunk at a time.
+        - split_range(start, end): Split a time range into pieces that can be read apart.
+        - size(start, end): Get the bytes a time range of the data file takes on disk.
+        - show_data(filters: dict, sort_by: str, page_size: int): Display data from the data file, page by page.
         - is_convert_types(data: str, data_type: type): Check if the data can be converted to the specified data type.
+        - apply_schema(data: DataFrame): Cast data to the declared column types.
+        - get_index(column: str): Get the hash index of a column.
+        - lookup(column: str, value): Find the first row whose column equals value.
+        - derive(name: str, function): Compute a value from the data once per version.
+        - invalidate_cache(): Drop the cached copy of the data file.
+        - cache_info(): Get the cache hit/miss counters.
+        - clear_cache(): Drop every cached data file.
     """
 
-    def __init__(self, data_filename: str) -> None:
+    _cache: dict = {}
+    _cache_stats: dict = {}
+    _compacting: set = set()
+    _compact_guard = threading.Lock()
+
+    def __init__(
+            self,
+            data_filename: str,
+            backend: str | None = None,
+            partition: str | None = None,
+            writer: str | None = None) -> None:
         """
         Initialize the Controller class.
 
         Args:
             - data_filename (str): The name of the data file.
+            - backend (str): The storage backend, "csv", "sqlite" or "parquet". Defaults
+              to the KASIR_STORAGE environment variable, or "csv".
+            - partition (str): How tables in PARTITIONED_TABLES are split, "day",
+              "month" or "none". Defaults to the KASIR_PARTITION environment
+              variable, or "month".
+            - writer (str): "direct" to write the data file from this process,
+              or "queue" to hand every change to the single writer process
+              (python -m modulekasir.writer). Defaults to the KASIR_WRITER
+              environment variable, or "direct".
         """
         self._current_path = os.path.split(os.path.dirname(__file__))[0]
-        self._data_path = os.path.join(self._current_path, "data")
-        self.filename = data_filename + ".csv"
+        self._data_path = os.environ.get("KASIR_DATA_DIR") or os.path.join(
+            self._current_path, "data")
+        self._writer = writer or os.environ.get("KASIR_WRITER", "direct")
+        if self._writer not in ("direct", "queue"):
+            raise ValueError(f"Mode penulisan {self._writer} tidak tersedia!")
+        self._lock = FileLock(self._data_path, data_filename)
+        backend = backend or os.environ.get("KASIR_STORAGE", "csv")
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Backend {backend} tidak tersedia!")
+        partition = partition or os.environ.get("KASIR_PARTITION", "month")
+        if partition not in ("day", "month", "none"):
+            raise ValueError(f"Partisi {partition} tidak tersedia!")
+
+        schema = TABLE_SCHEMAS.get(data_filename)
+        if data_filename in PARTITIONED_TABLES and partition != "none":
+            self._storage = PartitionedStorage(
+                self._data_path,
+                data_filename,
+                schema,
+                STORAGE_BACKENDS[backend],
+                PARTITIONED_TABLES[data_filename],
+                partition)
+        elif data_filename in KEYED_TABLES:
+            self._storage = KeyedStorage(
+                self._data_path,
+                data_filename,
+                schema,
+                STORAGE_BACKENDS[backend],
+                KEYED_TABLES[data_filename])
+        else:
+            self._storage = STORAGE_BACKENDS[backend](
+                self._data_path, data_filename, schema)
+        self._key = KEYED_TABLES.get(data_filename)
+        self._storage = InstrumentedStorage(self._storage)
+        self.name = data_filename
+        self.filename = self._storage.filename
 
     def is_dir_exists(self) -> bool:
         """
@@ -63,7 +152,7 @@ class Controller:
         if not self.is_dir_exists():
             self.create_dir()
 
-        return self.filename in os.listdir(f"{self._data_path}")
+        return self._storage.exists()
 
     def is_data_empty(self) -> bool:
         """
@@ -74,7 +163,7 @@ class Controller:
         """
 
         if self.is_file_exists():
-            return pd.read_csv(f"{self._data_path}\\{self.filename}").empty
+            return self.get_data().empty
 
     def get_data_path(self) -> str:
         """
@@ -85,13 +174,33 @@ class Controller:
         """
         return self._data_path
 
+    def get_file_path(self) -> str:
+        """
+        Get the path to the data file.
+
+        Returns:
+            str: The path to the data file.
+        """
+        return self._storage.path
+
+    @instrumented
+    def read_header(self) -> list:
+        """
+        Read the column names from the data file without parsing the rows.
+
+        Returns:
+            list: The column names, or an empty list if the file has no header.
+        """
+        with self._lock.shared():
+            return self._storage.read_header()
+
     def create_dir(self) -> None:
         """
         Create the data directory if it doesn't exist.
         """
         if not self.is_dir_exists():
             print("Making directory...")
-            os.mkdir(f"{self._data_path}")
+            os.makedirs(f"{self._data_path}", exist_ok=True)
         else:
             print("Directory is already exists!")
 
@@ -99,12 +208,12 @@ class Controller:
         """
         Create a new file in the data directory.
         """
-        if not self.is_file_exists():
-            print(f"Making {self.filename} at {self._data_path} directory...")
-            f = open(f"{self._data_path}\\{self.filename}", "w+")
-            if columns_name:
-                f.write(",".join(columns_name))
-            f.close()
+        with self._lock.exclusive():
+            if not self.is_file_exists():
+                print(f"Making {self.filename} at {self._data_path} directory...")
+                if columns_name == ... or columns_name is None:
+                    columns_name = []
+                self._storage.create(columns_name)
 
     def dataframe_to_list(self, dataframe: DataFrame) -> list:
         """
@@ -134,43 +243,386 @@ class Controller:
         """
         return DataFrame(data=list_data, columns=columns_name)
 
-    def get_data(self) -> DataFrame:
+    @instrumented
+    def get_data(
+            self,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> DataFrame:
         """
         Get data from the data file.
 
+        The parsed file is cached and reused until its mtime or size changes
+        or this controller writes to it. Date range reads bypass the cache
+        and, on partitioned tables, only open the partitions in the range.
+
+        Args:
+            - columns (list | None): Only read these columns. When the file is
+              not cached, only these columns are loaded from storage.
+            - start (Timestamp | None): Only rows at or after this time.
+            - end (Timestamp | None): Only rows before this time.
+
         Returns:
-            DataFrame: The data from the data file.
+            DataFrame: A copy of the data from the data file.
         """
-        data = pd.read_csv(f"{self._data_path}\\{self.filename}")
-        return data
+        if start is not None or end is not None:
+            return self._get_range(columns, start, end)
+
+        if columns is None:
+            return self._load_entry()["data"].copy()
+
+        entry = self._cached_entry()
+        if entry is not None:
+            Controller._cache_stats.setdefault(
+                self.filename, {"hits": 0, "misses": 0})["hits"] += 1
+            return entry["data"][columns].copy()
+        with self._lock.shared():
+            return self.apply_schema(self._storage.read(columns))
+
+    def _get_range(
+            self,
+            columns: list | None,
+            start: pd.Timestamp | None,
+            end: pd.Timestamp | None) -> DataFrame:
+        """
+        Get the rows whose date column falls between start and end.
+        """
+        date_column = PARTITIONED_TABLES.get(self._storage.name, "Tanggal")
+        read_columns = columns
+        if columns is not None and date_column not in columns:
+            read_columns = list(columns) + [date_column]
+
+        with self._lock.shared():
+            data = self.apply_schema(
+                self._storage.read_range(read_columns, start, end))
+        data = self._in_range(data, start, end).reset_index(drop=True)
+        return data if columns is None else data[columns]
+
+    def _in_range(
+            self,
+            data: DataFrame,
+            start: pd.Timestamp | None,
+            end: pd.Timestamp | None) -> DataFrame:
+        """
+        Keep the rows whose date column falls between start and end.
+        """
+        if start is None and end is None:
+            return data
+        tanggal = data[PARTITIONED_TABLES.get(self._storage.name, "Tanggal")]
+        mask = pd.Series(True, index=data.index)
+        if start is not None:
+            mask &= tanggal >= start
+        if end is not None:
+            mask &= tanggal < end
+        return data[mask]
+
+    def _file_signature(self) -> tuple:
+        """
+        Get the (mtime, size) pair used to detect changes to the data file.
+        """
+        return self._storage.signature()
+
+    def _cached_entry(self) -> dict | None:
+        """
+        Get the cache entry for the data file if it is still up to date.
+        """
+        entry = Controller._cache.get(self._cache_key())
+        if entry is not None and entry["signature"] == self._file_signature():
+            return entry
+        return None
+
+    def _load_entry(self) -> dict:
+        """
+        Get the cache entry for the data file, parsing the file on a miss.
+        """
+        with self._lock.shared():
+            stats = Controller._cache_stats.setdefault(
+                self.filename, {"hits": 0, "misses": 0})
+
+            entry = self._cached_entry()
+            if entry is not None:
+                stats["hits"] += 1
+                return entry
+
+            stats["misses"] += 1
+            signature = self._file_signature()
+            data = self.apply_schema(self._storage.read())
+            dead = self._storage.dead if self._key is not None else 0
+            return self._store_entry(data, signature=signature, dead=dead)
+
+    def _store_entry(
+            self,
+            data: DataFrame,
+            indexes: dict | None = None,
+            signature: tuple | None = None,
+            dead: int = 0) -> dict:
+        """
+        Put data into the cache as the current content of the data file.
+
+        dead counts the stored records of a keyed table that were replaced
+        or deleted since its last compaction.
+        """
+        entry = {
+            "signature": signature or self._file_signature(),
+            "data": data,
+            "indexes": indexes if indexes is not None else {},
+            "derived": {},
+            "dead": dead,
+        }
+        Controller._cache[self._cache_key()] = entry
+        return entry
+
+    def apply_schema(self, data: DataFrame) -> DataFrame:
+        """
+        Cast data to the declared column types of this data file, if any.
+
+        Args:
+            - data (DataFrame): The data to cast.
+
+        Returns:
+            DataFrame: The cast data.
+        """
+        return apply_schema(data, self._storage.schema)
+
+    def get_index(self, column: str) -> dict:
+        """
+        Get the hash index of a column, building it on first use.
+
+        Duplicate values keep the first row, the same row a boolean mask
+        followed by .iloc[0] would return.
+
+        Args:
+            - column (str): The column to index.
+
+        Returns:
+            dict: Maps each value to a (row index, row dict) pair.
+        """
+        entry = self._load_entry()
+        if column not in entry["indexes"]:
+            index = {}
+            data = entry["data"]
+            for label, record in zip(data.index, data.to_dict("records")):
+                index.setdefault(record[column], (label, record))
+            entry["indexes"][column] = index
+        return entry["indexes"][column]
+
+    def derive(self, name: str, function):
+        """
+        Compute a value from the data once per version of the data file.
+
+        The value is kept with the cached data and dropped whenever the data
+        changes, e.g. an encoded response or a sorted view.
+
+        Args:
+            - name (str): The name the value is kept under.
+            - function: Computes the value from the data. It must not change the data.
+
+        Returns:
+            The computed value.
+        """
+        entry = self._load_entry()
+        if name not in entry["derived"]:
+            entry["derived"][name] = function(entry["data"])
+        return entry["derived"][name]
 
-    def read_data(self, columns_name: list = ...) -> DataFrame:
+    @instrumented
+    def lookup(self, column: str, value) -> tuple | None:
+        """
+        Find the first row whose column equals value.
+
+        Args:
+            - column (str): The indexed column.
+            - value: The value to look for.
+
+        Returns:
+            tuple | None: (row index, row dict), or None if nothing matches.
+        """
+        found = self.get_index(column).get(value)
+        if found is None:
+            return None
+        label, record = found
+        return label, dict(record)
+
+    def invalidate_cache(self) -> None:
+        """
+        Drop the cached copy of the data file.
+        """
+        Controller._cache.pop(self._cache_key(), None)
+
+    def _cache_key(self) -> tuple:
+        """
+        Get the key of the data file in the shared cache.
+        """
+        return (self._storage.path, self.filename)
+
+    @classmethod
+    def cache_info(cls) -> dict:
+        """
+        Get the cache hit/miss counters.
+
+        Returns:
+            dict: The counters per filename, e.g. {"data_menu.csv": {"hits": 3, "misses": 1}}.
+        """
+        return {name: dict(stats) for name, stats in cls._cache_stats.items()}
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Drop every cached data file and reset the counters.
+        """
+        cls._cache.clear()
+        cls._cache_stats.clear()
+
+    def read_data(
+            self,
+            columns_name: list = ...,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> DataFrame:
         """
         Read data from the data file.
 
         Args:
         - columns_name (list): The names of the columns in the DataFrame.
+        - columns (list | None): Only read these columns.
+        - start (Timestamp | None): Only rows at or after this time.
+        - end (Timestamp | None): Only rows before this time.
 
         Returns:
             DataFrame: The data from the data file.
         """
         if self.is_file_exists():
-            return self.get_data()
+            return self.get_data(columns, start, end)
         else:
             print("File tidak ditemukan!\nMembuat file baru...")
             self.create_file(columns_name)
-            return self.get_data()
+            return self.get_data(columns, start, end)
 
+    @instrumented
     def delete_data(self, index: int) -> None:
         """
         Delete data from the data file.
 
+        Keyed tables only append a tombstone to their change log.
+
         Args:
             - index (int): The index of the data to be deleted.
         """
-        data = self.read_data()
-        data.drop(index=index, inplace=True)
-        self.save_data(data)
+        if self._submit("delete_data", index=index):
+            return
+
+        with self._lock.exclusive():
+            data = self.read_data()
+            dead = 0
+            if self._key is not None:
+                removed = data.loc[[index]]
+                # The deleted row and its tombstone.
+                dead = self._load_entry()["dead"] + 2
+            data.drop(index=index, inplace=True)
+            if self._key is not None:
+                self._storage.remove(removed)
+            else:
+                self._storage.delete(data, index)
+            # Row positions shift after a delete, so the indexes are rebuilt lazily.
+            self._store_entry(data.reset_index(drop=True), dead=dead)
+        self._maybe_compact()
+
+    @instrumented
+    def delete_key(self, key) -> None:
+        """
+        Delete the row of a keyed table that has the given key.
+
+        Unlike a row index, the key doesn't change when other rows are
+        added or deleted.
+
+        Args:
+            - key: The key of the row, e.g. the menu name.
+
+        Raises:
+            ValueError: If the table has no key or no row has this key.
+        """
+        if self._submit("delete_key", key=key):
+            return
+
+        with self._lock.exclusive():
+            self.delete_data(self._position_of(key))
+
+    @instrumented
+    def update_key(
+            self,
+            key,
+            newdata: list | str | int,
+            columns: str = ...) -> None:
+        """
+        Update the row of a keyed table that has the given key.
+
+        Args:
+            - key: The key of the row, e.g. the menu name.
+            - newdata (list): The new data. May change the key itself.
+            - columns (str): The column to update. The whole row is replaced if omitted.
+
+        Raises:
+            ValueError: If the table has no key, no row has this key, or
+                the new key is already taken.
+        """
+        if self._submit("update_key", key=key, newdata=newdata, columns=columns):
+            return
+
+        with self._lock.exclusive():
+            self.update_many({self._position_of(key): newdata}, columns)
+
+    def _position_of(self, key) -> int:
+        """
+        Get the current row index of a key.
+        """
+        if self._key is None:
+            raise ValueError(f"Tabel {self.name} tidak memakai kunci!")
+        found = self.lookup(self._key, key)
+        if found is None:
+            raise ValueError(f"{self._key} {key} tidak ditemukan!")
+        return found[0]
+
+    @instrumented
+    def compact(self) -> None:
+        """
+        Rewrite a keyed table without its dead records and drop its change log.
+        """
+        if self._key is None:
+            return
+        if self._submit("compact"):
+            return
+
+        with self._lock.exclusive():
+            entry = self._load_entry()
+            self._storage.write(entry["data"])
+            # Compacting keeps every row in place, so the indexes stay valid.
+            self._store_entry(entry["data"], entry["indexes"])
+
+    def _maybe_compact(self) -> None:
+        """
+        Compact a keyed table in a background thread once enough of it is dead.
+
+        The amortized cost of a change stays constant: a table of n rows is
+        rewritten at most once every n changes or so.
+        """
+        entry = Controller._cache.get(self._cache_key())
+        if self._key is None or entry is None:
+            return
+        dead = entry["dead"]
+        if dead == 0 or dead < COMPACT_RATIO * (dead + len(entry["data"])):
+            return
+        with Controller._compact_guard:
+            if self._cache_key() in Controller._compacting:
+                return
+            Controller._compacting.add(self._cache_key())
+        threading.Thread(target=self._compact_in_background).start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        finally:
+            with Controller._compact_guard:
+                Controller._compacting.discard(self._cache_key())
 
     def update_data(
             self,
@@ -184,30 +636,293 @@ class Controller:
             - index (int): The index of the data to be updated.
             - newdata (list): The new data to replace the existing data.
         """
-        data = self.read_data()
-        if columns != ...:
-            data.loc[index, columns] = newdata
-        else:
-            data.loc[index] = newdata
-        self.save_data(data)
+        self.update_many({index: newdata}, columns)
+
+    @instrumented
+    def update_many(
+            self,
+            newdata: dict,
+            columns: str = ...) -> None:
+        """
+        Update several rows with a single write to the data file.
+
+        Keyed tables only append the new versions of the rows to their
+        change log.
+
+        Args:
+            - newdata (dict): Maps each index to its new data.
+            - columns (str): The column to update. Whole rows are replaced if omitted.
+
+        Raises:
+            ValueError: If a keyed row is renamed to a key that is already taken.
+        """
+        if self._submit("update_many", newdata=newdata, columns=columns):
+            return
+
+        with self._lock.exclusive():
+            entry = self._cached_entry()
+            indexes = entry["indexes"] if entry is not None else {}
+            data = self.read_data()
+            dead = self._load_entry()["dead"]
+            newdata = self._parse_dates(newdata, list(data.columns) if columns == ... else columns)
+            present = [index for index in newdata if index in data.index]
+            old_records = dict(zip(present, data.loc[present].to_dict("records")))
+            # Categorical columns reject new values, so add them as categories
+            # first. Unlike a round trip through object, this doesn't touch
+            # the other rows.
+            if columns == ...:
+                updated = dict(zip(data.columns, zip(*newdata.values())))
+            elif isinstance(columns, str):
+                updated = {columns: tuple(newdata.values())}
+            else:
+                updated = dict(zip(columns, zip(*newdata.values())))
+            for column, values in updated.items():
+                if isinstance(data[column].dtype, pd.CategoricalDtype):
+                    categories = data[column].cat.categories
+                    missing = [
+                        value for value in dict.fromkeys(values)
+                        if value not in categories]
+                    if missing:
+                        data[column] = data[column].cat.add_categories(missing)
+            if isinstance(columns, str) and len(present) == len(newdata):
+                data.loc[present, columns] = pd.Series(
+                    list(newdata.values()), index=present).astype(data[columns].dtype)
+            else:
+                for index, value in newdata.items():
+                    if columns != ...:
+                        data.loc[index, columns] = value
+                    else:
+                        data.loc[index] = value
+            data = self.apply_schema(data)
+            if self._key is None:
+                self._storage.update(data, list(newdata))
+            else:
+                dead += self._upsert(data, newdata, old_records)
+
+            records = data.loc[list(newdata)].to_dict("records")
+            for index, record in zip(newdata, records):
+                old_record = old_records.get(index, {})
+                for column in list(indexes):
+                    if old_record.get(column) == record[column]:
+                        label, _ = indexes[column].get(record[column], (None, None))
+                        if label == index:
+                            indexes[column][record[column]] = (index, record)
+                    else:
+                        # A renamed key may uncover a duplicate, so rebuild lazily.
+                        del indexes[column]
+            self._store_entry(data, indexes, dead=dead)
+        self._maybe_compact()
+
+    def _parse_dates(self, newdata: dict, columns: str | list) -> dict:
+        """
+        Parse new timestamps given as DATE_FORMAT text. Assigned to a
+        datetime column as they are, pandas would read 01-10-2026 as
+        January 10.
+        """
+        schema = self._storage.schema or {}
+        names = [columns] if isinstance(columns, str) else list(columns)
+        dates = {
+            position for position, name in enumerate(names)
+            if is_datetime_type(schema.get(name, ""))}
+        if not dates:
+            return newdata
+
+        def parse(value):
+            if isinstance(value, str):
+                return pd.to_datetime(value, format=DATE_FORMAT)
+            return value
+
+        if isinstance(columns, str):
+            return {index: parse(value) for index, value in newdata.items()}
+        return {
+            index: [
+                parse(value) if position in dates else value
+                for position, value in enumerate(values)]
+            for index, values in newdata.items()}
+
+    def _upsert(self, data: DataFrame, newdata: dict, old_records: dict) -> int:
+        """
+        Append the changed rows of a keyed table to its change log.
+
+        Returns:
+            int: The number of stored records the new versions replace.
+        """
+        old_keys = []
+        keys = data.loc[list(newdata), self._key].tolist()
+        for index, key in zip(newdata, keys):
+            old_key = old_records.get(index, {}).get(self._key, key)
+            if key != old_key and (data[self._key] == key).sum() > 1:
+                raise ValueError(f"{self._key} {key} sudah ada!")
+            old_keys.append(old_key)
+        self._storage.upsert(data.loc[list(newdata)], old_keys)
+        return len(old_records)
+
+    @instrumented
+    def adjust_many(
+            self,
+            deltas: dict,
+            columns: str,
+            key_column: str) -> None:
+        """
+        Add deltas to a numeric column in one locked read-modify-write.
+
+        Unlike update_many, the new values are computed from the data as it
+        is while the lock is held, so changes made by other terminals since
+        the last read are not lost.
+
+        Args:
+            - deltas (dict): Maps each key_column value to the amount to add.
+            - columns (str): The column to change, e.g. "Stok".
+            - key_column (str): The column that identifies the rows, e.g. "Nama Menu".
+        """
+        if self._submit(
+                "adjust_many",
+                deltas=deltas,
+                columns=columns,
+                key_column=key_column):
+            return
+
+        with self._lock.exclusive():
+            newdata = {}
+            rows = self.get_index(key_column)
+            for key, delta in deltas.items():
+                found = rows.get(key)
+                if found is not None:
+                    index, record = found
+                    newdata[index] = record[columns] + delta
+            if newdata:
+                self.update_many(newdata, columns)
+
+    @instrumented
+    def accumulate(
+            self,
+            newdata: list[list],
+            columns_name: list,
+            aggregation: dict) -> None:
+        """
+        Merge rows into a table of totals in one locked read-modify-write.
+
+        Rows whose key (the first column) is already in the table are
+        combined with the existing row, other rows are added.
+
+        Args:
+            - newdata (list): The rows to merge.
+            - columns_name (list): The column names, starting with the key.
+            - aggregation (dict): How each other column is combined, e.g. {"Total": "sum"}.
+        """
+        if self._submit(
+                "accumulate",
+                newdata=newdata,
+                columns_name=columns_name,
+                aggregation=aggregation):
+            return
+
+        with self._lock.exclusive():
+            summary = self.list_to_dataframe(newdata, columns_name)
+            existing = self.read_data(columns_name)
+            if not existing.empty:
+                summary = pd.concat([existing, summary]).groupby(
+                    by=columns_name[0], sort=False).agg(aggregation).reset_index()
+            self.save_data(summary[columns_name])
+
+    def _submit(self, method: str, **kwargs) -> bool:
+        """
+        Hand a change to the single writer process when in queue mode.
+
+        Args:
+            - method (str): The Controller method the writer should call.
+            - kwargs: The arguments of the method. Omitted (...) arguments are dropped.
+
+        Returns:
+            bool: True if the change was handled by the writer, False if the
+                caller should write the data file itself.
+        """
+        if self._writer != "queue":
+            return False
+        from .writer import WriteQueue
+
+        kwargs = {key: value for key, value in kwargs.items() if value is not ...}
+        WriteQueue(self._data_path).submit(self.name, method, kwargs)
+        self.invalidate_cache()
+        return True
 
-    def add_data(self, newdata: list | list[list]) -> None:
+    @instrumented
+    def add_data(
+            self,
+            newdata: list | list[list],
+            columns_name: list = ...) -> None:
         """
-        Add data to the data file.
+        Append data to the end of the data file.
+
+        Only the new rows are written, so the cost does not depend on the
+        size of the existing file.
 
         Args:
             - newdata (list): The new data to be added.
+            - columns_name (list): The expected column names. Used to create
+              the file if it doesn't exist yet.
+
+        Raises:
+            ValueError: If the file has no header, the header doesn't match
+                columns_name, or a row has the wrong number of columns.
         """
-        data = self.read_data()
-        if self.is_nested_lists(newdata):
-            for item in newdata:
-                new_series = pd.Series(item, index=data.columns)
-                data = data._append(new_series, ignore_index=True)
-        else:
-            new_series = pd.Series(newdata, index=data.columns)
-            data = data._append(new_series, ignore_index=True)
-        self.save_data(data)
+        if self._submit("add_data", newdata=newdata, columns_name=columns_name):
+            return
+
+        with self._lock.exclusive():
+            if not self.is_file_exists():
+                self.create_file(columns_name)
+
+            header = self.read_header()
+            if not header:
+                raise ValueError(f"Header {self.filename} tidak ditemukan!")
+            if columns_name != ... and list(columns_name) != header:
+                raise ValueError(f"Kolom {self.filename} tidak sesuai!")
+
+            rows = newdata if self.is_nested_lists(newdata) else [newdata]
+            for row in rows:
+                if len(row) != len(header):
+                    raise ValueError(
+                        f"Jumlah kolom harus {len(header)}, bukan {len(row)}!")
+            if self._key is not None:
+                self._check_new_keys([row[header.index(self._key)] for row in rows])
+
+            entry = self._cached_entry()
+            data = self.apply_schema(self.list_to_dataframe(rows, header))
+            self._storage.append(data)
+
+            if entry is None or entry["data"].empty:
+                self.invalidate_cache()
+                return
+            if not self._storage.schema:
+                try:
+                    # Match the types a fresh read of the file would produce.
+                    data = data.astype(entry["data"].dtypes.to_dict())
+                except (TypeError, ValueError):
+                    self.invalidate_cache()
+                    return
+            data.index = range(len(entry["data"]), len(entry["data"]) + len(data))
+            records = data.to_dict("records")
+            for column, index in entry["indexes"].items():
+                for label, record in zip(data.index, records):
+                    index.setdefault(record[column], (label, record))
+            # Concatenating categoricals with different categories gives object
+            # columns, which apply_schema turns back into categoricals.
+            combined = self.apply_schema(pd.concat([entry["data"], data]))
+            self._store_entry(combined, entry["indexes"], dead=entry["dead"])
+
+    def _check_new_keys(self, keys: list) -> None:
+        """
+        Make sure rows added to a keyed table don't reuse a key.
+        """
+        existing = self.get_index(self._key)
+        seen = set()
+        for key in keys:
+            if key in existing or key in seen:
+                raise ValueError(f"{self._key} {key} sudah ada!")
+            seen.add(key)
 
+    @instrumented
     def save_data(
             self,
             data: DataFrame | list[list],
@@ -218,30 +933,194 @@ class Controller:
         Args:
             - data (DataFrame | list): The data to be saved.
         """
-        if isinstance(data, list):
-            data = self.list_to_dataframe(data, columns_name)
+        if isinstance(data, DataFrame) and self._writer == "queue":
+            columns_name = list(data.columns)
+            data = data.values.tolist()
+        if self._submit("save_data", data=data, columns_name=columns_name):
+            return
 
-        if self.is_file_exists():
-            data.to_csv(f"{self._data_path}\\{self.filename}", index=False)
+        with self._lock.exclusive():
+            if isinstance(data, list):
+                data = self.list_to_dataframe(data, columns_name)
+            data = self.apply_schema(data)
+
+            if not self.is_file_exists():
+                print("File tidak ditemukan!\n Membuat file baru...")
+                self.create_file()
+            self._storage.write(data)
+            # Re-reading the file would renumber the rows, so the cache does too.
+            # Indexes start empty and are rebuilt on the next lookup.
+            self._store_entry(data.reset_index(drop=True))
+
+    def iter_data(
+            self,
+            chunksize: int = 1000,
+            filters: dict | None = None,
+            sort_by: str | None = None,
+            descending: bool = False,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> Iterator[DataFrame]:
+        """
+        Read the data a chunk at a time, each row keeping its position as index.
+
+        A cached file is sliced. Otherwise the chunks are parsed from storage
+        as they are requested, so the first rows arrive without reading the
+        rest of the file and memory only holds one chunk. Sorting needs every
+        row and reads the whole file.
+
+        Args:
+            - chunksize (int): The number of rows read per chunk.
+            - filters (dict | None): Only rows matching every {column: value}.
+              Text values match any part of the cell, ignoring case.
+            - sort_by (str | None): Sort the rows by this column.
+            - descending (bool): Sort from the largest value.
+            - columns (list | None): Only these columns.
+            - start (Timestamp | None): Only rows at or after this time. Rows
+              are then numbered from the first one in the range, like read_data.
+            - end (Timestamp | None): Only rows before this time.
+
+        Yields:
+            DataFrame: The next matching rows.
+        """
+        if sort_by is not None:
+            data = self.read_data()
+            if start is not None or end is not None:
+                data = self._in_range(data, start, end).reset_index(drop=True)
+            data = self._filter(data, filters).sort_values(
+                sort_by, ascending=not descending, kind="stable")
+            if columns is not None:
+                data = data[columns]
+            for position in range(0, len(data), chunksize):
+                yield data.iloc[position:position + chunksize]
+            return
+
+        entry = self._cached_entry()
+        if entry is not None:
+            chunks = (
+                entry["data"].iloc[position:position + chunksize]
+                for position in range(0, len(entry["data"]), chunksize))
+        elif self.is_file_exists():
+            read_columns = None
+            if columns is not None:
+                read_columns = list(dict.fromkeys(
+                    list(columns) + list(filters or {})
+                    + ([PARTITIONED_TABLES.get(self._storage.name, "Tanggal")]
+                       if start is not None or end is not None else [])))
+            chunks = self._iter_storage(chunksize, read_columns, start, end)
         else:
-            print("File tidak ditemukan!\n Membuat file baru...")
-            self.create_file()
-            data.to_csv(f"{self._data_path}\\{self.filename}", index=False)
+            return
 
-    def show_data(self) -> None:
+        offset = 0
+        for chunk in chunks:
+            if start is not None or end is not None:
+                chunk = self._in_range(chunk, start, end)
+                chunk.index = range(offset, offset + len(chunk))
+                offset += len(chunk)
+            chunk = self._filter(chunk, filters)
+            if columns is not None:
+                chunk = chunk[columns]
+            if not chunk.empty:
+                yield chunk
+
+    def split_range(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> list:
         """
-        Display data from the data file.
+        Split a time range into pieces that are stored apart, e.g. one per
+        partition, so each can be read with iter_data by another process.
+
+        A cached file is already in memory and is not split.
+
+        Args:
+            - start (Timestamp | None): The first timestamp to include.
+            - end (Timestamp | None): The first timestamp to exclude.
+
+        Returns:
+            list: (start, end) pairs covering the range, oldest first.
+        """
+        if self._cached_entry() is not None or not self.is_file_exists():
+            return [(start, end)]
+        return self._storage.split_range(start, end)
+
+    def size(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> int:
+        """
+        Get the bytes the data file takes on disk, e.g. to judge whether a
+        read is worth splitting between processes.
+
+        Args:
+            - start (Timestamp | None): Only count partitions that can hold rows at or after this time.
+            - end (Timestamp | None): Only count partitions that can hold rows before this time.
+
+        Returns:
+            int: The size in bytes, 0 if the file doesn't exist.
+        """
+        return self._storage.size(start, end)
+
+    def _iter_storage(
+            self,
+            chunksize: int,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> Iterator[DataFrame]:
+        """
+        Parse the data file a chunk at a time, numbering the rows like read_data.
+        """
+        offset = 0
+        for chunk in self._storage.iter_range(columns, start, end, chunksize):
+            chunk = self.apply_schema(chunk)
+            chunk.index = range(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+
+    def _filter(self, data: DataFrame, filters: dict | None) -> DataFrame:
+        """
+        Keep the rows matching every {column: value} filter.
+        """
+        for column, value in (filters or {}).items():
+            if column not in data.columns:
+                raise ValueError(f"Kolom {column} tidak ditemukan!")
+            if isinstance(value, str):
+                mask = data[column].astype(str).str.contains(
+                    value, case=False, regex=False)
+            else:
+                mask = data[column] == value
+            data = data[mask]
+        return data
+
+    def show_data(
+            self,
+            filters: dict | None = None,
+            sort_by: str | None = None,
+            descending: bool = False,
+            page_size: int | None = None) -> None:
         """
-        data = self.read_data().reset_index(names=["No."])
+        Display data from the data file.
 
-        data_list = self.dataframe_to_list(data)
+        Rows are printed while the file is still being read, so the first
+        screen of a large file appears right away.
 
-        table = PrettyTable()
-        table.field_names = data.columns
+        Args:
+            - filters (dict | None): Only rows matching every {column: value}.
+            - sort_by (str | None): Sort the rows by this column.
+            - descending (bool): Sort from the largest value.
+            - page_size (int | None): Rows per page, or None to print every row.
+        """
+        if not self.is_file_exists():
+            self.read_data()
+        if sort_by is not None and sort_by not in self.read_header():
+            raise ValueError(f"Kolom {sort_by} tidak ditemukan!")
 
-        for row in data_list:
-            table.add_row(row)
-        print(table)
+        rows = (
+            row
+            for chunk in self.iter_data(
+                filters=filters, sort_by=sort_by, descending=descending)
+            for row in chunk.reset_index(names=["No."]).values.tolist())
+        print_table(["No."] + self.read_header(), rows, page_size=page_size)
 
     def convert_types(self, data: str, data_type: type) -> bool:
         """
@@ -0,0 +1,210 @@
+import argparse
+import os
+import sys
+from typing import Iterator
+import pandas as pd
+from pandas import DataFrame
+from .history import History
+from .journal import checkpoint as apply_journal
+from .rollup import CHUNKSIZE, Rollup
+from .schema import DATE_FORMAT
+
+
+class Export:
+    """
+    A class used to export the transaction log for accounting.
+
+    The log is read a chunk at a time, so memory holds at most one chunk
+    however long the log is. Order lines and per-order totals are written
+    as they are read; daily and per-menu totals are added up chunk by chunk.
+
+    Attributes:
+        - _rollup (Rollup): An instance of the Rollup class.
+        - chunksize (int): About how many lines are held in memory at once.
+
+    Methods:
+        - __init__(chunksize: int): Initializes the Export class.
+        - rows(kind: str, start, end): Get the rows of an export a chunk at a time.
+        - write(kind: str, path: str, start, end): Write an export to a CSV, JSON or JSONL file.
+    """
+
+    kinds = ("transaksi", "order", "harian", "menu")
+
+    def __init__(self, chunksize: int = CHUNKSIZE) -> None:
+        if chunksize < 1:
+            raise ValueError("Ukuran chunk harus lebih dari 0!")
+        self._rollup = Rollup()
+        self.chunksize = chunksize
+
+    def _per_order(self, lines: DataFrame) -> DataFrame:
+        """
+        Get the totals of every order in a chunk of whole orders.
+        """
+        return lines.astype({"Jumlah": "int64", "Total": "int64"}).groupby(
+                by="No. Pembelian", sort=False).agg(**{
+            "Tanggal": ("Tanggal", "first"),
+            "Jumlah Menu": ("Nama Menu", "size"),
+            "Jumlah": ("Jumlah", "sum"),
+            "Total": ("Total", "sum"),
+        }).reset_index()
+
+    def rows(
+            self,
+            kind: str,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> Iterator[DataFrame]:
+        """
+        Get the rows of an export a chunk at a time.
+
+        Args:
+            - kind (str): "transaksi" (order lines), "order" (one row per
+              order), "harian" (one row per day) or "menu" (one row per menu).
+            - start (Timestamp | None): Only orders at or after this time.
+            - end (Timestamp | None): Only orders before this time.
+
+        Yields:
+            DataFrame: The next rows.
+
+        Raises:
+            ValueError: If the kind is not recognized.
+        """
+        if kind not in self.kinds:
+            raise ValueError(f"Jenis ekspor harus salah satu dari {', '.join(self.kinds)}!")
+        if kind == "transaksi":
+            yield from self._rollup.iter_orders(start, end, self.chunksize)
+        elif kind == "order":
+            for lines in self._rollup.iter_orders(start, end, self.chunksize):
+                yield self._per_order(lines)
+        else:
+            daily, per_menu = self._rollup.summarize(start, end, self.chunksize)
+            yield daily if kind == "harian" else per_menu
+
+    def write(
+            self,
+            kind: str,
+            path: str,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> int:
+        """
+        Write an export to a file.
+
+        A path ending in .json gets a JSON array, .jsonl one JSON object per
+        line, anything else CSV. The file is written under a temporary name
+        and renamed when complete.
+
+        Args:
+            - kind (str): "transaksi", "order", "harian" or "menu".
+            - path (str): The file to write.
+            - start (Timestamp | None): Only orders at or after this time.
+            - end (Timestamp | None): Only orders before this time.
+
+        Returns:
+            int: The number of rows written.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        temp = path + ".tmp"
+        written = 0
+        try:
+            with open(temp, "w", newline="") as f:
+                if extension == ".json":
+                    f.write("[")
+                for chunk in self.rows(kind, start, end):
+                    if "Tanggal" in chunk.columns and pd.api.types.is_datetime64_any_dtype(
+                            chunk["Tanggal"]):
+                        chunk = chunk.assign(
+                            Tanggal=chunk["Tanggal"].dt.strftime(DATE_FORMAT))
+                    if chunk.empty:
+                        continue
+                    if extension == ".json":
+                        records = chunk.to_json(orient="records", force_ascii=False)
+                        f.write(("," if written else "") + records[1:-1])
+                    elif extension == ".jsonl":
+                        records = chunk.to_json(
+                            orient="records", lines=True, force_ascii=False)
+                        f.write(records if records.endswith("\n") else records + "\n")
+                    else:
+                        chunk.to_csv(f, header=not written, index=False)
+                    written += len(chunk)
+                if extension == ".json":
+                    f.write("]\n")
+            os.replace(temp, path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+        return written
+
+
+def parse_date(value: str) -> pd.Timestamp:
+    """
+    Parse a date given as DD-MM-YYYY.
+
+    Raises:
+        ValueError: If the date is not in that format.
+    """
+    try:
+        return pd.to_datetime(value, format="%d-%m-%Y")
+    except ValueError:
+        raise ValueError(f"Tanggal {value} harus berformat DD-MM-YYYY!")
+
+
+def run(
+        kind: str,
+        path: str,
+        periode: str = "semua",
+        dari: str | None = None,
+        sampai: str | None = None,
+        chunksize: int = CHUNKSIZE) -> int:
+    """
+    Export the orders of a period to a file.
+
+    Args:
+        - kind (str): "transaksi", "order", "harian" or "menu".
+        - path (str): The file to write.
+        - periode (str): "hari", "bulan" or "semua".
+        - dari (str | None): The first day (DD-MM-YYYY), overriding the period.
+        - sampai (str | None): The last day (DD-MM-YYYY), overriding the period.
+        - chunksize (int): About how many lines are held in memory at once.
+
+    Returns:
+        int: The number of rows written.
+    """
+    export = Export(chunksize)
+    apply_journal()
+    start, end = History().period_range(periode)
+    if dari is not None:
+        start = parse_date(dari)
+    if sampai is not None:
+        end = parse_date(sampai) + pd.DateOffset(days=1)
+    written = export.write(kind, path, start, end)
+    print(f"{written} baris ditulis ke {path}")
+    return written
+
+
+def main(argv: list | None = None) -> None:
+    """
+    Export the transaction log for accounting.
+
+    Usage: python -m modulekasir.export {transaksi,order,harian,menu} OUTPUT
+    [--periode hari|bulan|semua] [--dari DD-MM-YYYY] [--sampai DD-MM-YYYY]
+    [--chunksize N]
+    """
+    parser = argparse.ArgumentParser(description="Ekspor transaksi untuk pembukuan.")
+    parser.add_argument("kind", choices=Export.kinds)
+    parser.add_argument("path", help="File .csv, .json atau .jsonl tujuan")
+    parser.add_argument("--periode", choices=["hari", "bulan", "semua"], default="semua")
+    parser.add_argument("--dari", help="Tanggal pertama (DD-MM-YYYY)")
+    parser.add_argument("--sampai", help="Tanggal terakhir (DD-MM-YYYY)")
+    parser.add_argument(
+        "--chunksize", type=int, default=CHUNKSIZE,
+        help=f"Baris yang dibaca sekaligus (bawaan {CHUNKSIZE})")
+    args = parser.parse_args(argv)
+
+    try:
+        run(args.kind, args.path, args.periode, args.dari, args.sampai, args.chunksize)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import os
 import pandas as pd
-from prettytable import PrettyTable
 from .db_controller import Controller
+from .inventory import Inventory
+from .journal import checkpoint as apply_journal
+from .render import PAGE_SIZE, print_table
+from .rollup import Rollup
 
 
 class History:
@@ -11,82 +14,169 @@ class History:
     Attributes:
         - _controller (Controller): An instance of the Controller class.
         - _menu_controller (Controller): An instance of the Controller class.
+        - _rollup (Rollup): An instance of the Rollup class.
 
     Methods:
         - __init__(): Initializes the History class.
-        - show_history(): Display the transaction history.
+        - rebuild_history(): Recompute the report totals from the transaction log.
+        - period_range(periode: str): Get the time range of a report period.
+        - choose_period(): Ask which period the report should cover.
+        - get_per_menu(start, end): Get quantity and revenue per menu in a range.
+        - report(periode: str): Get the daily and per-menu totals of a period.
+        - show_history(periode: str | None, page_size: int | None, sort_by: str | None): Display the transaction history, page by page.
     """
 
     def __init__(self) -> None:
         self._controller = Controller("data_transaksi")
         self._menu_controller = Controller("data_menu")
+        self._rollup = Rollup()
 
-    def show_history(self):
+    def rebuild_history(self) -> None:
+        """
+        Recompute the report totals from the transaction log.
+        """
+        print("Menghitung ulang rekap transaksi...")
+        apply_journal()
+        self._rollup.rebuild()
+        Inventory().rebuild()
+        print("Rekap transaksi selesai dihitung ulang.")
+
+    def period_range(self, periode: str) -> tuple:
+        """
+        Get the time range of a report period.
+
+        Args:
+            - periode (str): "hari", "bulan" or "semua".
+
+        Returns:
+            tuple: The start (inclusive) and end (exclusive) timestamps, or
+                (None, None) for the whole history.
+        """
+        today = pd.Timestamp.now().normalize()
+        if periode == "hari":
+            return today, today + pd.DateOffset(days=1)
+        if periode == "bulan":
+            start = today.replace(day=1)
+            return start, start + pd.DateOffset(months=1)
+        return None, None
+
+    def choose_period(self) -> str:
+        """
+        Ask which period the report should cover.
+
+        Returns:
+            str: "hari", "bulan" or "semua". Defaults to "bulan".
+        """
+        print("[1] Hari ini")
+        print("[2] Bulan ini")
+        print("[3] Semua")
+        pilih = input("Pilih periode [2] >> ").strip()
+        return {"1": "hari", "3": "semua"}.get(pilih, "bulan")
+
+    def get_per_menu(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Get quantity and revenue per menu between two timestamps.
+
+        Only the transaction partitions inside the range are read, a chunk
+        at a time.
+
+        Args:
+            - start (Timestamp): The first timestamp to include.
+            - end (Timestamp): The first timestamp to exclude.
+
+        Returns:
+            DataFrame: One row per menu item with its quantity and revenue.
+        """
+        _, per_menu = self._rollup.summarize(start, end)
+        return per_menu[["Nama Menu", "Jumlah", "Total"]]
+
+    def report(self, periode: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Get the daily and per-menu totals of a period.
+
+        Args:
+            - periode (str): "hari", "bulan" or "semua".
+
+        Returns:
+            tuple: The daily totals, and the per-menu totals joined with the
+                menu (every menu item, with its remaining stock and price).
+        """
+        start, end = self.period_range(periode)
+        apply_journal()
+
+        data_riwayat = self._rollup.get_daily()
+        if start is not None:
+            tanggal = pd.to_datetime(data_riwayat["Tanggal"], format="%d-%m-%Y")
+            data_riwayat = data_riwayat[(tanggal >= start) & (tanggal < end)]
+            per_menu = self.get_per_menu(start, end)
+        else:
+            per_menu = self._rollup.get_per_menu()
+        data_menu = self._menu_controller.read_data(
+            columns=["Nama Menu", "Harga", "Stok"])
+
+        merge_data = pd.merge(
+            per_menu,
+            data_menu,
+            on="Nama Menu",
+            how='right').fillna(0)
+        merge_data.rename(columns={'Stok': 'Sisa Persediaan'}, inplace=True)
+        merge_data[['Jumlah', 'Total']] = merge_data[[
+            'Jumlah', 'Total']].astype('int64')
+        merge_data = merge_data[[
+            'Nama Menu', 'Jumlah', 'Total', 'Sisa Persediaan', 'Harga']]
+        return data_riwayat, merge_data
+
+    def show_history(
+            self,
+            periode: str | None = None,
+            page_size: int | None = PAGE_SIZE,
+            sort_by: str | None = None,
+            descending: bool = False):
+        """
+        Show the transaction history of a period, a page at a time.
+
+        Args:
+            - periode (str | None): "hari", "bulan" or "semua". Asked if None.
+            - page_size (int | None): Rows per page, or None to print every row.
+            - sort_by (str | None): Sort the per-menu table by this column.
+            - descending (bool): Sort from the largest value.
+        """
         os.system("cls")
-        data_all = self._controller.read_data()
-        data_menu = self._menu_controller.read_data()
-        if data_all.empty:
+        if periode is None:
+            periode = self.choose_period()
+        data_riwayat, merge_data = self.report(periode)
+        if sort_by is not None:
+            if sort_by not in merge_data.columns:
+                raise ValueError(f"Kolom {sort_by} tidak ditemukan!")
+            merge_data = merge_data.sort_values(
+                sort_by, ascending=not descending, kind="stable")
+        if data_riwayat.empty:
             print("Data masih kosong.")
         else:
-            print("-" * 47)
-            print("|{:^45}|".format("Riwayat Transaksi"))
-            print("-" * 47)
-            data_riwayat = data_all.groupby(by="Tanggal").agg({
-                'No. Pembelian': 'first',
-                'Total': 'sum'
-            }).reset_index()
-
-            table = PrettyTable()
-            table.field_names = ["Tanggal Order", "No. Order", "Pemasukan"]
-            table.align["Tanggal Order"] = "l"
-            table.align["No. Order"] = "c"
-            table.align["Pemasukan"] = "r"
-
-            for row in data_riwayat.values:
-                table.add_row(row)
-            print(table)
-
-            print("-" * 47)
+            print("-" * 56)
+            print("|{:^54}|".format("Riwayat Transaksi"))
+            print("-" * 56)
+
+            print_table(
+                ["Tanggal Order", "No. Order", "Jumlah Order", "Pemasukan"],
+                data_riwayat[[
+                    'Tanggal', 'No. Pembelian', 'Jumlah Order', 'Total']].itertuples(
+                        index=False, name=None),
+                align={"Tanggal Order": "l", "Pemasukan": "r"},
+                page_size=page_size)
+
+            print("-" * 56)
             print(
-                "|{:^32}|{:>12}|".format(
+                "|{:^41}|{:>12}|".format(
                     "Total Pemasukan",
                     data_riwayat['Total'].sum()))
-            print("-" * 47)
+            print("-" * 56)
 
             # Riwayat Transaksi per menu
-            table_menu = PrettyTable()
-
-            merge_data = pd.merge(
-                data_all,
-                data_menu,
-                on="Nama Menu",
-                how='right').fillna(0)
-            merge_data.drop(
-                columns=[
-                    'No. Pembelian',
-                    'Harga_x',
-                    'Jenis Menu',
-                    'Tanggal'],
-                inplace=True)
-            merge_data.rename(
-                columns={
-                    'Harga_y': 'Harga',
-                    'Stok': 'Sisa Persediaan'},
-                inplace=True)
-            merge_data[['Jumlah', 'Total']] = merge_data[[
-                'Jumlah', 'Total']].astype('int64')
-
-            merge_data = merge_data.groupby(by="Nama Menu").agg({
-                'Jumlah': 'sum',
-                'Total': 'sum',
-                'Sisa Persediaan': 'first',
-                'Harga': 'first'
-            }).reset_index()
-
-            table_menu.field_names = merge_data.columns
-            for row in merge_data.values:
-                table_menu.add_row(row)
-            print(table_menu)
+            print_table(
+                list(merge_data.columns),
+                merge_data.itertuples(index=False, name=None),
+                page_size=page_size)
 
             print("-" * 59)
             print(
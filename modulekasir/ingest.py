@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import sys
+import pandas as pd
+from pandas import DataFrame
+from .db_controller import Controller
+from .inventory import Inventory
+from .journal import ENABLED as JOURNAL_ENABLED, Journal
+from .rollup import Rollup
+from .schema import DATE_FORMAT, TRANSACTION_SCHEMA
+from .sequence import Sequence
+
+
+class Ingest:
+    """
+    A class used to save a file of orders without prompts.
+
+    Orders come from a CSV file with the columns Order, Nama Menu, Jumlah
+    and optionally Tanggal (one row per order line), or from a JSONL file
+    with one {"order", "items": [{"menu", "jumlah"}], "tanggal"} object per
+    line. All lines are checked against the menu at once. Then the stock,
+    the transaction log and the totals are each written once.
+
+    An order is rejected as a whole if any of its lines is invalid or if
+    the stock left by the orders before it is not enough.
+
+    With the journal on, the orders in the journal are applied first and
+    the journal stays locked until the file is saved, so no terminal takes
+    the same stock meanwhile.
+
+    Attributes:
+        - _menu (Controller): An instance of the Controller class for the menu.
+        - _transaction (Controller): An instance of the Controller class for the transaction log.
+        - _rollup (Rollup): An instance of the Rollup class.
+        - _inventory (Inventory): Logs the stock taken in the inventory ledger.
+        - _order_number (Sequence): Hands out the order numbers.
+        - _journal (Journal | None): The order journal, if it is enabled.
+        - _columns_name (list): A list of column names of the transaction log.
+
+    Methods:
+        - __init__(): Initializes the Ingest class.
+        - read_orders(path: str): Read a CSV or JSONL file of order lines.
+        - validate(lines: DataFrame): Split order lines into accepted and rejected.
+        - ingest(lines: DataFrame): Save the valid orders.
+        - ingest_file(path: str): Read, check and save a file of orders.
+    """
+
+    def __init__(self) -> None:
+        self._menu = Controller("data_menu")
+        self._transaction = Controller("data_transaksi")
+        self._rollup = Rollup()
+        self._inventory = Inventory()
+        self._journal = Journal() if JOURNAL_ENABLED else None
+        self._order_number = Sequence(self._transaction, "No. Pembelian", self._journal)
+        self._columns_name = list(TRANSACTION_SCHEMA)
+
+    def read_orders(self, path: str) -> DataFrame:
+        """
+        Read a CSV or JSONL file of order lines.
+
+        Args:
+            - path (str): The file, ending in .csv, .jsonl or .json.
+
+        Returns:
+            DataFrame: The columns Order, Nama Menu, Jumlah and Tanggal.
+
+        Raises:
+            ValueError: If the file type or its columns are not recognized.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            lines = pd.read_csv(
+                path, dtype={"Order": str, "Nama Menu": str, "Tanggal": str})
+        elif extension in (".jsonl", ".json"):
+            orders = pd.read_json(path, lines=True, dtype={"order": str})
+            if "tanggal" not in orders.columns:
+                orders["tanggal"] = None
+            lines = pd.json_normalize(
+                orders[["order", "items", "tanggal"]].to_dict("records"),
+                record_path="items",
+                meta=["order", "tanggal"]).rename(columns={
+                    "order": "Order",
+                    "menu": "Nama Menu",
+                    "jumlah": "Jumlah",
+                    "tanggal": "Tanggal"})
+        else:
+            raise ValueError(f"Format {extension} tidak didukung!")
+
+        missing = {"Order", "Nama Menu", "Jumlah"} - set(lines.columns)
+        if missing:
+            raise ValueError(f"Kolom {', '.join(sorted(missing))} tidak ditemukan!")
+        if "Tanggal" not in lines.columns:
+            lines["Tanggal"] = None
+        return lines[["Order", "Nama Menu", "Jumlah", "Tanggal"]]
+
+    def validate(self, lines: DataFrame) -> tuple[DataFrame, DataFrame]:
+        """
+        Split order lines into accepted and rejected ones.
+
+        Args:
+            - lines (DataFrame): Order lines as returned by read_orders.
+
+        Returns:
+            tuple: The accepted lines, merged per order and menu item and
+                with their price, and the rejected lines with the reason
+                ("Alasan").
+        """
+        original = lines = lines.reset_index(drop=True)
+        lines = lines.assign(**{
+            "Order": lines["Order"].astype(str),
+            "Nama Menu": lines["Nama Menu"].astype(str).str.strip()})
+        reason = pd.Series(pd.NA, index=lines.index, dtype=object)
+
+        jumlah = pd.to_numeric(lines["Jumlah"], errors="coerce")
+        reason[jumlah.isna() | (jumlah <= 0) | (jumlah % 1 != 0)] = "Jumlah tidak valid"
+
+        now = pd.Timestamp.now().floor("s")
+        tanggal = pd.to_datetime(lines["Tanggal"], format=DATE_FORMAT, errors="coerce")
+        reason[reason.isna() & tanggal.isna() & lines["Tanggal"].notna()] = "Tanggal tidak valid"
+
+        menu = self._menu.read_data(columns=["Nama Menu", "Harga", "Stok"])
+        menu = menu.assign(**{"Nama Menu": menu["Nama Menu"].astype(str)}).drop_duplicates(
+            "Nama Menu")
+        price = lines["Nama Menu"].map(menu.set_index("Nama Menu")["Harga"])
+        reason[reason.isna() & price.isna()] = "Menu tidak tersedia"
+
+        lines = lines.assign(
+            Jumlah=jumlah.fillna(0).astype("int64"),
+            Harga=price.fillna(0).astype("int64"),
+            Tanggal=tanggal.fillna(now))
+        # One bad line rejects its whole order.
+        first_reason = reason.groupby(lines["Order"]).transform("first")
+        reason = reason.fillna(first_reason.where(
+            first_reason.isna(), "Baris lain pada order tidak valid"))
+
+        valid = lines[reason.isna()]
+        rejected_orders = self._check_stock(valid, menu)
+        reason[reason.isna() & lines["Order"].isin(rejected_orders)] = "Stok tidak cukup"
+
+        accepted = lines[reason.isna()]
+        # Rejected lines keep their input values, so the file can be fixed and re-sent.
+        rejected = original[reason.notna()].assign(Alasan=reason[reason.notna()])
+        return accepted, rejected
+
+    def _check_stock(self, lines: DataFrame, menu: DataFrame) -> set:
+        """
+        Find the orders whose stock runs out, taking orders in file order.
+
+        Args:
+            - lines (DataFrame): Valid order lines.
+            - menu (DataFrame): The menu with its stock.
+
+        Returns:
+            set: The rejected order ids.
+        """
+        stock = menu.set_index("Nama Menu")["Stok"].astype("int64")
+        demand = lines.groupby("Nama Menu")["Jumlah"].sum()
+        short = demand.index[demand > stock.reindex(demand.index)]
+        if short.empty:
+            return set()
+
+        # Only orders that take a short item need to be checked one by one.
+        remaining = stock[short].to_dict()
+        touched = lines[lines["Nama Menu"].isin(short)]
+        rejected = set()
+        per_order = touched.groupby(["Order", "Nama Menu"], sort=False)["Jumlah"].sum()
+        for order, items in per_order.groupby(level="Order", sort=False):
+            items = items.droplevel("Order")
+            if all(jumlah <= remaining[nama] for nama, jumlah in items.items()):
+                for nama, jumlah in items.items():
+                    remaining[nama] -= jumlah
+            else:
+                rejected.add(order)
+        return rejected
+
+    def ingest(self, lines: DataFrame) -> tuple[DataFrame, DataFrame]:
+        """
+        Check order lines and save the valid orders.
+
+        Args:
+            - lines (DataFrame): Order lines as returned by read_orders.
+
+        Returns:
+            tuple: The saved lines with their order numbers, and the rejected
+                lines with the reason.
+        """
+        if self._journal is None:
+            return self._ingest(lines)
+        # The stock in data_menu is only current once the journal is
+        # applied, and nobody else takes stock until the file is saved.
+        with self._journal.lock():
+            self._journal.checkpoint()
+            return self._ingest(lines)
+
+    def _ingest(self, lines: DataFrame) -> tuple[DataFrame, DataFrame]:
+        accepted, rejected = self.validate(lines)
+        if accepted.empty:
+            return DataFrame(columns=self._columns_name), rejected
+
+        orders = accepted["Order"].unique()
+        first_number = self._order_number.next(len(orders))
+        numbers = pd.Series(
+            range(first_number, first_number + len(orders)), index=orders)
+        # Every line of an order gets the order's first timestamp, like an
+        # order taken at the till, so the order lands in one partition.
+        saved = accepted.assign(**{
+            "No. Pembelian": accepted["Order"].map(numbers),
+            "Total": accepted["Harga"] * accepted["Jumlah"],
+            "Tanggal": accepted.groupby("Order")["Tanggal"].transform("first")})
+        saved = saved.groupby(
+            by=["No. Pembelian", "Nama Menu"], sort=False).agg({
+                "Harga": "first",
+                "Jumlah": "sum",
+                "Total": "sum",
+                "Tanggal": "first"}).reset_index()[self._columns_name]
+
+        stok_keluar = saved.groupby("Nama Menu")["Jumlah"].sum()
+        self._menu.adjust_many(
+            (-stok_keluar).to_dict(), "Stok", "Nama Menu")
+        self._transaction.add_data(saved.values.tolist(), self._columns_name)
+        self._rollup.add_orders(saved)
+        rows = self._menu.get_index("Nama Menu")
+        self._inventory.record_sales(
+            saved.values.tolist(),
+            {menu: rows[menu][1]["Stok"] for menu in stok_keluar.index if menu in rows},
+            "impor")
+        return saved, rejected
+
+    def ingest_file(self, path: str, dry_run: bool = False) -> dict:
+        """
+        Read, check and save a file of orders.
+
+        Rejected lines are written next to the file as <file>.rejected.csv.
+
+        Args:
+            - path (str): The CSV or JSONL file.
+            - dry_run (bool): Only check the orders, save nothing.
+
+        Returns:
+            dict: Counts of read, saved and rejected orders and lines.
+        """
+        lines = self.read_orders(path)
+        if dry_run:
+            if self._journal is not None:
+                self._journal.checkpoint()
+            saved, rejected = self.validate(lines)
+        else:
+            saved, rejected = self.ingest(lines)
+        if not rejected.empty:
+            rejected.to_csv(
+                os.path.splitext(path)[0] + ".rejected.csv",
+                index=False,
+                date_format=DATE_FORMAT)
+        return {
+            "baris": len(lines),
+            "order": int(lines["Order"].astype(str).nunique()),
+            "baris_disimpan": len(saved),
+            "order_disimpan": int(saved[
+                "Order" if dry_run else "No. Pembelian"].nunique()),
+            "baris_ditolak": len(rejected),
+            "order_ditolak": int(rejected["Order"].nunique()),
+        }
+
+
+def main() -> None:
+    """
+    Save a CSV or JSONL file of orders.
+
+    Usage: python -m modulekasir.ingest orders.csv [--dry-run]
+    """
+    parser = argparse.ArgumentParser(description="Simpan file pesanan sekaligus.")
+    parser.add_argument("path", help="File .csv atau .jsonl berisi pesanan")
+    parser.add_argument("--dry-run", action="store_true", help="Hanya periksa, jangan simpan")
+    args = parser.parse_args()
+    if not os.path.isfile(args.path):
+        print("File tidak ditemukan!")
+        sys.exit(1)
+    try:
+        print(json.dumps(Ingest().ingest_file(args.path, args.dry_run)))
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
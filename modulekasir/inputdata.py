@@ -1,5 +1,10 @@
 import os
 from .db_controller import Controller
+from .inventory import Inventory
+from .journal import checkpoint as apply_journal
+from .render import PAGE_SIZE
+from .schema import MENU_SCHEMA
+from .search import MenuSearch
 
 
 class InputData:
@@ -8,17 +13,32 @@ class InputData:
 
     Attributes:
         - _controller (Controller): An instance of the Controller class.
+        - _search (MenuSearch): Suggests menu names for names that were not found.
+        - _inventory (Inventory): Logs the changes of stock in the inventory ledger.
 
     Methods:
         - input_data(): Input data to the data file.
         - update_data(): Update data in the data file.
         - delete_data(): Delete data from the data file.
-        - show_data(): Display data from the data file.
+        - show_data(filters: dict, sort_by: str, page_size: int): Display data from the data file, page by page.
     """
 
     def __init__(self) -> None:
         self._controller = Controller("data_menu")
-        self._columns_name = ["Nama Menu", "Jenis Menu", "Harga", "Stok"]
+        self._columns_name = list(MENU_SCHEMA)
+        self._search = MenuSearch()
+        self._inventory = Inventory()
+        # Show and change the stock as it is after the orders in the journal.
+        apply_journal()
+
+    def _find(self, nama_menu: str) -> bool:
+        """
+        Check that a menu item exists, suggesting close names if it doesn't.
+        """
+        if self._controller.lookup("Nama Menu", nama_menu) is not None:
+            return True
+        print(f"Menu {nama_menu} tidak ditemukan.{self._search.hint(nama_menu)}")
+        return False
 
     def add_data(self) -> None:
         '''
@@ -41,10 +61,12 @@ class InputData:
         else:
             print("Harga harus berupa angka.")
             return
+        stok_menu = self._controller.convert_types(stok_menu, int)
         self._controller.read_data(self._columns_name)
         data = [nama_menu, jenis_menu, harga_menu, stok_menu]
 
-        self._controller.add_data(data)
+        self._controller.add_data(data, self._columns_name)
+        self._inventory.record_edit(nama_menu, 0, stok_menu, "tambah")
         print("Data berhasil ditambahkan")
 
     def update_data(self) -> None:
@@ -52,7 +74,7 @@ class InputData:
         Update data in the data file.
 
         Args:
-            - index (int): The index of the data to be updated.
+            - nama_lama (str): The name of the menu to be updated.
             - nama_menu (str): The name of the menu.
             - jenis_menu (str): The type of the menu.
             - harga_menu (int): The price of the menu.
@@ -62,21 +84,24 @@ class InputData:
             print("Data masih kosong.")
             return
 
-        self._controller.show_data()
+        self._controller.show_data(page_size=PAGE_SIZE)
 
-        index = input("Masukkan nomor menu yang ingin diubah: ")
+        nama_lama = input("Masukkan nama menu yang ingin diubah: ")
+        if not self._find(nama_lama):
+            return
         nama_menu = input("Masukkan nama menu: ")
         jenis_menu = input("Masukkan jenis [Makanan/Minuman]: ")
         harga_menu = input("Masukkan harga: ")
         stok_menu = input("Masukkan stok: ")
 
-        index = self._controller.convert_types(index, int)
         harga_menu = self._controller.convert_types(harga_menu, int)
         stok_menu = self._controller.convert_types(stok_menu, int)
 
         data = [nama_menu, jenis_menu, harga_menu, stok_menu]
 
-        self._controller.update_data(index, data)
+        stok_lama = self._controller.lookup("Nama Menu", nama_lama)[1]["Stok"]
+        self._controller.update_key(nama_lama, data)
+        self._inventory.record_edit(nama_menu, stok_lama, stok_menu, "ubah")
         print("Data berhasil diubah")
 
     def delete_data(self) -> None:
@@ -84,25 +109,41 @@ class InputData:
         Delete data from the data file.
 
         Args:
-            - index (int): The index of the data to be deleted.
+            - nama_menu (str): The name of the menu to be deleted.
         '''
         if self._controller.is_data_empty():
             print("Data masih kosong.")
 
-        self._controller.show_data()
+        self._controller.show_data(page_size=PAGE_SIZE)
 
-        index = input("Masukkan nomor menu yang ingin dihapus: ")
-
-        index = self._controller.convert_types(index, int)
+        nama_menu = input("Masukkan nama menu yang ingin dihapus: ")
+        if not self._find(nama_menu):
+            return
 
-        self._controller.delete_data(index)
+        stok_lama = self._controller.lookup("Nama Menu", nama_menu)[1]["Stok"]
+        self._controller.delete_key(nama_menu)
+        self._inventory.record_edit(nama_menu, stok_lama, 0, "hapus")
         print("Data berhasil dihapus")
 
-    def show_data(self) -> None:
+    def show_data(
+            self,
+            filters: dict | None = None,
+            sort_by: str | None = None,
+            descending: bool = False,
+            page_size: int | None = PAGE_SIZE) -> None:
+        '''
+        Show the menu a page at a time.
+
+        Args:
+            - filters (dict | None): Only menus matching every {column: value}.
+            - sort_by (str | None): Sort the menus by this column.
+            - descending (bool): Sort from the largest value.
+            - page_size (int | None): Rows per page, or None to print every row.
+        '''
         if self._controller.is_data_empty():
             print("Data masih kosong.")
 
-        self._controller.show_data()
+        self._controller.show_data(filters, sort_by, descending, page_size)
 
 
 def menu():
@@ -124,7 +165,8 @@ def menu():
         elif menu == 3:
             InputData().delete_data()
         elif menu == 4:
-            InputData().show_data()
+            cari = input("Cari nama menu (kosongkan untuk semua): ").strip()
+            InputData().show_data({"Nama Menu": cari} if cari else None)
         elif menu == 5:
             return
         else:
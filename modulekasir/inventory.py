@@ -0,0 +1,319 @@
+import math
+import os
+from datetime import datetime
+import pandas as pd
+from pandas import DataFrame
+from .db_controller import Controller
+from .locking import FileLock
+from .render import PAGE_SIZE, print_table
+from .rollup import Rollup
+from .schema import CONSUMPTION_SCHEMA, DATE_FORMAT, STOCK_LEDGER_SCHEMA
+
+# Hours over which sales are averaged into a consumption rate: a sale
+# counts e^-1 as much after RATE_HOURS hours.
+RATE_HOURS = float(os.environ.get("KASIR_RATE_HOURS", "24"))
+
+# Warn when an item runs out within this many hours at its current rate.
+LOW_STOCK_HOURS = float(os.environ.get("KASIR_LOW_STOCK_HOURS", "12"))
+
+# Reorder enough stock for this many hours at the current rate.
+REORDER_HOURS = float(os.environ.get("KASIR_REORDER_HOURS", "48"))
+
+
+def parse_time(value) -> datetime:
+    """
+    Get a time given as a DD-MM-YYYY HH:MM:SS string or a timestamp.
+    """
+    if isinstance(value, str):
+        return datetime.strptime(value, DATE_FORMAT)
+    return pd.Timestamp(value).to_pydatetime()
+
+
+class Inventory:
+    """
+    A class used to keep a ledger of stock changes and the consumption rate
+    of every menu item.
+
+    Every change of stock is a row of data_stok: when, which item, by how
+    much, what was left, why ("penjualan", "impor", "tambah", "ubah" or
+    "hapus") and the order number of a sale. The ledger is only appended to.
+
+    The consumption rate of an item is an exponentially weighted moving
+    average of its sales in items per hour, kept in rekap_stok with the
+    time it was last updated. A sale updates it from its previous value
+    alone, and the rate at any later time is that value decayed, so
+    low-stock warnings and the reorder report never read the transaction
+    log.
+
+    Attributes:
+        - _ledger (Controller): An instance of the Controller class for the stock ledger.
+        - _rates (Controller): An instance of the Controller class for the consumption rates.
+        - _menu (Controller): An instance of the Controller class for the menu.
+        - _lock (FileLock): Lets one process at a time read, update and write the rates.
+        - _ledger_columns (list): A list of column names of the ledger.
+        - _rate_columns (list): A list of column names of the consumption rates.
+
+    Methods:
+        - __init__(): Initializes the Inventory class.
+        - record_sales(lines: list, stock: dict, alasan: str, update_rates: bool): Log sold order lines and update the rates.
+        - record_edit(nama: str, sebelum: int, sesudah: int, alasan: str): Log a change of stock by hand.
+        - rebuild(): Recompute the consumption rates from the transaction log.
+        - rate(menu: str, now): Get the consumption rate of a menu item.
+        - low_stock(stock: dict, now): Get the items that run out soon.
+        - warning(stock: dict): Describe the items that run out soon.
+        - reorder(semua: bool, now): Get the reorder report.
+        - show_reorder(semua: bool, page_size: int | None): Display the reorder report, page by page.
+    """
+
+    def __init__(self) -> None:
+        self._ledger = Controller("data_stok")
+        self._rates = Controller("rekap_stok")
+        self._menu = Controller("data_menu")
+        # Not the lock of rekap_stok: with KASIR_WRITER=queue the writer
+        # process takes that one to save the rates.
+        self._lock = FileLock(self._rates.get_data_path(), "rekap_stok_laju")
+        self._ledger_columns = list(STOCK_LEDGER_SCHEMA)
+        self._rate_columns = list(CONSUMPTION_SCHEMA)
+
+    def _decay(self, laju: float, sejak: datetime, waktu: datetime) -> float:
+        """
+        Get a rate as of waktu, given its value as of sejak.
+        """
+        hours = max((waktu - sejak).total_seconds() / 3600, 0)
+        return laju * math.exp(-hours / RATE_HOURS)
+
+    def _rate_index(self) -> dict:
+        if not self._rates.is_file_exists():
+            return {}
+        return self._rates.get_index("Nama Menu")
+
+    def _built_rates(self) -> dict:
+        """
+        Get the consumption rates, computing them from the transaction log
+        the first time, e.g. for a history older than the ledger.
+        """
+        if not self._rates.is_file_exists():
+            self.rebuild()
+        return self._rate_index()
+
+    def record_sales(
+            self,
+            lines: list,
+            stock: dict,
+            alasan: str = "penjualan",
+            update_rates: bool = True) -> None:
+        """
+        Log sold order lines in the ledger and update the consumption rates.
+
+        Args:
+            - lines (list): Order lines as [No. Pembelian, Nama Menu, Harga,
+              Jumlah, Total, Tanggal], in the order they were sold.
+            - stock (dict): Maps each menu name to its stock after the sale.
+            - alasan (str): Why the stock changed.
+            - update_rates (bool): False to log the lines only, e.g. when the
+              rates are rebuilt from the transaction log afterwards.
+        """
+        if not lines:
+            return
+        after = dict(stock)
+        rows = []
+        for nomor, menu, _, jumlah, _, tanggal in reversed(lines):
+            sisa = after.get(menu, 0)
+            rows.append([
+                parse_time(tanggal).strftime(DATE_FORMAT), menu, -jumlah, sisa,
+                alasan, nomor])
+            after[menu] = sisa + jumlah
+        rows.reverse()
+        self._ledger.add_data(rows, self._ledger_columns)
+        if update_rates:
+            self._update_rates(lines)
+
+    def _update_rates(self, lines: list) -> None:
+        """
+        Add sold order lines to the consumption rates.
+        """
+        with self._lock.exclusive():
+            rates = self._rate_index()
+            state = {}
+            for _, menu, _, jumlah, _, tanggal in lines:
+                waktu = parse_time(tanggal)
+                if menu in state:
+                    laju, sejak = state[menu]
+                elif menu in rates:
+                    record = rates[menu][1]
+                    laju, sejak = record["Laju"], record["Diperbarui"].to_pydatetime()
+                else:
+                    laju, sejak = 0.0, waktu
+                if waktu < sejak:
+                    # A sale older than the rate (e.g. an imported order)
+                    # counts as already decayed.
+                    laju += self._decay(jumlah / RATE_HOURS, waktu, sejak)
+                else:
+                    laju, sejak = self._decay(laju, sejak, waktu) + jumlah / RATE_HOURS, waktu
+                state[menu] = (laju, sejak)
+
+            updated = {}
+            added = []
+            for menu, (laju, waktu) in state.items():
+                row = [menu, laju, waktu.strftime(DATE_FORMAT)]
+                if menu in rates:
+                    updated[rates[menu][0]] = row[1:]
+                else:
+                    added.append(row)
+            if updated:
+                self._rates.update_many(updated, self._rate_columns[1:])
+            if added:
+                self._rates.add_data(added, self._rate_columns)
+
+    def record_edit(self, nama: str, sebelum: int, sesudah: int, alasan: str) -> None:
+        """
+        Log a change of stock made by hand, e.g. a delivery or a deleted item.
+
+        Args:
+            - nama (str): The name of the menu item.
+            - sebelum (int): The stock before the change.
+            - sesudah (int): The stock after the change.
+            - alasan (str): "tambah", "ubah" or "hapus".
+        """
+        if sebelum == sesudah:
+            return
+        self._ledger.add_data([[
+            datetime.now().strftime(DATE_FORMAT), nama, sesudah - sebelum, sesudah,
+            alasan, 0]], self._ledger_columns)
+
+    def rebuild(self) -> None:
+        """
+        Recompute the consumption rates from the transaction log, a chunk at
+        a time. The rate of an item is the sum of its sales, each decayed
+        from its time to now, which is what record_sales adds up one sale at
+        a time.
+        """
+        now = pd.Timestamp(datetime.now().replace(microsecond=0))
+        totals = pd.Series(dtype="float64")
+        for chunk in Rollup().iter_orders(columns=["Nama Menu", "Jumlah", "Tanggal"]):
+            hours = ((now - chunk["Tanggal"]).dt.total_seconds() / 3600).clip(lower=0)
+            weight = chunk["Jumlah"] * (-hours / RATE_HOURS).map(math.exp) / RATE_HOURS
+            totals = totals.add(
+                weight.groupby(chunk["Nama Menu"].astype(object)).sum(), fill_value=0.0)
+        with self._lock.exclusive():
+            self._rates.save_data(DataFrame({
+                "Nama Menu": totals.index.astype(object),
+                "Laju": totals.to_numpy(),
+                "Diperbarui": now,
+            }))
+
+    def rate(self, menu: str, now: datetime | None = None) -> float:
+        """
+        Get the consumption rate of a menu item.
+
+        Args:
+            - menu (str): The name of the menu item.
+            - now (datetime | None): The time of the rate, now if None.
+
+        Returns:
+            float: Items per hour, 0 if the item was never sold.
+        """
+        found = self._built_rates().get(menu)
+        if found is None:
+            return 0.0
+        record = found[1]
+        return self._decay(
+            record["Laju"], record["Diperbarui"].to_pydatetime(), now or datetime.now())
+
+    def low_stock(self, stock: dict, now: datetime | None = None) -> list:
+        """
+        Get the items that are sold out or run out within LOW_STOCK_HOURS.
+
+        Each item costs one lookup of its rate, however long the history.
+
+        Args:
+            - stock (dict): Maps each menu name to its stock.
+            - now (datetime | None): The time to check at, now if None.
+
+        Returns:
+            list: (menu name, stock, hours left) of every such item; hours
+                left is None for an item that is not being sold.
+        """
+        now = now or datetime.now()
+        alerts = []
+        for menu, sisa in stock.items():
+            laju = self.rate(menu, now)
+            hours = sisa / laju if laju > 0 else None
+            if sisa <= 0 or (hours is not None and hours < LOW_STOCK_HOURS):
+                alerts.append((menu, sisa, hours))
+        return alerts
+
+    def warning(self, stock: dict) -> str:
+        """
+        Describe the items that are sold out or run out soon.
+
+        Args:
+            - stock (dict): Maps each menu name to its stock.
+
+        Returns:
+            str: e.g. "Stok menipis: Soto (sisa 3, habis ± 2 jam), Sate (habis).",
+                or "" if no item runs out soon.
+        """
+        alerts = [
+            f"{menu} (habis)" if sisa <= 0 else f"{menu} (sisa {sisa}, habis ± {hours:.0f} jam)"
+            for menu, sisa, hours in self.low_stock(stock)]
+        return f"Stok menipis: {', '.join(alerts)}." if alerts else ""
+
+    def reorder(self, semua: bool = False, now: datetime | None = None) -> DataFrame:
+        """
+        Get the reorder report from the stock and the consumption rates.
+
+        Args:
+            - semua (bool): Every menu item, not only those to reorder.
+            - now (datetime | None): The time of the report, now if None.
+
+        Returns:
+            DataFrame: Nama Menu, Stok, Laju/Jam, Habis (Jam) and Pesan (the
+                quantity that lasts REORDER_HOURS), the items that run out
+                first at the top.
+        """
+        now = pd.Timestamp(now or datetime.now())
+        menu = self._menu.read_data(["Nama Menu", "Stok"])
+        menu = menu.astype({"Nama Menu": object, "Stok": "int64"})
+        if self._built_rates():
+            rates = self._rates.read_data(self._rate_columns).astype({"Nama Menu": object})
+            hours = ((now - rates["Diperbarui"]).dt.total_seconds() / 3600).clip(lower=0)
+            rates = rates.assign(Laju=rates["Laju"] * (-hours / RATE_HOURS).map(math.exp))
+            menu = menu.merge(rates[["Nama Menu", "Laju"]], on="Nama Menu", how="left")
+        else:
+            menu = menu.assign(Laju=0.0)
+        laju = menu["Laju"].fillna(0.0)
+        report = DataFrame({
+            "Nama Menu": menu["Nama Menu"],
+            "Stok": menu["Stok"],
+            "Laju/Jam": laju.round(2),
+            "Habis (Jam)": (menu["Stok"].clip(lower=0) / laju.where(laju > 0)).round(1),
+            "Pesan": (laju * REORDER_HOURS - menu["Stok"]).clip(lower=0).map(math.ceil),
+        })
+        if not semua:
+            report = report[
+                (report["Pesan"] > 0) | (report["Stok"] <= 0)
+                | (report["Habis (Jam)"] < LOW_STOCK_HOURS)]
+        return report.sort_values(
+            ["Habis (Jam)", "Nama Menu"], na_position="last", kind="stable").reset_index(drop=True)
+
+    def show_reorder(self, semua: bool = False, page_size: int | None = PAGE_SIZE) -> None:
+        """
+        Show the reorder report, a page at a time.
+
+        Args:
+            - semua (bool): Every menu item, not only those to reorder.
+            - page_size (int | None): Rows per page, or None to print every row.
+        """
+        if self._menu.is_data_empty():
+            print("Data masih kosong.")
+            return
+        report = self.reorder(semua)
+        if report.empty:
+            print("Tidak ada menu yang perlu dipesan.")
+            return
+        rows = (
+            ["-" if pd.isna(cell) else cell for cell in row]
+            for row in report.itertuples(index=False, name=None))
+        print_table(
+            list(report.columns), rows, align={"Nama Menu": "l"}, page_size=page_size)
@@ -0,0 +1,382 @@
+import atexit
+import json
+import os
+import threading
+import zlib
+import pandas as pd
+from .catalog import MenuCatalog
+from .db_controller import Controller
+from .inventory import Inventory
+from .locking import FileLock
+from .rollup import Rollup
+from .schema import DATE_FORMAT, TRANSACTION_SCHEMA
+
+# Save orders to the journal instead of rewriting data_menu and appending to
+# data_transaksi on every order. Off unless KASIR_JOURNAL=1.
+ENABLED = os.environ.get("KASIR_JOURNAL", "0") not in ("", "0")
+
+# Milliseconds the journal may go without an fsync. 0 syncs every commit;
+# with e.g. 20, commits within 20 ms share one fsync and a power loss can
+# lose at most the last 20 ms of orders.
+SYNC_MS = int(os.environ.get("KASIR_JOURNAL_SYNC_MS", "0"))
+
+# Orders kept in the journal before they are applied to the tables.
+CHECKPOINT = int(os.environ.get("KASIR_JOURNAL_CHECKPOINT", "200"))
+
+
+class Journal:
+    """
+    A class used to save orders to a write-ahead journal.
+
+    Every order is one line of data/journal.jsonl holding its stock taken
+    and its order lines, with a checksum, so it is saved whole or not at
+    all. A commit appends the lines of a group of orders with one write and
+    at most one fsync, instead of rewriting data_menu and appending to
+    data_transaksi. Stock checks subtract the stock taken by the orders
+    still in the journal.
+
+    A checkpoint applies the journal to the tables in one write per table
+    and starts a new, empty journal. The stock values it writes are stored
+    in data/journal.state first, so a checkpoint interrupted by a crash is
+    finished on the next start without applying any order twice.
+
+    Attributes:
+        - _views (dict): The orders still in each journal as read by this process, keyed by path.
+        - _started (set): The journals recovered by this process.
+        - _timers (dict): The pending delayed fsync of each journal, keyed by path.
+        - _data_path (str): The data directory.
+        - _path (str): The path to the journal.
+        - _state_path (str): The path to the checkpoint state.
+        - _lock (FileLock): Orders commits and checkpoints across terminals.
+
+    Methods:
+        - __init__(): Initializes the Journal class.
+        - lock(): Lock the journal, e.g. to check and commit orders atomically.
+        - pending_stock(): Get the stock taken by the orders still in the journal.
+        - highest(column: str): Get the largest value of a column in the orders still in the journal.
+        - commit(carts: list): Save accepted orders to the journal.
+        - checkpoint(): Apply the orders in the journal to the tables.
+        - recover(): Finish an interrupted checkpoint and apply the journal.
+    """
+
+    _views: dict = {}
+    _started: set = set()
+    _timers: dict = {}
+
+    def __init__(self) -> None:
+        menu = Controller("data_menu")
+        self._data_path = menu.get_data_path()
+        self._path = os.path.join(self._data_path, "journal.jsonl")
+        self._state_path = os.path.join(self._data_path, "journal.state")
+        self._lock = FileLock(self._data_path, "journal")
+        if not menu.is_dir_exists():
+            menu.create_dir()
+        if self._path not in Journal._started:
+            Journal._started.add(self._path)
+            self.recover()
+            atexit.register(self.checkpoint)
+
+    def lock(self):
+        """
+        Lock the journal. No other terminal commits or checkpoints meanwhile.
+        """
+        return self._lock.exclusive()
+
+    def _encode(self, record: dict) -> bytes:
+        """
+        Encode a record as one line: its CRC-32 in hex, a space, its JSON.
+        """
+        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        payload = payload.encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+    def _decode(self, line: bytes) -> dict | None:
+        """
+        Decode a line, or get None if it is torn or damaged.
+        """
+        if not line.endswith(b"\n") or line[8:9] != b" ":
+            return None
+        payload = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self._state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"applied": 0}
+
+    def _write_state(self, state: dict) -> None:
+        """
+        Store the checkpoint state atomically: write a temp file, then rename it.
+        """
+        temp = self._state_path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self._state_path)
+
+    def _view(self) -> dict:
+        """
+        Get the orders still in the journal, reading only what was appended
+        since the last call. A new journal (after a checkpoint) is a new
+        file, so it is read from the start.
+        """
+        view = Journal._views.get(self._path)
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            stat = None
+        inode, size = (None, 0) if stat is None else (stat.st_ino, stat.st_size)
+        if view is None or view["inode"] != inode or size < view["end"]:
+            view = Journal._views[self._path] = {
+                "inode": inode,
+                "end": 0,
+                "applied": self._read_state()["applied"],
+                "last": 0,
+                "records": [],
+                "stok": {},
+            }
+        if size == view["end"]:
+            return view
+
+        with open(self._path, "rb") as f:
+            f.seek(view["end"])
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    # A torn tail of a crashed commit; the next commit cuts it off.
+                    break
+                view["end"] += len(line)
+                view["last"] = max(view["last"], record["id"])
+                if record["id"] > view["applied"]:
+                    view["records"].append(record)
+                    for menu, jumlah in record["stok"].items():
+                        view["stok"][menu] = view["stok"].get(menu, 0) + jumlah
+        return view
+
+    def pending_stock(self) -> dict:
+        """
+        Get the stock taken by the orders still in the journal.
+
+        Returns:
+            dict: Maps each menu name to the quantity not yet taken from data_menu.
+        """
+        return dict(self._view()["stok"])
+
+    def highest(self, column: str) -> int:
+        """
+        Get the largest value of a data_transaksi column, e.g. No. Pembelian,
+        in the orders still in the journal.
+
+        Args:
+            - column (str): The column name.
+
+        Returns:
+            int: The largest value, or 0 if the journal is empty.
+        """
+        position = list(TRANSACTION_SCHEMA).index(column)
+        return max(
+            (line[position] for record in self._view()["records"] for line in record["lines"]),
+            default=0)
+
+    def commit(self, carts: list) -> None:
+        """
+        Save accepted orders to the journal with one write.
+
+        The caller holds lock() while checking the orders, so no other
+        terminal takes the same stock between the check and the commit.
+
+        Args:
+            - carts (list): The orders, each with its order number and time set.
+        """
+        with self._lock.exclusive():
+            view = self._view()
+            last = max(view["last"], view["applied"])
+            lines = b"".join(
+                self._encode({
+                    "id": last + i,
+                    "stok": cart.stock_taken(),
+                    "lines": cart.rows(),
+                })
+                for i, cart in enumerate(carts, start=1))
+            with open(self._path, "ab") as f:
+                if f.tell() > view["end"]:
+                    f.truncate(view["end"])
+                f.write(lines)
+                f.flush()
+                self._sync(f.fileno())
+            pending = len(self._view()["records"])
+        if pending >= CHECKPOINT:
+            self.checkpoint()
+
+    def _sync(self, fd: int) -> None:
+        """
+        fsync the journal now, or within SYNC_MS together with later commits.
+        """
+        if SYNC_MS <= 0:
+            os.fsync(fd)
+            return
+        if self._path not in Journal._timers:
+            timer = threading.Timer(SYNC_MS / 1000, self._delayed_sync)
+            timer.daemon = True
+            Journal._timers[self._path] = timer
+            timer.start()
+
+    def _delayed_sync(self) -> None:
+        with self._lock.exclusive():
+            Journal._timers.pop(self._path, None)
+            try:
+                with open(self._path, "rb") as f:
+                    os.fsync(f.fileno())
+            except FileNotFoundError:
+                pass
+
+    def _new_stock(self, stok: dict) -> dict:
+        """
+        Get the stock of every menu after taking the given quantities.
+        """
+        rows = Controller("data_menu").get_index("Nama Menu")
+        stock = {}
+        for menu, jumlah in stok.items():
+            found = rows.get(menu)
+            if found is not None:
+                stock[menu] = int(found[1]["Stok"]) - jumlah
+        return stock
+
+    def _write_stock(self, stock: dict) -> None:
+        menu = Controller("data_menu")
+        rows = menu.get_index("Nama Menu")
+        newdata = {rows[name][0]: value for name, value in stock.items() if name in rows}
+        if newdata:
+            MenuCatalog().update_stock(lambda: menu.update_many(newdata, "Stok"), stock)
+
+    def _start_over(self, applied: int) -> None:
+        """
+        Mark the journal applied up to an order and replace it with an empty one.
+        """
+        self._write_state({"applied": applied})
+        temp = self._path + ".tmp"
+        with open(temp, "wb") as f:
+            os.fsync(f.fileno())
+        os.replace(temp, self._path)
+        Journal._views.pop(self._path, None)
+
+    def _missing(self, controller: Controller, lines: list) -> list:
+        """
+        Get the order lines whose order number is not in a table yet.
+        """
+        if not lines or not controller.is_file_exists():
+            return lines
+        dates = pd.to_datetime([line[5] for line in lines], format=DATE_FORMAT)
+        saved = set()
+        for chunk in controller.iter_data(
+                columns=["No. Pembelian", "Tanggal"],
+                start=dates.min(),
+                end=dates.max() + pd.Timedelta(seconds=1)):
+            saved.update(chunk["No. Pembelian"].tolist())
+        return [line for line in lines if line[0] not in saved]
+
+    def checkpoint(self) -> int:
+        """
+        Apply the orders in the journal to the tables.
+
+        The stock is written as absolute values stored beforehand in the
+        checkpoint state, the order lines are appended once, the report
+        totals and the inventory ledger are updated, then the journal starts
+        over.
+
+        Returns:
+            int: The number of orders applied.
+        """
+        with self._lock.exclusive():
+            view = self._view()
+            records = view["records"]
+            if not records:
+                return 0
+            menu = Controller("data_menu")
+            if menu._writer == "queue":
+                # The writer process takes the menu lock to save, so it
+                # can't be held here; the stock is taken relatively instead,
+                # which keeps a menu edit made in between.
+                stock = self._new_stock(view["stok"])
+                self._write_state({
+                    "applied": view["applied"],
+                    "applying": view["last"],
+                    "stok": stock,
+                })
+                MenuCatalog().update_stock(
+                    lambda: menu.adjust_many(
+                        {name: -jumlah for name, jumlah in view["stok"].items()},
+                        "Stok", "Nama Menu"),
+                    view["stok"])
+            else:
+                with menu._lock.exclusive():
+                    stock = self._new_stock(view["stok"])
+                    self._write_state({
+                        "applied": view["applied"],
+                        "applying": view["last"],
+                        "stok": stock,
+                    })
+                    self._write_stock(stock)
+            lines = [line for record in records for line in record["lines"]]
+            Controller("data_transaksi").add_data(lines, list(TRANSACTION_SCHEMA))
+            Inventory().record_sales(lines, stock)
+            Rollup().add_orders(pd.DataFrame(lines, columns=list(TRANSACTION_SCHEMA)))
+            self._start_over(view["last"])
+            return len(records)
+
+    def recover(self) -> int:
+        """
+        Finish a checkpoint interrupted by a crash, then apply the journal.
+
+        The stored stock values are written again and only the order lines
+        missing from data_transaksi and the inventory ledger are appended;
+        the consumption rates and report totals are then recomputed from
+        the log.
+
+        Returns:
+            int: The number of orders applied.
+        """
+        with self._lock.exclusive():
+            state = self._read_state()
+            if "applying" not in state:
+                return self.checkpoint()
+
+            self._write_stock(state["stok"])
+            records = [
+                record for record in self._view()["records"]
+                if record["id"] <= state["applying"]]
+            lines = [line for record in records for line in record["lines"]]
+            transaksi = Controller("data_transaksi")
+            missing = self._missing(transaksi, lines)
+            if missing:
+                transaksi.add_data(missing, list(TRANSACTION_SCHEMA))
+            missing = self._missing(Controller("data_stok"), lines)
+            if missing:
+                Inventory().record_sales(missing, state["stok"], update_rates=False)
+            # Whether the rates were updated before the crash can't be told
+            # from the ledger, so they are rebuilt like the report totals.
+            Inventory().rebuild()
+            Rollup().rebuild()
+            self._write_state({"applied": state["applying"]})
+            Journal._views.pop(self._path, None)
+            return len(records) + self.checkpoint()
+
+
+def checkpoint() -> int:
+    """
+    Apply the journal to the tables before they are read, if it is enabled.
+
+    Returns:
+        int: The number of orders applied.
+    """
+    if not ENABLED:
+        return 0
+    return Journal().checkpoint()
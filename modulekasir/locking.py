@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    A class used to lock a data file between processes.
+
+    Readers take a shared lock and writers an exclusive lock on a
+    "<name>.lock" file next to the data. Within one process the locks are
+    re-entrant, so a writer can read the data it is about to change. On
+    Windows every lock is exclusive.
+
+    Attributes:
+        - _held (dict): Locks held by this process, keyed by path.
+        - _thread_locks (dict): One RLock per path to order threads in this process.
+        - _guard (threading.Lock): Protects _thread_locks.
+        - _path (str): The path to the lock file.
+
+    Methods:
+        - __init__(data_path: str, name: str): Initializes the FileLock class.
+        - shared(): Lock for reading.
+        - exclusive(): Lock for writing.
+    """
+
+    _held: dict = {}
+    _thread_locks: dict = {}
+    _guard = threading.Lock()
+
+    def __init__(self, data_path: str, name: str) -> None:
+        self._path = os.path.join(data_path, name + ".lock")
+
+    def shared(self):
+        """
+        Lock for reading. Other readers may hold the lock at the same time.
+        """
+        return self._acquire(exclusive=False)
+
+    def exclusive(self):
+        """
+        Lock for writing. No other reader or writer may hold the lock.
+        """
+        return self._acquire(exclusive=True)
+
+    def _lock(self, fd: int, exclusive: bool) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            return
+        while True:
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.01)
+
+    def _unlock(self, fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def _acquire(self, exclusive: bool):
+        with FileLock._guard:
+            thread_lock = FileLock._thread_locks.setdefault(
+                self._path, threading.RLock())
+
+        with thread_lock:
+            held = FileLock._held.get(self._path)
+            if held is not None:
+                upgrade = exclusive and not held["exclusive"]
+                if upgrade:
+                    self._lock(held["fd"], True)
+                    held["exclusive"] = True
+                try:
+                    yield
+                finally:
+                    if upgrade:
+                        self._lock(held["fd"], False)
+                        held["exclusive"] = False
+                return
+
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT)
+            try:
+                self._lock(fd, exclusive)
+                FileLock._held[self._path] = {"fd": fd, "exclusive": exclusive}
+                try:
+                    yield
+                finally:
+                    del FileLock._held[self._path]
+                    self._unlock(fd)
+            finally:
+                os.close(fd)
@@ -0,0 +1,327 @@
+"""
+Optional timings of Controller operations and storage I/O.
+
+Turn it on with KASIR_METRICS=1 (a report is printed when the program
+exits), or with KASIR_METRICS_LOG=<file> to also stream one JSON line per
+call. From code use Metrics.enable(), Metrics.snapshot() and
+Metrics.report(). When it is off every instrumented call costs one flag check.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+
+
+class Metrics:
+    """
+    A class used to collect call counts, time, bytes and rows per table.
+
+    Controller operations are recorded as e.g. ("data_menu", "add_data"),
+    the storage I/O they cause as ("data_menu", "storage.append"). The time
+    of an operation includes its storage I/O, so the difference is the
+    pandas work.
+
+    Attributes:
+        - enabled (bool): Whether calls are recorded.
+        - _stats (dict): Counters keyed by (table, operation).
+        - _log (file | None): Where each call is streamed to, if anywhere.
+
+    Methods:
+        - enable(log_path: str | None, report_at_exit: bool): Start recording.
+        - disable(): Stop recording.
+        - reset(): Drop the recorded counters.
+        - record(table: str, operation: str, seconds: float): Add one call.
+        - snapshot(): Get the counters and the cache hits.
+        - report(): Format the counters as a table.
+        - dump(path: str): Write the counters as JSON.
+    """
+
+    enabled = False
+    _stats: dict = {}
+    _log = None
+    _report_registered = False
+
+    @classmethod
+    def enable(cls, log_path: str | None = None, report_at_exit: bool = False) -> None:
+        """
+        Start recording.
+
+        Args:
+            - log_path (str | None): Append one JSON line per call to this file.
+            - report_at_exit (bool): Print the report to stderr when the program exits.
+        """
+        if log_path and cls._log is None:
+            cls._log = open(log_path, "a", buffering=1)
+        if report_at_exit and not cls._report_registered:
+            atexit.register(lambda: print(cls.report(), file=sys.stderr))
+            cls._report_registered = True
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls) -> None:
+        """
+        Stop recording and close the log file.
+        """
+        cls.enabled = False
+        if cls._log is not None:
+            cls._log.close()
+            cls._log = None
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drop the recorded counters.
+        """
+        cls._stats.clear()
+
+    @classmethod
+    def record(
+            cls,
+            table: str,
+            operation: str,
+            seconds: float,
+            bytes_read: int = 0,
+            bytes_written: int = 0,
+            rows: int = 0) -> None:
+        """
+        Add one call to the counters.
+
+        Args:
+            - table (str): The name of the table.
+            - operation (str): The name of the operation.
+            - seconds (float): The wall time of the call.
+            - bytes_read (int): Bytes read from disk.
+            - bytes_written (int): Bytes written to disk.
+            - rows (int): Rows read or written.
+        """
+        stats = cls._stats.get((table, operation))
+        if stats is None:
+            stats = cls._stats[(table, operation)] = {
+                "calls": 0,
+                "seconds": 0.0,
+                "max_seconds": 0.0,
+                "bytes_read": 0,
+                "bytes_written": 0,
+                "rows": 0,
+            }
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["bytes_read"] += bytes_read
+        stats["bytes_written"] += bytes_written
+        stats["rows"] += rows
+        if cls._log is not None:
+            cls._log.write(json.dumps({
+                "time": round(time.time(), 6),
+                "table": table,
+                "operation": operation,
+                "ms": round(seconds * 1000, 3),
+                "bytes_read": bytes_read,
+                "bytes_written": bytes_written,
+                "rows": rows,
+            }) + "\n")
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """
+        Get the counters and the cache hits.
+
+        Returns:
+            dict: {"tables": {table: {operation: counters}}, "cache": {filename: hits/misses}}.
+        """
+        from .db_controller import Controller
+
+        tables = {}
+        for (table, operation), stats in sorted(cls._stats.items()):
+            tables.setdefault(table, {})[operation] = dict(stats)
+        return {"tables": tables, "cache": Controller.cache_info()}
+
+    @classmethod
+    def report(cls) -> str:
+        """
+        Format the counters as a table, slowest operations first.
+
+        Returns:
+            str: The report.
+        """
+        from prettytable import PrettyTable
+
+        table = PrettyTable()
+        table.field_names = [
+            "Tabel", "Operasi", "Panggilan", "Total ms", "Rata-rata ms",
+            "Maks ms", "Byte baca", "Byte tulis", "Baris"]
+        for column in table.field_names[2:]:
+            table.align[column] = "r"
+        for (name, operation), stats in sorted(
+                cls._stats.items(), key=lambda item: -item[1]["seconds"]):
+            table.add_row([
+                name,
+                operation,
+                stats["calls"],
+                f"{stats['seconds'] * 1000:.1f}",
+                f"{stats['seconds'] * 1000 / stats['calls']:.2f}",
+                f"{stats['max_seconds'] * 1000:.1f}",
+                stats["bytes_read"],
+                stats["bytes_written"],
+                stats["rows"]])
+
+        cache = PrettyTable()
+        cache.field_names = ["File", "Cache hit", "Cache miss"]
+        for filename, stats in cls.snapshot()["cache"].items():
+            cache.add_row([filename, stats["hits"], stats["misses"]])
+        return f"{table}\n{cache}"
+
+    @classmethod
+    def dump(cls, path: str) -> None:
+        """
+        Write the counters as JSON.
+
+        Args:
+            - path (str): The file to write.
+        """
+        with open(path, "w") as f:
+            json.dump(cls.snapshot(), f, indent=2)
+
+
+def instrumented(function):
+    """
+    Record the calls of a Controller method when Metrics is enabled.
+    """
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        if not Metrics.enabled:
+            return function(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            Metrics.record(self.name, function.__name__, time.perf_counter() - started)
+    return wrapper
+
+
+class InstrumentedStorage:
+    """
+    A class used to record the I/O of a storage backend when Metrics is enabled.
+
+    Everything else is passed through to the wrapped backend. Byte counts
+    come from file sizes, so with sqlite, where all tables share one file,
+    they are only rough.
+
+    Attributes:
+        - _storage (Storage): The wrapped backend.
+
+    Methods:
+        - __init__(storage: Storage): Initializes the InstrumentedStorage class.
+        - read(columns), read_range(columns, start, end): Record bytes and rows read.
+        - iter_chunks(columns, chunksize), iter_range(columns, start, end, chunksize):
+          Record the rows of every chunk and the bytes of the scan.
+        - append(data), write(data), update(data, indexes), delete(data, index):
+          Record bytes and rows written.
+        - upsert(data, keys), remove(data): Record the change log records of a keyed table.
+    """
+
+    def __init__(self, storage) -> None:
+        self._storage = storage
+
+    def __getattr__(self, name: str):
+        return getattr(self._storage, name)
+
+    def _read(self, operation: str, function, args: tuple, start=None, end=None):
+        if not Metrics.enabled:
+            return function(*args)
+        started = time.perf_counter()
+        data = function(*args)
+        Metrics.record(
+            self._storage.name,
+            operation,
+            time.perf_counter() - started,
+            bytes_read=self._storage.size(start, end),
+            rows=len(data))
+        return data
+
+    def _iterate(self, operation: str, chunks, start=None, end=None):
+        """
+        Pass the chunks of a scan through, recording each as one call. The
+        time is that spent reading the chunk, not the caller's work on it;
+        the bytes of the file are counted with the first chunk.
+        """
+        if not Metrics.enabled:
+            yield from chunks
+            return
+        bytes_read = self._storage.size(start, end)
+        try:
+            while True:
+                started = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                Metrics.record(
+                    self._storage.name,
+                    operation,
+                    time.perf_counter() - started,
+                    bytes_read=bytes_read,
+                    rows=len(chunk))
+                bytes_read = 0
+                yield chunk
+        finally:
+            chunks.close()
+
+    def _write(self, operation: str, function, rows: int, *args) -> None:
+        if not Metrics.enabled:
+            function(*args)
+            return
+        before = self._storage.size()
+        started = time.perf_counter()
+        function(*args)
+        seconds = time.perf_counter() - started
+        after = self._storage.size()
+        # An append writes the growth, a rewrite writes the whole new file.
+        appends = ("storage.append", "storage.upsert", "storage.remove")
+        written = after - before if operation in appends else after
+        Metrics.record(
+            self._storage.name,
+            operation,
+            seconds,
+            bytes_written=max(written, 0),
+            rows=rows)
+
+    def read(self, columns: list | None = None):
+        return self._read("storage.read", self._storage.read, (columns,))
+
+    def read_range(self, columns: list | None = None, start=None, end=None):
+        return self._read(
+            "storage.read_range", self._storage.read_range,
+            (columns, start, end), start, end)
+
+    def iter_chunks(self, columns: list | None = None, chunksize: int = 1000):
+        return self._iterate(
+            "storage.iter_chunks", self._storage.iter_chunks(columns, chunksize))
+
+    def iter_range(self, columns: list | None = None, start=None, end=None, chunksize: int = 1000):
+        return self._iterate(
+            "storage.iter_range", self._storage.iter_range(columns, start, end, chunksize),
+            start, end)
+
+    def append(self, data) -> None:
+        self._write("storage.append", self._storage.append, len(data), data)
+
+    def write(self, data) -> None:
+        self._write("storage.write", self._storage.write, len(data), data)
+
+    def update(self, data, indexes: list) -> None:
+        self._write("storage.update", self._storage.update, len(indexes), data, indexes)
+
+    def delete(self, data, index: int) -> None:
+        self._write("storage.delete", self._storage.delete, 1, data, index)
+
+    def upsert(self, data, keys: list) -> None:
+        self._write("storage.upsert", self._storage.upsert, len(data), data, keys)
+
+    def remove(self, data) -> None:
+        self._write("storage.remove", self._storage.remove, len(data), data)
+
+
+if os.environ.get("KASIR_METRICS", "0") not in ("", "0") or os.environ.get("KASIR_METRICS_LOG"):
+    Metrics.enable(os.environ.get("KASIR_METRICS_LOG"), report_at_exit=True)
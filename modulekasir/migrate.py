@@ -0,0 +1,27 @@
+import os
+import sys
+from .cli import data_path as get_data_path
+from .storage import STORAGE_BACKENDS, migrate_csv
+
+
+def main() -> None:
+    """
+    Copy the CSV tables in the data directory (KASIR_DATA_DIR or data/)
+    into another storage backend.
+
+    Usage: python -m modulekasir.migrate [sqlite|parquet]
+    """
+    data_path = get_data_path()
+    backend = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+    if backend not in STORAGE_BACKENDS or backend == "csv":
+        print("Penggunaan: python -m modulekasir.migrate [sqlite|parquet]")
+        sys.exit(1)
+    if not os.path.isdir(data_path):
+        print("Direktori data tidak ditemukan!")
+        sys.exit(1)
+    for name in migrate_csv(data_path, backend):
+        print(f"{name}.csv -> {backend} ({name})")
+
+
+if __name__ == "__main__":
+    main()
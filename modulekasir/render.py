@@ -0,0 +1,113 @@
+"""
+Plain text tables in the PrettyTable style.
+
+PrettyTable measures every cell with wcwidth, which is slow to import and
+to run, and needs every row before it prints anything. Here plain ASCII
+cells are measured with len(), and print_table() streams rows page by page
+with column widths estimated from the first rows.
+"""
+from itertools import islice
+from typing import Iterable
+
+# Rows per page when a table is shown to someone at the terminal.
+PAGE_SIZE = 20
+
+
+def _width(cell: str) -> int:
+    """
+    Get the number of terminal columns a cell takes.
+    """
+    if cell.isascii() and cell.isprintable():
+        return len(cell)
+    import wcwidth
+
+    width = wcwidth.wcswidth(cell)
+    return width if width >= 0 else len(cell)
+
+
+def _justify(text: str, width: int, align: str) -> str:
+    margin = width - _width(text)
+    if margin <= 0:
+        return text
+    if align == "l":
+        return text + " " * margin
+    if align == "r":
+        return " " * margin + text
+    # The same split as str.center.
+    left = margin // 2 + (margin & width & 1)
+    return " " * left + text + " " * (margin - left)
+
+
+def _border(widths: list) -> str:
+    return "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+
+
+def _line(cells: list, widths: list, sides: list) -> str:
+    return "|" + "|".join(
+        f" {_justify(cell, width, side)} "
+        for cell, width, side in zip(cells, widths, sides)) + "|"
+
+
+def print_table(
+        field_names: list,
+        rows: Iterable,
+        align: dict | None = None,
+        page_size: int | None = None,
+        sample: int = 200,
+        ask=input) -> int:
+    """
+    Print rows as a PrettyTable-style table while they are still being read.
+
+    Rows are printed a block at a time (a page, or sample rows without
+    pages). Column widths are estimated from the first block; a later block
+    that doesn't fit widens the columns and repeats the header. With a page
+    size the user is asked before each next page and can stop with q (or
+    end of input).
+
+    Args:
+        - field_names (list): The column names.
+        - rows (Iterable): The rows, one list of values per row. May be a generator.
+        - align (dict | None): Maps a column name to "l", "c" or "r". Defaults to "c".
+        - page_size (int | None): Rows per page, or None to print without stopping.
+        - sample (int): Rows per block when printing without pages.
+        - ask: Reads the answer at the end of a page.
+
+    Returns:
+        int: The number of rows printed.
+    """
+    align = align or {}
+    header = [str(name) for name in field_names]
+    sides = [align.get(name, "c") for name in field_names]
+    rows = iter(rows)
+    size = page_size or sample
+
+    widths = [_width(name) for name in header]
+    block = [[str(value) for value in row] for row in islice(rows, size)]
+    printed = 0
+    first = True
+    while first or block:
+        old_widths = widths
+        for cells in block:
+            widths = [max(width, _width(cell)) for width, cell in zip(widths, cells)]
+
+        lines = []
+        if page_size or first or widths != old_widths:
+            if not page_size and not first:
+                lines.append(_border(old_widths))
+            lines.extend([_border(widths), _line(header, widths, sides), _border(widths)])
+        lines.extend(_line(cells, widths, sides) for cells in block)
+        printed += len(block)
+
+        block = [[str(value) for value in row] for row in islice(rows, size)]
+        if page_size or not block:
+            lines.append(_border(widths))
+        print("\n".join(lines))
+        first = False
+        if page_size and block:
+            try:
+                answer = ask(f"-- {printed} baris, Enter untuk lanjut, q untuk berhenti -- ")
+            except EOFError:
+                break
+            if answer.strip().lower() == "q":
+                break
+    return printed
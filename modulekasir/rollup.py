@@ -0,0 +1,333 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator
+import pandas as pd
+from pandas import DataFrame
+from .db_controller import Controller
+from .schema import DATE_FORMAT
+
+# Rows of the transaction log held in memory at once by rebuilds, reports
+# and exports. Lower it with KASIR_CHUNKSIZE on a small machine.
+CHUNKSIZE = int(os.environ.get("KASIR_CHUNKSIZE", "50000"))
+
+# Processes that summarize transaction partitions side by side. Set
+# KASIR_WORKERS=1 to summarize in this process only.
+WORKERS = int(os.environ.get("KASIR_WORKERS", "0")) or os.cpu_count() or 1
+
+# Bytes of transaction log below which summarize stays in this process;
+# handing a small log to other processes costs more than it saves.
+PARALLEL_BYTES = int(os.environ.get("KASIR_PARALLEL_BYTES", str(64 * 2**20)))
+
+
+class Rollup:
+    """
+    A class used to maintain revenue totals per day and per menu.
+
+    The totals are updated with every saved order, so reports read a table
+    of size O(days + menu items) instead of the whole transaction log.
+
+    Attributes:
+        - _pools (dict): The worker processes of summarize, kept for the next call, keyed by their number.
+        - _daily (Controller): An instance of the Controller class for the daily totals.
+        - _per_menu (Controller): An instance of the Controller class for the per-menu totals.
+        - _transaction (Controller): An instance of the Controller class for the transaction log.
+        - _daily_columns (list): A list of column names of the daily totals.
+        - _menu_columns (list): A list of column names of the per-menu totals.
+
+    Methods:
+        - __init__(): Initializes the Rollup class.
+        - is_built(): Check if the rollup files exist.
+        - add_orders(orders: DataFrame): Add saved orders to the totals.
+        - iter_orders(start, end, chunksize: int): Read the transaction log a chunk at a time, never splitting an order.
+        - summarize(start, end, chunksize: int, workers: int): Compute daily and per-menu totals a chunk at a time, one process per partition.
+        - rebuild(): Recompute the totals from the transaction log.
+        - get_daily(): Get the daily totals.
+        - get_per_menu(): Get the per-menu totals.
+    """
+
+    _pools: dict = {}
+
+    def __init__(self) -> None:
+        self._daily = Controller("rekap_harian")
+        self._per_menu = Controller("rekap_menu")
+        self._transaction = Controller("data_transaksi")
+        self._daily_columns = [
+            "Tanggal",
+            "No. Pembelian",
+            "Jumlah",
+            "Total",
+            "Jumlah Order"]
+        self._menu_columns = [
+            "Nama Menu",
+            "Jumlah",
+            "Total",
+            "Jumlah Order"]
+
+    def is_built(self) -> bool:
+        """
+        Check if the rollup files exist.
+
+        Returns:
+            bool: True if both rollup files exist, False otherwise.
+        """
+        return self._daily.is_file_exists() and self._per_menu.is_file_exists()
+
+    def _summarize(self, orders: DataFrame) -> tuple[DataFrame, DataFrame]:
+        """
+        Compute daily and per-menu totals of a set of order lines.
+
+        Args:
+            - orders (DataFrame): Order lines with the data_transaksi columns.
+
+        Returns:
+            tuple: The daily totals and the per-menu totals.
+        """
+        tanggal = orders["Tanggal"]
+        if not pd.api.types.is_datetime64_any_dtype(tanggal):
+            tanggal = pd.to_datetime(tanggal, format=DATE_FORMAT)
+        # Sums of int32 columns could overflow, so the totals use int64.
+        orders = orders.assign(
+            Tanggal=tanggal.dt.strftime("%d-%m-%Y"),
+            Jumlah=orders["Jumlah"].astype("int64"),
+            Total=orders["Total"].astype("int64"))
+        daily = orders.groupby(by="Tanggal", sort=False).agg(**{
+            "No. Pembelian": ("No. Pembelian", "min"),
+            "Jumlah": ("Jumlah", "sum"),
+            "Total": ("Total", "sum"),
+            "Jumlah Order": ("No. Pembelian", "nunique"),
+        }).reset_index()
+        per_menu = orders.groupby(
+                by="Nama Menu", sort=False, observed=True).agg(**{
+            "Jumlah": ("Jumlah", "sum"),
+            "Total": ("Total", "sum"),
+            "Jumlah Order": ("No. Pembelian", "nunique"),
+        }).reset_index()
+        return daily, per_menu
+
+    def _aggregation(self, columns_name: list) -> dict:
+        """
+        Get how the totals of two summaries with these columns are combined:
+        the first order number is the smaller one, everything else is added.
+        """
+        return {
+            column: "min" if column == "No. Pembelian" else "sum"
+            for column in columns_name[1:]}
+
+    def _merge(
+            self,
+            controller: Controller,
+            columns_name: list,
+            summary: DataFrame) -> None:
+        """
+        Add a summary to the totals stored by a controller.
+
+        Args:
+            - controller (Controller): The controller of the rollup file.
+            - columns_name (list): The column names of the rollup file.
+            - summary (DataFrame): The totals to add.
+        """
+        controller.accumulate(
+            summary[columns_name].values.tolist(), columns_name,
+            self._aggregation(columns_name))
+
+    def add_orders(self, orders: DataFrame) -> None:
+        """
+        Add saved orders to the totals.
+
+        Args:
+            - orders (DataFrame): Order lines with the data_transaksi columns.
+        """
+        if not self.is_built():
+            self.rebuild()
+            return
+        if orders.empty:
+            return
+        daily, per_menu = self._summarize(orders)
+        self._merge(self._daily, self._daily_columns, daily)
+        self._merge(self._per_menu, self._menu_columns, per_menu)
+
+    def iter_orders(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None,
+            chunksize: int = CHUNKSIZE,
+            columns: list | None = None) -> Iterator[DataFrame]:
+        """
+        Read the transaction log a chunk at a time, never splitting an order.
+
+        The lines of an order are saved together, so the lines of the last
+        order of a chunk are held back and read with the next chunk. Counts
+        of distinct orders can then be added up chunk by chunk.
+
+        Args:
+            - start (Timestamp | None): Only lines at or after this time.
+            - end (Timestamp | None): Only lines before this time.
+            - chunksize (int): About how many lines are held in memory at once,
+              plus the lines of the order held back.
+            - columns (list | None): Only these columns. "No. Pembelian" is always read.
+
+        Yields:
+            DataFrame: The lines of one or more whole orders.
+        """
+        if not self._transaction.is_file_exists():
+            return
+        if columns is not None and "No. Pembelian" not in columns:
+            columns = ["No. Pembelian"] + list(columns)
+        pending = None
+        for chunk in self._transaction.iter_data(
+                chunksize=chunksize, columns=columns, start=start, end=end):
+            if pending is not None:
+                chunk = pd.concat([pending, chunk])
+            last = chunk["No. Pembelian"].iloc[-1]
+            tail = (chunk["No. Pembelian"] == last).to_numpy()
+            if tail.all():
+                pending = chunk
+                continue
+            pending = chunk[tail]
+            yield chunk[~tail]
+        if pending is not None:
+            yield pending
+
+    def summarize(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None,
+            chunksize: int = CHUNKSIZE,
+            workers: int = WORKERS) -> tuple[DataFrame, DataFrame]:
+        """
+        Compute daily and per-menu totals of the transaction log a chunk at a time.
+
+        Only one chunk and the totals so far are in memory, so the log may
+        be larger than the machine's memory. A range of at least
+        PARALLEL_BYTES that spans several partitions is split between up to
+        workers processes, one partition at a time; an order is saved with
+        one timestamp, so it never spans two partitions and the partial
+        totals add up like chunks do. The processes are started once and
+        kept for later calls.
+
+        Args:
+            - start (Timestamp | None): Only lines at or after this time.
+            - end (Timestamp | None): Only lines before this time.
+            - chunksize (int): About how many lines each process holds in memory at once.
+            - workers (int): The most processes to use.
+
+        Returns:
+            tuple: The daily totals, oldest day first, and the per-menu totals.
+        """
+        pieces = self._transaction.split_range(start, end)
+        if (workers > 1 and len(pieces) > 1
+                and self._transaction.size(start, end) >= PARALLEL_BYTES):
+            settings = {
+                name: value for name, value in os.environ.items()
+                if name.startswith("KASIR_")}
+            summaries = list(self._pool(workers).map(
+                _scan_piece, pieces, repeat(chunksize), repeat(settings)))
+        else:
+            summaries = [self._scan(start, end, chunksize)]
+
+        daily = DataFrame(columns=self._daily_columns)
+        per_menu = DataFrame(columns=self._menu_columns)
+        for piece_daily, piece_menu in summaries:
+            daily = self._combine(daily, piece_daily)
+            per_menu = self._combine(per_menu, piece_menu)
+
+        if not daily.empty:
+            order = pd.to_datetime(daily["Tanggal"], format="%d-%m-%Y").argsort()
+            daily = daily.iloc[order].reset_index(drop=True)
+        return daily[self._daily_columns], per_menu[self._menu_columns]
+
+    @classmethod
+    def _pool(cls, workers: int) -> ProcessPoolExecutor:
+        """
+        Get the pool of worker processes, starting it on first use.
+
+        The workers are spawned rather than forked: this process may run
+        other threads, e.g. the server's, whose locks a fork would copy.
+        """
+        pool = cls._pools.get(workers)
+        if pool is None:
+            pool = cls._pools[workers] = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(pool.shutdown)
+        return pool
+
+    def _scan(
+            self,
+            start: pd.Timestamp | None,
+            end: pd.Timestamp | None,
+            chunksize: int) -> tuple[DataFrame, DataFrame]:
+        """
+        Add up the daily and per-menu totals of a range in this process.
+        """
+        daily = DataFrame(columns=self._daily_columns)
+        per_menu = DataFrame(columns=self._menu_columns)
+        for orders in self.iter_orders(
+                start, end, chunksize,
+                ["Nama Menu", "Jumlah", "Total", "Tanggal"]):
+            chunk_daily, chunk_menu = self._summarize(orders)
+            daily = self._combine(daily, chunk_daily)
+            per_menu = self._combine(per_menu, chunk_menu)
+        return daily, per_menu
+
+    def _combine(
+            self,
+            totals: DataFrame,
+            summary: DataFrame) -> DataFrame:
+        """
+        Add the totals of one chunk or partition to the totals so far.
+        """
+        if totals.empty:
+            return summary
+        if summary.empty:
+            return totals
+        key = totals.columns[0]
+        summary = summary.astype({key: object})
+        return pd.concat([totals.astype({key: object}), summary]).groupby(
+            by=key, sort=False).agg(self._aggregation(list(totals.columns))).reset_index()
+
+    def rebuild(self) -> None:
+        """
+        Recompute the totals from the transaction log, a chunk at a time.
+        """
+        daily, per_menu = self.summarize()
+        self._daily.save_data(daily[self._daily_columns])
+        self._per_menu.save_data(per_menu[self._menu_columns])
+
+    def get_daily(self) -> DataFrame:
+        """
+        Get the daily totals.
+
+        Returns:
+            DataFrame: One row per day with the first order number, quantity,
+                revenue and number of orders.
+        """
+        if not self.is_built():
+            self.rebuild()
+        return self._daily.read_data(self._daily_columns)
+
+    def get_per_menu(self) -> DataFrame:
+        """
+        Get the per-menu totals.
+
+        Returns:
+            DataFrame: One row per menu item with quantity, revenue and number
+                of orders.
+        """
+        if not self.is_built():
+            self.rebuild()
+        return self._per_menu.read_data(self._menu_columns)
+
+
+def _scan_piece(piece: tuple, chunksize: int, settings: dict) -> tuple[DataFrame, DataFrame]:
+    """
+    Add up the totals of one (start, end) piece in a worker process, with
+    the KASIR_* settings of the process that asked for them.
+    """
+    for name in [name for name in os.environ if name.startswith("KASIR_")]:
+        del os.environ[name]
+    os.environ.update(settings)
+    start, end = piece
+    return Rollup()._scan(start, end, chunksize)
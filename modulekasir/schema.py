@@ -0,0 +1,130 @@
+"""
+Declared column types of the data tables.
+
+The Controller class casts every table with a schema to these types on read
+and write, and InputData and Transaction take their column names from them.
+"""
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+DATE_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+# Money columns are int64: a line total like 15000 x 200000 doesn't fit an
+# int32, and a cast to one would wrap around without an error.
+MENU_SCHEMA = {
+    "Nama Menu": "category",
+    "Jenis Menu": "category",
+    "Harga": "int64",
+    "Stok": "int32",
+}
+
+TRANSACTION_SCHEMA = {
+    "No. Pembelian": "int32",
+    "Nama Menu": "category",
+    "Harga": "int64",
+    "Jumlah": "int32",
+    "Total": "int64",
+    "Tanggal": "datetime64[ns]",
+}
+
+# One row per change of stock. No. Pembelian is 0 for changes made by hand.
+STOCK_LEDGER_SCHEMA = {
+    "Tanggal": "datetime64[ns]",
+    "Nama Menu": "category",
+    "Perubahan": "int32",
+    "Sisa": "int32",
+    "Alasan": "category",
+    "No. Pembelian": "int32",
+}
+
+# The consumption rate of every menu item, in items per hour as of Diperbarui.
+CONSUMPTION_SCHEMA = {
+    "Nama Menu": "category",
+    "Laju": "float64",
+    "Diperbarui": "datetime64[ns]",
+}
+
+TABLE_SCHEMAS = {
+    "data_menu": MENU_SCHEMA,
+    "data_transaksi": TRANSACTION_SCHEMA,
+    "data_stok": STOCK_LEDGER_SCHEMA,
+    "rekap_stok": CONSUMPTION_SCHEMA,
+}
+
+# Tables that are split into date partitions, and the column that picks one.
+PARTITIONED_TABLES = {
+    "data_transaksi": "Tanggal",
+    "data_stok": "Tanggal",
+}
+
+# Tables whose rows are changed by key through a change log, and the key.
+# Transactions, stock changes and the report already name a menu this way.
+KEYED_TABLES = {
+    "data_menu": "Nama Menu",
+    "rekap_stok": "Nama Menu",
+}
+
+
+def is_datetime_type(dtype: str) -> bool:
+    """
+    Check if a declared column type is a timestamp.
+
+    Args:
+        - dtype (str): The declared column type.
+
+    Returns:
+        bool: True if the type is a datetime64 type, False otherwise.
+    """
+    return dtype.startswith("datetime64")
+
+
+def check_range(values: pd.Series, dtype: str) -> None:
+    """
+    Check that the values of a column fit the integer type they are cast to.
+
+    Args:
+        - values (Series): The values to cast.
+        - dtype (str): The declared column type.
+
+    Raises:
+        ValueError: If a value is out of the range of an integer type.
+    """
+    if not dtype.startswith("int") or not pd.api.types.is_numeric_dtype(values):
+        return
+    limits = np.iinfo(dtype)
+    if values.size and (values.min() < limits.min or values.max() > limits.max):
+        raise ValueError(f"Nilai kolom {values.name} melebihi batas {dtype}!")
+
+
+def apply_schema(data: DataFrame, schema: dict | None) -> DataFrame:
+    """
+    Cast the columns of a DataFrame to their declared types.
+
+    Timestamps stored as text are parsed with DATE_FORMAT. Columns that are
+    not in the schema, and schema columns missing from data, are left alone.
+    A value that doesn't fit its integer type raises a ValueError instead of
+    wrapping around.
+
+    Args:
+        - data (DataFrame): The data to cast.
+        - schema (dict | None): The declared column types.
+
+    Returns:
+        DataFrame: The cast data.
+    """
+    if not schema:
+        return data
+
+    types = {}
+    for column, dtype in schema.items():
+        if column not in data.columns:
+            continue
+        if is_datetime_type(dtype):
+            if not pd.api.types.is_datetime64_any_dtype(data[column]):
+                data = data.assign(**{
+                    column: pd.to_datetime(data[column], format=DATE_FORMAT)})
+        elif str(data[column].dtype) != dtype:
+            check_range(data[column], dtype)
+            types[column] = dtype
+    return data.astype(types) if types else data
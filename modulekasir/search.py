@@ -0,0 +1,284 @@
+import threading
+from bisect import bisect_left, insort
+from .catalog import MenuCatalog
+
+# Adding more names than this at once sorts the index once instead of
+# inserting each name in place.
+BULK_ADD = 64
+
+# Separates the search key from the menu name in an index entry. Sorting
+# "key\0name" strings is several times faster than sorting (key, name) pairs.
+SEPARATOR = "\0"
+
+
+def normalize(text: str) -> str:
+    """
+    Fold case and collapse spaces, so "Nasi  Goreng" matches "nasi goreng".
+    """
+    return " ".join(str(text).casefold().split())
+
+
+def trigrams(text: str) -> set:
+    """
+    Get the three-letter pieces of a normalized word, padded at both ends.
+    """
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Count the insertions, deletions, substitutions and swaps of neighbours
+    that turn a into b, stopping early once the count exceeds limit.
+
+    Returns:
+        int: The distance, or limit + 1 if it is larger than limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class MenuSearch:
+    """
+    A class used to suggest menu names while an item is typed.
+
+    Matches are ranked: names that start with the query (the exact name
+    first), names in which the query starts at a later word, then names
+    that have every word of the query in any order. A word that starts no
+    word of the menu is replaced by the closest one within one typo (two
+    for words of 5 letters or more) and the search is repeated.
+
+    The index is shared by all instances and follows new versions of the
+    menu catalog by adding and removing only the names that changed, so it
+    is built once per process, not once per order.
+
+    Attributes:
+        - _catalog (MenuCatalog): The shared menu catalog.
+        - _indexes (dict): The index of every menu file, keyed by path.
+        - _guard (Lock): Serializes updates and searches of the shared indexes.
+
+    Methods:
+        - __init__(): Initializes the MenuSearch class.
+        - search(query: str, limit: int): Get the menu names that best match a query.
+        - hint(query: str, limit: int): Suggest menu names for a name that was not found.
+    """
+
+    _indexes: dict = {}
+    _guard = threading.Lock()
+
+    def __init__(self) -> None:
+        self._catalog = MenuCatalog()
+
+    def _index(self) -> dict:
+        """
+        Get the index of the menu file, updated to its current content.
+
+        The index holds the sorted "name\0menu" and "later words\0menu"
+        entries, the menus of every word, the sorted words and the words of
+        every trigram.
+        """
+        index = MenuSearch._indexes.setdefault(self._catalog.path, {
+            "full": [],
+            "words": [],
+            "menus": {},
+            "vocabulary": [],
+            "grams": {},
+            "names": frozenset(),
+            "version": 0,
+        })
+        version = self._catalog.version()
+        if version != index["version"]:
+            names = frozenset(self._catalog.names())
+            for name in index["names"] - names:
+                self._remove(index, name)
+            self._add(index, names - index["names"])
+            index["names"] = names
+            index["version"] = version
+        return index
+
+    def _entries(self, name: str) -> tuple:
+        """
+        Get the normalized name, its words, and its later words with what follows them.
+        """
+        text = normalize(name)
+        words = text.split(" ")
+        return text, words, [" ".join(words[i:]) for i in range(1, len(words))]
+
+    def _add(self, index: dict, names: set) -> None:
+        bulk = len(names) > BULK_ADD
+        add = index["full"].append if bulk else lambda entry: insort(index["full"], entry)
+        add_suffix = index["words"].append if bulk else (
+            lambda entry: insort(index["words"], entry))
+        for name in names:
+            text, words, suffixes = self._entries(name)
+            add(text + SEPARATOR + name)
+            for suffix in suffixes:
+                add_suffix(suffix + SEPARATOR + name)
+            for word in words:
+                menus = index["menus"].get(word)
+                if menus is None:
+                    menus = index["menus"][word] = set()
+                    if not bulk:
+                        insort(index["vocabulary"], word)
+                    for gram in trigrams(word):
+                        index["grams"].setdefault(gram, set()).add(word)
+                menus.add(name)
+        if bulk:
+            index["full"].sort()
+            index["words"].sort()
+            index["vocabulary"] = sorted(index["menus"])
+
+    def _remove(self, index: dict, name: str) -> None:
+        text, words, suffixes = self._entries(name)
+        for column, key in [("full", text)] + [("words", suffix) for suffix in suffixes]:
+            self._discard(index[column], key + SEPARATOR + name)
+        for word in words:
+            menus = index["menus"].get(word, set())
+            menus.discard(name)
+            if not menus and word in index["menus"]:
+                del index["menus"][word]
+                self._discard(index["vocabulary"], word)
+                for gram in trigrams(word):
+                    index["grams"][gram].discard(word)
+
+    def _discard(self, entries: list, entry) -> None:
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def _prefixed(self, entries: list, query: str, found: dict, limit: int) -> None:
+        """
+        Add the names whose key starts with query, in alphabetical order.
+        """
+        position = bisect_left(entries, query)
+        while len(found) < limit and position < len(entries):
+            key, _, name = entries[position].partition(SEPARATOR)
+            if not key.startswith(query):
+                break
+            found.setdefault(name, None)
+            position += 1
+
+    def _starting(self, index: dict, prefix: str) -> list:
+        """
+        Get the words of the menu that start with prefix.
+        """
+        vocabulary = index["vocabulary"]
+        position = bisect_left(vocabulary, prefix)
+        words = []
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            words.append(vocabulary[position])
+            position += 1
+        return words
+
+    def _all_words(self, index: dict, words: list, found: dict, limit: int) -> None:
+        """
+        Add the shortest names that have a word starting with every query word.
+
+        The menus of the most selective words are intersected first; once
+        few names are left, they are checked directly against the other words.
+        """
+        expansions = sorted(
+            (sum(len(index["menus"][match]) for match in matches), word, matches)
+            for word in words
+            for matches in [self._starting(index, word)])
+        names = None
+        for size, word, matches in expansions:
+            if names is not None and len(names) * 8 < size:
+                names = {
+                    name for name in names
+                    if any(part.startswith(word) for part in normalize(name).split(" "))}
+                continue
+            menus = set().union(*(index["menus"][match] for match in matches))
+            names = menus if names is None else names & menus
+            if not names:
+                return
+        names = (names or set()).difference(found)
+        for name in sorted(names, key=lambda name: (len(name), normalize(name)))[:limit - len(found)]:
+            found[name] = None
+
+    def _correct(self, index: dict, word: str) -> str | None:
+        """
+        Get the word of the menu closest to a word with a typo, preferring
+        the word used by more menus. The word may be only the start of it.
+
+        Returns:
+            str | None: The word, or None if none is close enough.
+        """
+        if len(word) < 3:
+            return None
+        tolerance = 1 if len(word) < 5 else 2
+        candidates = set()
+        for gram in trigrams(word):
+            candidates |= index["grams"].get(gram, set())
+        if len(word) < 5:
+            # One typo can break every trigram of a short word ("the" for "teh").
+            candidates.update(self._starting(index, word[0]))
+        best = None
+        for candidate in candidates:
+            distance = min(
+                edit_distance(word, candidate, tolerance),
+                edit_distance(word, candidate[:len(word)], tolerance))
+            if distance <= tolerance:
+                rank = (distance, -len(index["menus"][candidate]), candidate)
+                best = min(best, rank) if best is not None else rank
+        return None if best is None else best[2]
+
+    def _find(self, index: dict, query: str, found: dict, limit: int) -> None:
+        self._prefixed(index["full"], query, found, limit)
+        self._prefixed(index["words"], query, found, limit)
+        if len(found) < limit:
+            self._all_words(index, query.split(" "), found, limit)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """
+        Get the menu names that best match a query.
+
+        Args:
+            - query (str): What the cashier typed, in any case.
+            - limit (int): The most names to return.
+
+        Returns:
+            list: Up to limit menu names, best match first.
+        """
+        query = normalize(query)
+        if not query or limit < 1:
+            return []
+        with MenuSearch._guard:
+            index = self._index()
+            found = {}
+            self._find(index, query, found, limit)
+            if len(found) < limit:
+                words = query.split(" ")
+                corrected = [
+                    word if self._starting(index, word) else self._correct(index, word)
+                    for word in words]
+                if None not in corrected and corrected != words:
+                    self._find(index, " ".join(corrected), found, limit)
+            return list(found)
+
+    def hint(self, query: str, limit: int = 3) -> str:
+        """
+        Suggest menu names for a name that was not found.
+
+        Args:
+            - query (str): The name that was typed.
+            - limit (int): The most names to suggest.
+
+        Returns:
+            str: e.g. " Mungkin maksud Anda: Soto Ayam, Soto Babat?", or ""
+                if nothing is close.
+        """
+        names = self.search(query, limit)
+        return f" Mungkin maksud Anda: {', '.join(names)}?" if names else ""
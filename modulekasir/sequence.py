@@ -0,0 +1,95 @@
+import os
+import pandas as pd
+from .db_controller import Controller
+from .locking import FileLock
+
+
+class Sequence:
+    """
+    A class used to hand out increasing numbers, e.g. order numbers.
+
+    The last number is kept in a small file next to the data files, so a new
+    number costs one tiny read and write instead of a scan of the whole log.
+    If the file is missing or damaged, it is recovered from the log and from
+    the orders still in the journal.
+
+    Attributes:
+        - _controller (Controller): The table the numbers are stored in.
+        - _column (str): The column that holds the numbers.
+        - _journal (Journal | None): Holds numbers not yet in the table.
+        - _path (str): The path to the sequence file.
+        - _lock (FileLock): Makes next() atomic across terminals.
+
+    Methods:
+        - __init__(controller: Controller, column: str, journal: Journal | None): Initializes the Sequence class.
+        - current(): Get the last number handed out.
+        - next(count: int): Hand out the next number or block of numbers.
+        - recover(): Rebuild the sequence file from the table.
+    """
+
+    def __init__(self, controller: Controller, column: str, journal=None) -> None:
+        self._controller = controller
+        self._column = column
+        self._journal = journal
+        self._path = os.path.join(
+            controller.get_data_path(), f"{controller.name}.seq")
+        self._lock = FileLock(controller.get_data_path(), f"{controller.name}.seq")
+
+    def _write(self, value: int) -> None:
+        """
+        Store a value atomically: write a temp file, then rename it.
+        """
+        if not self._controller.is_dir_exists():
+            self._controller.create_dir()
+        temp = self._path + ".tmp"
+        with open(temp, "w") as f:
+            f.write(str(value))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self._path)
+
+    def current(self) -> int:
+        """
+        Get the last number handed out.
+
+        Returns:
+            int: The last number, or 0 if none was handed out yet.
+        """
+        try:
+            with open(self._path, "r") as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return self.recover()
+
+    def next(self, count: int = 1) -> int:
+        """
+        Hand out the next number, or a block of count consecutive numbers.
+
+        Args:
+            - count (int): How many numbers to hand out.
+
+        Returns:
+            int: The new number, or the first number of the block.
+        """
+        with self._lock.exclusive():
+            value = self.current() + 1
+            self._write(value + count - 1)
+            return value
+
+    def recover(self) -> int:
+        """
+        Rebuild the sequence file from the largest number in the table or
+        in the orders still in the journal.
+
+        Returns:
+            int: The recovered last number.
+        """
+        value = 0
+        if self._controller.is_file_exists():
+            data = self._controller.get_data([self._column])
+            if not data.empty and not pd.isna(data[self._column].max()):
+                value = int(data[self._column].max())
+        if self._journal is not None:
+            value = max(value, self._journal.highest(self._column))
+        self._write(value)
+        return value
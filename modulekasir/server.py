@@ -0,0 +1,422 @@
+"""
+Local HTTP/JSON service for the cashier.
+
+One process serves many clients. Reads are answered from the Controller
+cache inside the event loop; every change goes through a single writer task,
+so orders and stock updates are applied one at a time.
+
+Endpoints:
+    GET    /menu                  The menu.
+    GET    /menu?cari=...&limit=5 Menu items whose name best matches, best first.
+    POST   /menu                  Add a menu item: {"Nama Menu", "Jenis Menu", "Harga", "Stok"}.
+    PUT    /menu/<nama>           Change a menu item; omitted fields are kept.
+    DELETE /menu/<nama>           Delete a menu item.
+    POST   /orders                Place an order: {"items": [{"menu", "jumlah"}], "bayar"}.
+    GET    /history?periode=...   Daily and per-menu totals ("hari", "bulan" or "semua").
+    GET    /stok[?semua=1]        Menu items to reorder, those that run out first at the top.
+
+Usage: python -m modulekasir.server [--host 127.0.0.1] [--port 8000]
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+import pandas as pd
+from .db_controller import Controller
+from .history import History
+from .inventory import Inventory
+from .journal import ENABLED as JOURNAL_ENABLED, checkpoint as apply_journal
+from .schema import DATE_FORMAT, MENU_SCHEMA
+from .search import MenuSearch
+from .transaction import Transaction, is_whole_number
+
+# Seconds without changes after which the writer applies the journal to
+# the tables, so checkpoints happen between peaks rather than during them.
+IDLE_CHECKPOINT = 1.0
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """
+    An error answered with an HTTP status other than 500.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def to_json(value):
+    """
+    Convert the values pandas returns to types json can encode.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(DATE_FORMAT)
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} tidak dapat dikirim!")
+
+
+class Server:
+    """
+    A class used to serve the menu, orders and reports over HTTP.
+
+    Attributes:
+        - _menu (Controller): An instance of the Controller class for the menu.
+        - _search (MenuSearch): Finds menu items by name.
+        - _transaction (Transaction): Places the orders.
+        - _history (History): Builds the reports.
+        - _columns_name (list): A list of column names of the menu.
+        - _writes (asyncio.Queue): Changes waiting for the writer task.
+        - _executor (ThreadPoolExecutor): The one thread the writer runs changes on.
+        - _reader (ThreadPoolExecutor): The one thread reports are built on, off the event loop.
+        - _routes (dict): Maps (method, first path segment) to a handler.
+
+    Methods:
+        - __init__(): Initializes the Server class.
+        - write(function, *args): Run a change on the writer task.
+        - read(function, *args): Build a report on the reader thread.
+        - handle(reader, writer): Serve one client connection.
+        - serve(host: str, port: int): Run the server until cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._menu = Controller("data_menu")
+        self._search = MenuSearch()
+        self._transaction = Transaction()
+        self._history = History()
+        self._inventory = Inventory()
+        self._columns_name = list(MENU_SCHEMA)
+        self._writes = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._reader = ThreadPoolExecutor(max_workers=1)
+        self._routes = {
+            ("GET", "menu"): self.get_menu,
+            ("POST", "menu"): self.add_menu,
+            ("PUT", "menu"): self.update_menu,
+            ("DELETE", "menu"): self.delete_menu,
+            ("POST", "orders"): self.add_order,
+            ("GET", "history"): self.get_history,
+            ("GET", "stok"): self.get_stock,
+        }
+
+    async def _writer(self) -> None:
+        """
+        Apply the queued changes one at a time.
+
+        The changes run on a single thread, so the event loop keeps serving
+        reads while a file is being written. Orders waiting behind each other
+        are saved together with one write per file.
+        """
+        loop = asyncio.get_running_loop()
+        waiting = None
+        while True:
+            change = waiting or await self._next_change(loop)
+            waiting = None
+            function, args, future = change
+            if function != self._transaction.place_order:
+                await self._run(loop, function, args, future)
+                continue
+
+            orders = [change]
+            while not self._writes.empty():
+                change = self._writes.get_nowait()
+                if change[0] != self._transaction.place_order:
+                    waiting = change
+                    break
+                orders.append(change)
+            try:
+                results = await loop.run_in_executor(
+                    self._executor,
+                    self._transaction.place_orders,
+                    [args[0] for _, args, _ in orders],
+                    [args[1] if len(args) > 1 else None for _, args, _ in orders])
+            except Exception as error:
+                results = [error] * len(orders)
+            for (_, _, future), result in zip(orders, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _next_change(self, loop) -> tuple:
+        """
+        Wait for the next change, applying the journal whenever none comes
+        for IDLE_CHECKPOINT seconds.
+        """
+        while JOURNAL_ENABLED:
+            try:
+                return await asyncio.wait_for(self._writes.get(), IDLE_CHECKPOINT)
+            except asyncio.TimeoutError:
+                await loop.run_in_executor(self._executor, apply_journal)
+        return await self._writes.get()
+
+    async def _run(self, loop, function, args: tuple, future) -> None:
+        try:
+            result = await loop.run_in_executor(self._executor, function, *args)
+        except Exception as error:
+            if not future.cancelled():
+                future.set_exception(error)
+        else:
+            if not future.cancelled():
+                future.set_result(result)
+
+    async def write(self, function, *args):
+        """
+        Run a change on the writer task and wait for its result.
+
+        Args:
+            - function: The function that changes the data.
+            - args: Its arguments.
+
+        Returns:
+            The result of function.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((function, args, future))
+        return await future
+
+    async def read(self, function, *args):
+        """
+        Run a slow read, e.g. a report over the whole history, on the reader
+        thread, so the event loop keeps answering other requests meanwhile.
+
+        Args:
+            - function: The function that reads the data.
+            - args: Its arguments.
+
+        Returns:
+            The result of function.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._reader, function, *args)
+
+    def _menu_row(self, path: list) -> tuple:
+        """
+        Find the menu item named in the path, e.g. /menu/Nasi%20Goreng.
+
+        Names don't shift when other items are deleted, unlike row numbers.
+        """
+        nama = unquote(path[1]) if len(path) > 1 else None
+        found = self._menu.lookup("Nama Menu", nama) if self._menu.is_file_exists() else None
+        if found is None:
+            raise HTTPError(404, f"Menu {nama} tidak ditemukan!{self._search.hint(nama or '')}")
+        return nama, found[1]
+
+    def _menu_values(self, body: dict, current: dict) -> list:
+        values = []
+        for column, dtype in MENU_SCHEMA.items():
+            if column not in body and column not in current:
+                raise HTTPError(400, f"Kolom {column} harus diisi!")
+            value = body.get(column, current.get(column))
+            if dtype.startswith("int"):
+                value = self._menu.convert_types(value, int)
+            values.append(value)
+        return values
+
+    def _encode_menu(self, data: pd.DataFrame) -> bytes:
+        records = data[self._columns_name].reset_index(names=["No."]).to_dict("records")
+        return json.dumps(records, default=to_json).encode()
+
+    async def get_menu(self, path: list, query: dict, body: dict) -> tuple:
+        if not self._menu.is_file_exists():
+            return 200, []
+        if query.get("cari", [""])[0]:
+            try:
+                limit = int(query.get("limit", ["5"])[0])
+            except ValueError:
+                raise HTTPError(400, "limit harus berupa angka!")
+            records = []
+            for nama in self._search.search(query["cari"][0], limit):
+                found = self._menu.lookup("Nama Menu", nama)
+                if found is not None:
+                    records.append({"No.": found[0], **found[1]})
+            return 200, records
+        # Encoded once per version of the menu, not once per request.
+        return 200, self._menu.derive("json", self._encode_menu)
+
+    async def add_menu(self, path: list, query: dict, body: dict) -> tuple:
+        values = self._menu_values(body, {})
+        await self.write(self._menu.add_data, values, self._columns_name)
+        await self.write(self._inventory.record_edit, values[0], 0, values[3], "tambah")
+        return 201, dict(zip(self._columns_name, values))
+
+    async def update_menu(self, path: list, query: dict, body: dict) -> tuple:
+        nama, current = self._menu_row(path)
+        values = self._menu_values(body, current)
+        await self.write(self._menu.update_key, nama, values)
+        await self.write(
+            self._inventory.record_edit, values[0], current["Stok"], values[3], "ubah")
+        return 200, dict(zip(self._columns_name, values))
+
+    async def delete_menu(self, path: list, query: dict, body: dict) -> tuple:
+        nama, current = self._menu_row(path)
+        await self.write(self._menu.delete_key, nama)
+        await self.write(self._inventory.record_edit, nama, current["Stok"], 0, "hapus")
+        return 200, {"Nama Menu": nama}
+
+    async def add_order(self, path: list, query: dict, body: dict) -> tuple:
+        try:
+            items = [(item["menu"], item["jumlah"]) for item in body["items"]]
+        except (KeyError, TypeError):
+            raise HTTPError(400, 'Format pesanan: {"items": [{"menu": ..., "jumlah": ...}]}')
+        bayar = body.get("bayar")
+        if "bayar" in body and not is_whole_number(bayar):
+            raise HTTPError(400, "Uang bayar harus berupa bilangan bulat!")
+        # An order paid short, or with a quantity or payment that isn't a
+        # whole number, is rejected before it is saved.
+        orders = await self.write(self._transaction.place_order, items, bayar)
+
+        total = int(orders["Total"].sum())
+        result = {
+            "No. Pembelian": int(orders["No. Pembelian"].iloc[0]),
+            "items": orders.to_dict("records"),
+            "total": total,
+        }
+        if bayar is not None:
+            result["kembalian"] = bayar - total
+        alerts = self._inventory.low_stock(
+            self._transaction.stock_left(orders["Nama Menu"].tolist()))
+        if alerts:
+            result["stok_menipis"] = [
+                {"Nama Menu": menu, "Stok": sisa,
+                 "Habis (Jam)": None if hours is None else round(hours, 1)}
+                for menu, sisa, hours in alerts]
+        return 201, result
+
+    async def get_history(self, path: list, query: dict, body: dict) -> tuple:
+        periode = query.get("periode", ["bulan"])[0]
+        if periode not in ("hari", "bulan", "semua"):
+            raise HTTPError(400, "Periode harus hari, bulan atau semua!")
+        if JOURNAL_ENABLED:
+            # Apply the journal on the writer, not in the event loop.
+            await self.write(apply_journal)
+        data_riwayat, per_menu = await self.read(self._history.report, periode)
+        return 200, {
+            "periode": periode,
+            "harian": data_riwayat.to_dict("records"),
+            "per_menu": per_menu.to_dict("records"),
+            "total": int(data_riwayat["Total"].sum()),
+        }
+
+    async def get_stock(self, path: list, query: dict, body: dict) -> tuple:
+        if JOURNAL_ENABLED:
+            await self.write(apply_journal)
+        if not self._menu.is_file_exists():
+            return 200, []
+        report = await self.read(
+            self._inventory.reorder, query.get("semua", ["0"])[0] not in ("", "0"))
+        return 200, report.astype(object).where(report.notna(), None).to_dict("records")
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        url = urlsplit(target)
+        path = [part for part in url.path.split("/") if part]
+        handler = self._routes.get((method, path[0] if path else ""))
+        if handler is None:
+            if any(route[1] == (path[0] if path else "") for route in self._routes):
+                return 405, {"error": f"Metode {method} tidak didukung!"}
+            return 404, {"error": f"Alamat {url.path} tidak ditemukan!"}
+        try:
+            try:
+                body = json.loads(body) if body else {}
+            except json.JSONDecodeError:
+                raise HTTPError(400, "Isi permintaan bukan JSON yang valid!")
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Isi permintaan harus berupa objek JSON!")
+            return await handler(path, parse_qs(url.query), body)
+        except HTTPError as error:
+            return error.status, {"error": str(error)}
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        except Exception as error:
+            return 500, {"error": str(error)}
+
+    async def handle(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter) -> None:
+        """
+        Serve the requests of one client connection, keeping it open between requests.
+
+        Args:
+            - reader (StreamReader): The incoming side of the connection.
+            - writer (StreamWriter): The outgoing side of the connection.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._dispatch(method, target, body)
+                content = payload if isinstance(payload, bytes) else json.dumps(
+                    payload, default=to_json).encode()
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode() + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """
+        Run the server until cancelled.
+
+        Args:
+            - host (str): The address to listen on.
+            - port (int): The port to listen on.
+        """
+        self._writes = asyncio.Queue()
+        writer_task = asyncio.create_task(self._writer())
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"Kasir berjalan di http://{host}:{port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+            self._executor.shutdown(wait=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Layanan HTTP/JSON kasir.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(Server().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1130 @@
+import csv
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+import pandas as pd
+from pandas import DataFrame
+from .locking import FileLock
+from .schema import DATE_FORMAT, TABLE_SCHEMAS, apply_schema, is_datetime_type
+
+
+class Storage:
+    """
+    Base class of the storage backends used by the Controller class.
+
+    Rows are addressed by position, the same index read() returns.
+
+    Attributes:
+        - _data_path (str): The path to the data directory.
+        - name (str): The name of the table.
+        - schema (dict | None): The declared column types of the table, if any.
+
+    Methods:
+        - exists(): Check if the table exists.
+        - create(columns_name: list): Create an empty table.
+        - read_header(): Read the column names of the table.
+        - read(columns: list | None): Read the whole table, or only some columns.
+        - read_range(columns: list | None, start, end): Read at least the rows between two timestamps.
+        - iter_chunks(columns: list | None, chunksize: int): Read the table a few rows at a time.
+        - iter_range(columns: list | None, start, end, chunksize: int): Read at least the rows between two timestamps, a few at a time.
+        - split_range(start, end): Split a time range into pieces stored in separate files.
+        - signature(): Get a value that changes whenever the table is written.
+        - size(start, end): Get the bytes the table (or a date range of it) takes on disk.
+        - append(data: DataFrame): Add rows to the end of the table.
+        - write(data: DataFrame): Replace the whole table.
+        - update(data: DataFrame, indexes: list): Write changed rows.
+        - delete(data: DataFrame, index: int): Remove a row.
+        - drop(): Remove the table.
+        - list_tables(): Get the names of all tables of this backend.
+    """
+
+    def __init__(
+            self,
+            data_path: str,
+            name: str,
+            schema: dict | None = None) -> None:
+        """
+        Initialize the Storage class.
+
+        Args:
+            - data_path (str): The path to the data directory.
+            - name (str): The name of the table.
+            - schema (dict | None): The declared column types of the table.
+        """
+        self._data_path = data_path
+        self.name = name
+        self.schema = schema
+
+    @property
+    def filename(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def path(self) -> str:
+        raise NotImplementedError
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def create(self, columns_name: list) -> None:
+        raise NotImplementedError
+
+    def read_header(self) -> list:
+        raise NotImplementedError
+
+    def read(self, columns: list | None = None) -> DataFrame:
+        raise NotImplementedError
+
+    def read_range(
+            self,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> DataFrame:
+        """
+        Read at least the rows between two timestamps.
+
+        Backends that can't skip rows return the whole table; the caller
+        filters the rows.
+
+        Args:
+            - columns (list | None): Only read these columns.
+            - start (Timestamp | None): The first timestamp to include.
+            - end (Timestamp | None): The first timestamp to exclude.
+        """
+        return self.read(columns)
+
+    def iter_chunks(
+            self,
+            columns: list | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        """
+        Read the table a few rows at a time, in order.
+
+        Backends that can read part of a table override this, so the first
+        rows arrive before the rest is parsed. This default reads the whole
+        table once and slices it.
+
+        Args:
+            - columns (list | None): Only read these columns.
+            - chunksize (int): The number of rows in the first chunk. Later
+              chunks may be larger, to keep the cost per row down on long reads.
+
+        Yields:
+            DataFrame: The next rows, not yet cast to the schema.
+        """
+        data = self.read(columns)
+        for start in range(0, len(data), chunksize):
+            yield data.iloc[start:start + chunksize]
+
+    def iter_range(
+            self,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        """
+        Read at least the rows between two timestamps, a few rows at a time.
+
+        Like read_range, backends that can't skip rows read the whole table;
+        the caller filters the rows.
+
+        Args:
+            - columns (list | None): Only read these columns.
+            - start (Timestamp | None): The first timestamp to include.
+            - end (Timestamp | None): The first timestamp to exclude.
+            - chunksize (int): The number of rows in the first chunk.
+
+        Yields:
+            DataFrame: The next rows, not yet cast to the schema.
+        """
+        return self.iter_chunks(columns, chunksize)
+
+    def split_range(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> list:
+        """
+        Split a time range into pieces that are stored in separate files.
+
+        The pieces can be read independently, e.g. by several processes.
+        This default keeps the range whole.
+
+        Args:
+            - start (Timestamp | None): The first timestamp to include.
+            - end (Timestamp | None): The first timestamp to exclude.
+
+        Returns:
+            list: (start, end) pairs covering the range, oldest first.
+        """
+        return [(start, end)]
+
+    def signature(self) -> tuple:
+        raise NotImplementedError
+
+    def size(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> int:
+        """
+        Get the bytes the table takes on disk.
+
+        Args:
+            - start (Timestamp | None): Only count files that can hold rows at or after this time.
+            - end (Timestamp | None): Only count files that can hold rows before this time.
+
+        Returns:
+            int: The size in bytes, 0 if the table doesn't exist.
+        """
+        raise NotImplementedError
+
+    def drop(self) -> None:
+        raise NotImplementedError
+
+    def list_tables(self) -> list:
+        raise NotImplementedError
+
+    def append(self, data: DataFrame) -> None:
+        raise NotImplementedError
+
+    def write(self, data: DataFrame) -> None:
+        raise NotImplementedError
+
+    def update(self, data: DataFrame, indexes: list) -> None:
+        """
+        Write changed rows.
+
+        Args:
+            - data (DataFrame): The whole table after the change.
+            - indexes (list): The positions of the changed rows.
+        """
+        self.write(data)
+
+    def delete(self, data: DataFrame, index: int) -> None:
+        """
+        Remove a row.
+
+        Args:
+            - data (DataFrame): The whole table after the row was dropped.
+            - index (int): The position of the removed row.
+        """
+        self.write(data)
+
+
+class CsvStorage(Storage):
+    """
+    A storage backend that keeps each table in its own CSV file.
+
+    Updates and deletes atomically replace the whole file, appends only
+    write the new rows.
+    """
+
+    @property
+    def filename(self) -> str:
+        return self.name + ".csv"
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self._data_path, self.filename)
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def drop(self) -> None:
+        if self.exists():
+            os.remove(self.path)
+
+    def list_tables(self) -> list:
+        return [
+            filename[:-len(".csv")]
+            for filename in os.listdir(self._data_path)
+            if filename.endswith(".csv")]
+
+    def create(self, columns_name: list) -> None:
+        with open(self.path, "w+") as f:
+            if columns_name:
+                f.write(",".join(columns_name) + "\n")
+
+    def read_header(self) -> list:
+        with open(self.path, "r", newline="") as f:
+            return next(csv.reader([f.readline()]), [])
+
+    def _dtype(self, columns: list | None) -> dict | None:
+        if not self.schema:
+            return None
+        # Parse straight into the declared types; timestamps are parsed
+        # afterwards with DATE_FORMAT.
+        return {
+            column: column_type
+            for column, column_type in self.schema.items()
+            if not is_datetime_type(column_type)
+            and (columns is None or column in columns)}
+
+    def read(self, columns: list | None = None) -> DataFrame:
+        return pd.read_csv(self.path, usecols=columns, dtype=self._dtype(columns))
+
+    def iter_chunks(
+            self,
+            columns: list | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        with pd.read_csv(
+                self.path,
+                usecols=columns,
+                dtype=self._dtype(columns),
+                chunksize=chunksize) as reader:
+            # Each chunk has a fixed cost, so the chunks double in size: the
+            # first rows come quickly and a full scan costs about one read().
+            size = chunksize
+            while True:
+                try:
+                    yield reader.get_chunk(size)
+                except StopIteration:
+                    return
+                size = min(size * 2, chunksize * 64)
+
+    def signature(self) -> tuple:
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def size(self, start=None, end=None) -> int:
+        return os.path.getsize(self.path) if self.exists() else 0
+
+    def append(self, data: DataFrame) -> None:
+        self._ensure_trailing_newline()
+        data.to_csv(
+            self.path,
+            mode="a",
+            header=False,
+            index=False,
+            date_format=DATE_FORMAT)
+
+    def write(self, data: DataFrame) -> None:
+        # Write a temp file and rename it, so a crash never leaves a
+        # half-written table behind.
+        temp = self.path + ".tmp"
+        data.to_csv(temp, index=False, date_format=DATE_FORMAT)
+        with open(temp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+    def _ensure_trailing_newline(self) -> None:
+        """
+        Make sure the file ends with a newline before appending to it.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            last_char = f.read(1)
+        if last_char not in (b"\n", b"\r"):
+            with open(self.path, "a") as f:
+                f.write("\n")
+
+
+class SqliteStorage(Storage):
+    """
+    A storage backend that keeps every table in one SQLite database.
+
+    The database runs in WAL mode, "Nama Menu" and "Tanggal" are indexed,
+    and updates and deletes only touch the affected rows.
+
+    The rowid of a row is its position plus one, so a row is updated by its
+    primary key. Appends keep it that way and a delete renumbers the rows
+    after it. Every write raises the version of its table in the _versions
+    table, in the same transaction, so a write to one table doesn't make the
+    cached data of the others look stale.
+
+    Attributes:
+        - _connections (threading.local): Open connections shared by all
+          instances of a thread, keyed by path. A connection can't be used
+          by other threads, e.g. the server's writer or a compaction.
+        - _indexed_columns (list): Columns that get an index when a table is created.
+        - _numbered (set): Tables whose rowids this process checked, keyed by (path, name).
+    """
+
+    _connections = threading.local()
+    _indexed_columns = ["Nama Menu", "Tanggal"]
+    _numbered: set = set()
+
+    @property
+    def filename(self) -> str:
+        return self.name
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self._data_path, "kasir.db")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get the shared connection to the database, opening it on first use.
+        """
+        connections = SqliteStorage._connections.__dict__
+        connection = connections.get(self.path)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS _versions "
+                "(name TEXT PRIMARY KEY, version INTEGER)")
+            connection.commit()
+            connections[self.path] = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements, DDL included, as one transaction that raises the
+        version of the table.
+        """
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute(
+                "INSERT INTO _versions VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                (self.name,))
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    def _quote(self, identifier: str) -> str:
+        return '"' + str(identifier).replace('"', '""') + '"'
+
+    def _number_rows(self, connection: sqlite3.Connection) -> None:
+        """
+        Make the rowids the positions plus one again, once per process, for
+        tables written before rows were addressed by rowid.
+        """
+        key = (self.path, self.name)
+        if key in SqliteStorage._numbered:
+            return
+        count, last = connection.execute(
+            f"SELECT COUNT(*), MAX(rowid) FROM {self._quote(self.name)}").fetchone()
+        if count != (last or 0):
+            table = self._quote(self.name)
+            temp = self._quote(self.name + "_tmp")
+            columns = self.read_header()
+            connection.execute(f"DROP TABLE IF EXISTS {temp}")
+            connection.execute(f"CREATE TABLE {temp} AS SELECT * FROM {table} ORDER BY rowid")
+            connection.execute(f"DROP TABLE {table}")
+            connection.execute(f"ALTER TABLE {temp} RENAME TO {table}")
+            self._create_indexes(connection, columns)
+        SqliteStorage._numbered.add(key)
+
+    def exists(self) -> bool:
+        found = self._connect().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (self.name,)).fetchone()
+        return found is not None
+
+    def drop(self) -> None:
+        with self._transaction() as connection:
+            connection.execute(f"DROP TABLE IF EXISTS {self._quote(self.name)}")
+
+    def list_tables(self) -> list:
+        rows = self._connect().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name != '_versions'"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _create(self, connection: sqlite3.Connection, columns_name: list) -> None:
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._quote(self.name)} "
+            f"({', '.join(self._quote(c) for c in columns_name)})")
+        self._create_indexes(connection, columns_name)
+
+    def _create_indexes(self, connection: sqlite3.Connection, columns_name: list) -> None:
+        for column in self._indexed_columns:
+            if column in columns_name:
+                index = self._quote(f"idx_{self.name}_{column}")
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index} "
+                    f"ON {self._quote(self.name)} ({self._quote(column)})")
+
+    def create(self, columns_name: list) -> None:
+        if not columns_name:
+            return
+        with self._transaction() as connection:
+            self._create(connection, columns_name)
+
+    def read_header(self) -> list:
+        rows = self._connect().execute(
+            f"PRAGMA table_info({self._quote(self.name)})").fetchall()
+        return [row[1] for row in rows]
+
+    def read(self, columns: list | None = None) -> DataFrame:
+        selected = "*"
+        if columns is not None:
+            selected = ", ".join(self._quote(c) for c in columns)
+        return pd.read_sql_query(
+            f"SELECT {selected} FROM {self._quote(self.name)} ORDER BY rowid",
+            self._connect())
+
+    def iter_chunks(
+            self,
+            columns: list | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        selected = "*"
+        if columns is not None:
+            selected = ", ".join(self._quote(c) for c in columns)
+        yield from pd.read_sql_query(
+            f"SELECT {selected} FROM {self._quote(self.name)} ORDER BY rowid",
+            self._connect(),
+            chunksize=chunksize)
+
+    def signature(self) -> tuple:
+        if not os.path.exists(self.path):
+            return ()
+        found = self._connect().execute(
+            "SELECT version FROM _versions WHERE name = ?", (self.name,)).fetchone()
+        # The inode tells a replaced database apart, whose versions start over.
+        return (os.stat(self.path).st_ino, found[0] if found else 0)
+
+    def size(self, start=None, end=None) -> int:
+        # All tables share one database file, so this counts the whole file.
+        return sum(
+            os.path.getsize(path)
+            for path in (self.path, self.path + "-wal") if os.path.exists(path))
+
+    def _rows(self, data: DataFrame) -> list:
+        """
+        Convert data to plain Python rows that sqlite3 can bind.
+        """
+        for column in data.columns:
+            if pd.api.types.is_datetime64_any_dtype(data[column]):
+                data = data.assign(**{
+                    column: data[column].dt.strftime(DATE_FORMAT)})
+        return data.astype(object).values.tolist()
+
+    def _insert(self, connection: sqlite3.Connection, data: DataFrame) -> None:
+        placeholders = ", ".join("?" for _ in data.columns)
+        connection.executemany(
+            f"INSERT INTO {self._quote(self.name)} VALUES ({placeholders})",
+            self._rows(data))
+
+    def append(self, data: DataFrame) -> None:
+        with self._transaction() as connection:
+            self._insert(connection, data)
+
+    def write(self, data: DataFrame) -> None:
+        # One transaction, so a crash leaves the old table or the new one.
+        with self._transaction() as connection:
+            connection.execute(f"DROP TABLE IF EXISTS {self._quote(self.name)}")
+            self._create(connection, list(data.columns))
+            self._insert(connection, data)
+        SqliteStorage._numbered.add((self.path, self.name))
+
+    def update(self, data: DataFrame, indexes: list) -> None:
+        table = self._quote(self.name)
+        assignments = ", ".join(f"{self._quote(c)} = ?" for c in data.columns)
+        with self._transaction() as connection:
+            self._number_rows(connection)
+            count = connection.execute(
+                f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+            for index in indexes:
+                if index < count:
+                    connection.execute(
+                        f"UPDATE {table} SET {assignments} WHERE rowid = ?",
+                        self._rows(data.loc[[index]])[0] + [int(index) + 1])
+                else:
+                    self._insert(connection, data.loc[[index]])
+                    count += 1
+
+    def delete(self, data: DataFrame, index: int) -> None:
+        table = self._quote(self.name)
+        with self._transaction() as connection:
+            self._number_rows(connection)
+            connection.execute(f"DELETE FROM {table} WHERE rowid = ?", (int(index) + 1,))
+            # Shift the later rows down by one, through negative rowids so
+            # no two rows ever share one.
+            connection.execute(
+                f"UPDATE {table} SET rowid = -rowid WHERE rowid > ?", (int(index) + 1,))
+            connection.execute(f"UPDATE {table} SET rowid = -rowid - 1 WHERE rowid < 0")
+
+
+class ParquetStorage(Storage):
+    """
+    A storage backend that keeps each table as a directory of Parquet files.
+
+    Columns are stored typed according to the schema, so reads skip CSV
+    tokenizing and type inference and can load only the columns they need.
+    Appends write a new part file; updates, deletes and too many parts
+    rewrite the table as a single part. Requires pyarrow.
+
+    Attributes:
+        - _max_parts (int): The number of part files that triggers a rewrite.
+    """
+
+    _max_parts = 64
+
+    def __init__(
+            self,
+            data_path: str,
+            name: str,
+            schema: dict | None = None) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Backend parquet membutuhkan paket pyarrow!")
+        super().__init__(data_path, name, schema)
+
+    @property
+    def filename(self) -> str:
+        return self.name + ".parquet"
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self._data_path, self.filename)
+
+    def _parts(self) -> list:
+        """
+        Get the part files of the table, oldest first.
+        """
+        return sorted(
+            os.path.join(self.path, filename)
+            for filename in os.listdir(self.path)
+            if filename.endswith(".parquet"))
+
+    def _typed(self, data: DataFrame) -> DataFrame:
+        """
+        Cast data to the declared schema of the table.
+        """
+        return apply_schema(data, self.schema)
+
+    def _write_part(self, data: DataFrame, number: int) -> None:
+        part = os.path.join(self.path, f"part-{number:06d}.parquet")
+        temp = part + ".tmp"
+        self._typed(data).to_parquet(temp, index=False)
+        os.replace(temp, part)
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.path)
+
+    def drop(self) -> None:
+        if self.exists():
+            shutil.rmtree(self.path)
+
+    def list_tables(self) -> list:
+        return [
+            filename[:-len(".parquet")]
+            for filename in os.listdir(self._data_path)
+            if filename.endswith(".parquet")]
+
+    def create(self, columns_name: list) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        if columns_name:
+            self._write_part(DataFrame(columns=columns_name), 0)
+
+    def read_header(self) -> list:
+        import pyarrow.parquet as pq
+
+        parts = self._parts()
+        if not parts:
+            return []
+        return pq.read_schema(parts[0]).names
+
+    def read(self, columns: list | None = None) -> DataFrame:
+        parts = self._parts()
+        if not parts:
+            return DataFrame(columns=columns)
+        data = pd.concat(
+            [pd.read_parquet(part, columns=columns) for part in parts],
+            ignore_index=True)
+        return data
+
+    def iter_chunks(
+            self,
+            columns: list | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        for part in self._parts():
+            data = pd.read_parquet(part, columns=columns)
+            for start in range(0, len(data), chunksize):
+                yield data.iloc[start:start + chunksize]
+
+    def signature(self) -> tuple:
+        signature = []
+        for part in self._parts():
+            stat = os.stat(part)
+            signature.append((part, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def size(self, start=None, end=None) -> int:
+        if not self.exists():
+            return 0
+        return sum(os.path.getsize(part) for part in self._parts())
+
+    def append(self, data: DataFrame) -> None:
+        parts = self._parts()
+        if len(parts) >= self._max_parts:
+            self.write(pd.concat([self.read(), data], ignore_index=True))
+            return
+        number = int(os.path.basename(parts[-1])[5:11]) + 1 if parts else 0
+        self._write_part(data, number)
+
+    def write(self, data: DataFrame) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        old_parts = self._parts()
+        number = int(os.path.basename(old_parts[-1])[5:11]) + 1 if old_parts else 0
+        self._write_part(data, number)
+        for part in old_parts:
+            os.remove(part)
+
+
+class PartitionedStorage(Storage):
+    """
+    A storage backend that splits a table into one table per day or month.
+
+    Each partition is stored by another backend under the name
+    "<table>_<period>", e.g. data_transaksi_2024-01.csv. Range reads only open
+    the partitions that overlap the range. A table that was stored before
+    partitioning is split into partitions on first use.
+
+    Attributes:
+        - _backend (type): The Storage class of the partitions.
+        - _column (str): The timestamp column that picks the partition.
+        - _period_format (str): The strftime format of a partition's period.
+        - _legacy (Storage): The unpartitioned table with the same name.
+        - _pattern (re.Pattern): Matches partition names and captures the period.
+        - _lock (FileLock): The lock of the table, taken exclusively to split the legacy table.
+    """
+
+    _period_formats = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+
+    def __init__(
+            self,
+            data_path: str,
+            name: str,
+            schema: dict | None = None,
+            backend: type = CsvStorage,
+            column: str = "Tanggal",
+            granularity: str = "month") -> None:
+        """
+        Initialize the PartitionedStorage class.
+
+        Args:
+            - data_path (str): The path to the data directory.
+            - name (str): The name of the table.
+            - schema (dict | None): The declared column types of the table.
+            - backend (type): The Storage class of the partitions.
+            - column (str): The timestamp column that picks the partition.
+            - granularity (str): "day" or "month".
+        """
+        super().__init__(data_path, name, schema)
+        self._backend = backend
+        self._column = column
+        self._period_format = self._period_formats[granularity]
+        self._legacy = backend(data_path, name, schema)
+        self._pattern = re.compile(
+            re.escape(name) + r"_(\d{4}-\d{2}(?:-\d{2})?)$")
+        self._lock = FileLock(data_path, name)
+
+    @property
+    def filename(self) -> str:
+        return self._backend(self._data_path, f"{self.name}_*").filename
+
+    @property
+    def path(self) -> str:
+        return self._data_path
+
+    def _partition(self, period: str) -> Storage:
+        return self._backend(self._data_path, f"{self.name}_{period}", self.schema)
+
+    def _period_of(self, data: DataFrame) -> pd.Series:
+        """
+        Get the partition period of every row.
+        """
+        tanggal = data[self._column]
+        if not pd.api.types.is_datetime64_any_dtype(tanggal):
+            tanggal = pd.to_datetime(tanggal, format=DATE_FORMAT)
+        return tanggal.dt.strftime(self._period_format)
+
+    def _split_legacy(self) -> None:
+        """
+        Move the rows of an unpartitioned table into partitions.
+
+        Readers holding only the shared lock get here too, so the split
+        takes the exclusive lock and checks again: another terminal may have
+        split the table meanwhile.
+        """
+        if not self._legacy.exists():
+            return
+        with self._lock.exclusive():
+            if not self._legacy.exists():
+                return
+            header = self._legacy.read_header()
+            data = self._legacy.read()
+            if data.empty and header and not self._periods():
+                self._partition(
+                    pd.Timestamp.now().strftime(self._period_format)).create(header)
+            self._append(data)
+            self._legacy.drop()
+
+    def _periods(self) -> list:
+        return sorted(
+            match.group(1)
+            for match in map(self._pattern.match, self._legacy.list_tables())
+            if match is not None)
+
+    def periods(self) -> list:
+        """
+        Get the periods that have a partition, oldest first.
+
+        Returns:
+            list: The periods, e.g. ["2024-01", "2024-02"].
+        """
+        self._split_legacy()
+        return self._periods()
+
+    def _bounds(self, period: str) -> tuple:
+        """
+        Get the first timestamp of a partition and the first one after it.
+        """
+        first = pd.Timestamp(period)
+        if len(period) == len("2024-01"):
+            return first, first + pd.DateOffset(months=1)
+        return first, first + pd.DateOffset(days=1)
+
+    def _overlaps(
+            self,
+            period: str,
+            start: pd.Timestamp | None,
+            end: pd.Timestamp | None) -> bool:
+        """
+        Check if a partition can hold rows between start and end.
+        """
+        first, last = self._bounds(period)
+        return (start is None or last > start) and (end is None or first < end)
+
+    def exists(self) -> bool:
+        return bool(self.periods())
+
+    def create(self, columns_name: list) -> None:
+        period = pd.Timestamp.now().strftime(self._period_format)
+        partition = self._partition(period)
+        if not partition.exists():
+            partition.create(columns_name)
+
+    def read_header(self) -> list:
+        periods = self.periods()
+        if not periods:
+            return []
+        return self._partition(periods[-1]).read_header()
+
+    def read(self, columns: list | None = None) -> DataFrame:
+        return self.read_range(columns)
+
+    def iter_chunks(
+            self,
+            columns: list | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        return self.iter_range(columns, None, None, chunksize)
+
+    def iter_range(
+            self,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None,
+            chunksize: int = 1000) -> Iterator[DataFrame]:
+        for period in self.periods():
+            if self._overlaps(period, start, end):
+                yield from self._partition(period).iter_chunks(columns, chunksize)
+
+    def split_range(
+            self,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> list:
+        pieces = []
+        for period in self.periods():
+            if self._overlaps(period, start, end):
+                first, last = self._bounds(period)
+                pieces.append((
+                    first if start is None else max(first, start),
+                    last if end is None else min(last, end)))
+        return pieces
+
+    def read_range(
+            self,
+            columns: list | None = None,
+            start: pd.Timestamp | None = None,
+            end: pd.Timestamp | None = None) -> DataFrame:
+        frames = [
+            self._partition(period).read(columns)
+            for period in self.periods()
+            if self._overlaps(period, start, end)]
+        frames = [frame for frame in frames if not frame.empty] or frames[:1]
+        if not frames:
+            return DataFrame(columns=columns or self.read_header())
+        return pd.concat(frames, ignore_index=True)
+
+    def signature(self) -> tuple:
+        return tuple(
+            (period, self._partition(period).signature())
+            for period in self.periods())
+
+    def size(self, start=None, end=None) -> int:
+        return sum(
+            self._partition(period).size()
+            for period in self.periods()
+            if self._overlaps(period, start, end))
+
+    def _append(self, data: DataFrame) -> None:
+        if data.empty:
+            return
+        for period, rows in data.groupby(self._period_of(data), sort=False):
+            partition = self._partition(period)
+            if not partition.exists():
+                partition.create(list(data.columns))
+            partition.append(rows)
+
+    def append(self, data: DataFrame) -> None:
+        self._split_legacy()
+        self._append(data)
+
+    def write(self, data: DataFrame) -> None:
+        self.drop()
+        if data.empty:
+            self.create(list(data.columns))
+        self._append(data)
+
+    def drop(self) -> None:
+        for period in self.periods():
+            self._partition(period).drop()
+
+    def list_tables(self) -> list:
+        return self._legacy.list_tables()
+
+
+class KeyedStorage(Storage):
+    """
+    A storage backend that changes rows by key without rewriting the table.
+
+    The table is stored by another backend and changes since the last
+    compaction go to a change log "<table>_log" in the same backend. Every
+    change is one appended record: "tambah" adds a row, "ubah" replaces the
+    row whose key is in "Kunci" (the new values may rename it), "hapus" is a
+    tombstone. Reads replay the log over the table, so rows keep their
+    place. write() replaces the table and removes the log, which is how the
+    Controller class compacts it.
+
+    Replaying the log over a table that already holds its changes would
+    apply some of them twice, so write() first stages the new rows as
+    "<table>_compact", then removes the log, then copies them over the
+    table. A staged table left by a crash is complete: reads use it, and
+    the next change finishes the compaction first.
+
+    Attributes:
+        - _base (Storage): The table as of the last compaction.
+        - _log (Storage): The change log.
+        - _staged (Storage): The new rows of a compaction not yet copied over the table.
+        - key (str): The column whose value identifies a row.
+        - dead (int): Records in the table and log that the last read replaced or removed.
+    """
+
+    def __init__(
+            self,
+            data_path: str,
+            name: str,
+            schema: dict | None = None,
+            backend: type = CsvStorage,
+            key: str = "Nama Menu") -> None:
+        """
+        Initialize the KeyedStorage class.
+
+        Args:
+            - data_path (str): The path to the data directory.
+            - name (str): The name of the table.
+            - schema (dict | None): The declared column types of the table.
+            - backend (type): The Storage class of the table and the log.
+            - key (str): The column whose value identifies a row.
+        """
+        super().__init__(data_path, name, schema)
+        self.key = key
+        self.dead = 0
+        self._base = backend(data_path, name, schema)
+        log_schema = None
+        if schema:
+            log_schema = {"Operasi": "category", "Kunci": schema[key], **schema}
+        self._log = backend(data_path, f"{name}_log", log_schema)
+        self._staged = backend(data_path, f"{name}_compact", schema)
+
+    @property
+    def filename(self) -> str:
+        return self._base.filename
+
+    @property
+    def path(self) -> str:
+        return self._base.path
+
+    def exists(self) -> bool:
+        return self._base.exists() or self._staged.exists()
+
+    def create(self, columns_name: list) -> None:
+        self._finish_compaction()
+        self._base.create(columns_name)
+
+    def read_header(self) -> list:
+        return self._base.read_header()
+
+    def read(self, columns: list | None = None) -> DataFrame:
+        self.dead = 0
+        if self._staged.exists():
+            data = self._staged.read()
+            return data if columns is None else data[columns]
+        data = self._base.read()
+        if self._log.exists():
+            data = self._replay(data, self._log.read())
+        return data if columns is None else data[columns]
+
+    def _replay(self, data: DataFrame, log: DataFrame) -> DataFrame:
+        """
+        Apply the change log to the rows of the table, in order.
+        """
+        positions = {}
+        for position, key in enumerate(data[self.key]):
+            positions.setdefault(key, position)
+        # Each slot holds a row of the table (its position) or of the log
+        # (len(data) + its position), None once deleted.
+        slots = list(range(len(data)))
+        for number, (operation, old_key, new_key) in enumerate(zip(
+                log["Operasi"], log["Kunci"], log[self.key])):
+            position = positions.pop(old_key, None)
+            if operation == "hapus":
+                if position is not None:
+                    slots[position] = None
+                    self.dead += 1
+                self.dead += 1
+                continue
+            if position is None:
+                # After a compaction that crashed before the log was removed,
+                # the table may already hold the new version.
+                position = positions.pop(new_key, None)
+            if position is None:
+                position = len(slots)
+                slots.append(None)
+            else:
+                self.dead += 1
+            slots[position] = len(data) + number
+            positions[new_key] = position
+
+        combined = pd.concat([data, log[list(data.columns)]], ignore_index=True)
+        return combined.iloc[[slot for slot in slots if slot is not None]].reset_index(drop=True)
+
+    def signature(self) -> tuple:
+        if self._staged.exists():
+            return ("compact", self._staged.signature())
+        if self._log.exists():
+            return (self._base.signature(), self._log.signature())
+        return self._base.signature()
+
+    def size(self, start=None, end=None) -> int:
+        return self._base.size() + self._log.size() + self._staged.size()
+
+    def _append_log(self, operation: str, data: DataFrame, keys: list) -> None:
+        # The categories of a few rows are still those of the whole table,
+        # which writers would otherwise convert in full.
+        records = data.astype({
+            column: object for column in data.columns
+            if isinstance(data[column].dtype, pd.CategoricalDtype)})
+        records.insert(0, "Kunci", keys)
+        records.insert(0, "Operasi", operation)
+        self._finish_compaction()
+        if not self._log.exists():
+            self._log.create(list(records.columns))
+        self._log.append(records)
+
+    def append(self, data: DataFrame) -> None:
+        self._finish_compaction()
+        if self._log.exists():
+            # Added after earlier changes, so a key deleted in the log can be
+            # added back.
+            self._append_log("tambah", data, list(data[self.key]))
+        else:
+            self._base.append(data)
+
+    def upsert(self, data: DataFrame, keys: list) -> None:
+        """
+        Record new versions of rows.
+
+        Args:
+            - data (DataFrame): The new rows.
+            - keys (list): The key each row had before, or its new key if it is new.
+        """
+        self._append_log("ubah", data, keys)
+
+    def remove(self, data: DataFrame) -> None:
+        """
+        Record tombstones for rows.
+
+        Args:
+            - data (DataFrame): The deleted rows.
+        """
+        self._append_log("hapus", data, list(data[self.key]))
+
+    def _finish_compaction(self) -> None:
+        """
+        Finish a compaction whose new rows are staged: remove the log, then
+        copy the rows over the table. Each step can be repeated after a crash.
+        """
+        if not self._staged.exists():
+            return
+        self._log.drop()
+        self._base.write(self._staged.read())
+        self._staged.drop()
+
+    def write(self, data: DataFrame) -> None:
+        self._staged.write(data)
+        self._finish_compaction()
+        self.dead = 0
+
+    def drop(self) -> None:
+        self._base.drop()
+        self._log.drop()
+        self._staged.drop()
+
+    def list_tables(self) -> list:
+        return self._base.list_tables()
+
+
+STORAGE_BACKENDS = {
+    "csv": CsvStorage,
+    "sqlite": SqliteStorage,
+    "parquet": ParquetStorage,
+}
+
+
+def migrate_csv(data_path: str, backend: str = "sqlite") -> list:
+    """
+    Copy every CSV table in the data directory into another backend.
+
+    Existing tables with the same name are replaced. The CSV files are left
+    untouched so the backends can be compared.
+
+    Args:
+        - data_path (str): The path to the data directory.
+        - backend (str): The target backend, "sqlite" or "parquet".
+
+    Returns:
+        list: The names of the migrated tables.
+    """
+    migrated = []
+    for filename in sorted(os.listdir(data_path)):
+        name, extension = os.path.splitext(filename)
+        if extension != ".csv":
+            continue
+        source = CsvStorage(data_path, name)
+        target = STORAGE_BACKENDS[backend](
+            data_path, name, TABLE_SCHEMAS.get(name))
+        header = source.read_header()
+        if not header:
+            continue
+        target.write(source.read())
+        migrated.append(name)
+    return migrated
+
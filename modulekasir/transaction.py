@@ -1,9 +1,33 @@
 import os
+import numpy as np
 import pandas as pd
+from .cart import Cart
+from .catalog import MenuCatalog
 from .db_controller import Controller
+from .inventory import Inventory
+from .journal import ENABLED as JOURNAL_ENABLED, Journal
+from .rollup import Rollup
+from .render import print_table
+from .schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+from .search import MenuSearch
+from .sequence import Sequence
 from prettytable import PrettyTable
 
 
+def is_whole_number(value) -> bool:
+    """
+    Check if a value is an integer, as opposed to a bool, float or text
+    that could be turned into one.
+
+    Args:
+        - value: The value to check.
+
+    Returns:
+        bool: True if the value is an integer, False otherwise.
+    """
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
 class Transaction:
     """
     A class used to represent a Transaction.
@@ -11,25 +35,37 @@ class Transaction:
     Attributes:
         - _Transaction (Controller): An instance of the Controller class.
         - _data_menu (Controller): An instance of the Controller class.
+        - _catalog (MenuCatalog): Looks up menu items without parsing data_menu.
+        - _rollup (Rollup): An instance of the Rollup class.
+        - _inventory (Inventory): Logs stock changes and warns about low stock.
+        - _order_number (Sequence): Hands out the order numbers.
+        - _search (MenuSearch): Suggests menu names for names that were not found.
+        - _journal (Journal | None): Saves orders to the write-ahead journal, if KASIR_JOURNAL is set.
         - _columns_name (list): A list of column names.
 
     Methods:
         - __init__(): Initializes the Transaction class.
         - transaction_date(): Get the current date and time.
         - transaction_change(): Calculate the change.
+        - commit_stock(): Apply the stock taken by an order in one write.
+        - checkout(orders: DataFrame, stok_keluar: dict): Save a finished order.
+        - stock_left(menus): Get the stock of menu items, less the orders in the journal.
+        - place_order(items: list, bayar: int | None): Make a transaction without prompts.
+        - place_orders(orders: list, payments: list | None): Make several transactions and save them together.
+        - save_cart(cart: Cart): Number and save an order that was paid for.
         - transaction(): Make a transaction.
     """
 
     def __init__(self) -> None:
         self._Transaction = Controller("data_transaksi")
         self._data_menu = Controller("data_menu")
-        self._columns_name = [
-            "No. Pembelian",
-            "Nama Menu",
-            "Harga",
-            "Jumlah",
-            "Total",
-            "Tanggal"]
+        self._catalog = MenuCatalog()
+        self._rollup = Rollup()
+        self._inventory = Inventory()
+        self._search = MenuSearch()
+        self._journal = Journal() if JOURNAL_ENABLED else None
+        self._order_number = Sequence(self._Transaction, "No. Pembelian", self._journal)
+        self._columns_name = list(TRANSACTION_SCHEMA)
 
     def transaction_date(self):
         now = pd.Timestamp.now()
@@ -48,60 +84,248 @@ class Transaction:
             kembalian = bayar - total
             return kembalian
 
-    def transaction(self):
-        data_transaksi = self._Transaction.read_data(self._columns_name)
+    def commit_stock(self, stok_keluar: dict) -> None:
+        """
+        Apply the stock taken by an order to data_menu in one write.
 
-        nomor_order = data_transaksi['No. Pembelian'].max()
-        if pd.isna(nomor_order):
-            nomor_order = 1
-        else:
-            nomor_order += 1
+        Args:
+            - stok_keluar (dict): Maps each menu name to the quantity sold.
+        """
+        if stok_keluar:
+            self._catalog.update_stock(
+                lambda: self._data_menu.adjust_many(
+                    {menu: -jumlah for menu, jumlah in stok_keluar.items()},
+                    'Stok',
+                    'Nama Menu'),
+                stok_keluar)
+
+    def checkout(self, orders: pd.DataFrame, stok_keluar: dict) -> None:
+        """
+        Save a finished order: lower the stock, log the lines, update the
+        totals and log the stock taken in the inventory ledger.
+
+        Args:
+            - orders (DataFrame): The order lines, one per order and menu item.
+            - stok_keluar (dict): Maps each menu name to the quantity sold.
+        """
+        self.commit_stock(stok_keluar)
+        save_orders = orders.values.tolist()
+        self._Transaction.add_data(save_orders, self._columns_name)
+        self._rollup.add_orders(orders)
+        self._inventory.record_sales(save_orders, self.stock_left(stok_keluar))
+
+    def stock_left(self, menus) -> dict:
+        """
+        Get the stock of menu items, less the stock taken by the orders
+        still in the journal.
+
+        Args:
+            - menus: The names of the menu items.
+
+        Returns:
+            dict: Maps each menu name that exists to its stock.
+        """
+        pending = {} if self._journal is None else self._journal.pending_stock()
+        stock = {}
+        for menu in menus:
+            found = self._catalog.lookup(menu)
+            if found is not None:
+                stock[menu] = found[1]['Stok'] - pending.get(menu, 0)
+        return stock
+
+    def place_order(self, items: list, bayar: int | None = None) -> pd.DataFrame:
+        """
+        Make a transaction without prompts.
+
+        Args:
+            - items (list): (menu name, quantity) pairs.
+            - bayar (int | None): The amount paid, or None if it isn't checked.
+
+        Returns:
+            DataFrame: The saved order lines.
+
+        Raises:
+            ValueError: If the order is empty, a menu doesn't exist, a
+                quantity is not positive, the stock is insufficient or the
+                payment is less than the total.
+        """
+        result = self.place_orders([items], [bayar])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def place_orders(self, orders: list[list], payments: list | None = None) -> list:
+        """
+        Make several transactions without prompts and save them together.
+
+        Every order is checked against the stock left by the orders before
+        it, and by the orders still in the journal. Rejected orders get no
+        order number and change nothing.
+
+        Args:
+            - orders (list): One list of (menu name, quantity) pairs per order.
+            - payments (list | None): The amount paid for each order, None
+              for an order whose payment isn't checked.
+
+        Returns:
+            list: Per order, its saved lines (DataFrame) or the ValueError
+                that rejected it.
+        """
+        payments = payments or [None] * len(orders)
+        if self._journal is None:
+            return self._place_orders(orders, payments)
+        # Nobody else takes stock between the check and the commit.
+        with self._journal.lock():
+            return self._place_orders(orders, payments)
 
+    def _place_orders(self, orders: list[list], payments: list) -> list:
+        # Orders in the journal have taken their stock, though data_menu
+        # doesn't show it yet.
+        stok_keluar = {} if self._journal is None else self._journal.pending_stock()
+        accepted = []
+        results = []
+        for items, bayar in zip(orders, payments):
+            try:
+                accepted.append(self._check_order(items, stok_keluar, bayar))
+                results.append(None)
+            except ValueError as error:
+                results.append(error)
+        if not accepted:
+            return results
+
+        nomor_order = self._order_number.next(len(accepted))
         timestamp = self.transaction_date()
+        for i, cart in enumerate(accepted):
+            cart.nomor = nomor_order + i
+            cart.tanggal = timestamp
+        saved = Cart.to_frame(accepted)
+        if self._journal is None:
+            self.checkout(saved, stok_keluar)
+        else:
+            self._journal.commit(accepted)
+
+        carts = iter(accepted)
+        position = 0
+        saved_orders = []
+        for result in results:
+            if result is None:
+                count = len(next(carts))
+                result = saved.iloc[position:position + count].reset_index(drop=True)
+                position += count
+            saved_orders.append(result)
+        return saved_orders
+
+    def _check_order(self, items: list, stok_keluar: dict, bayar: int | None = None) -> Cart:
+        """
+        Check an order against the menu and take its stock from stok_keluar.
+
+        Args:
+            - items (list): (menu name, quantity) pairs.
+            - stok_keluar (dict): Stock already taken, updated only if the
+              whole order is valid.
+            - bayar (int | None): The amount paid, or None if it isn't checked.
+
+        Returns:
+            Cart: The order, without order number and date.
+
+        Raises:
+            ValueError: If the order is not valid, or a quantity or the
+                payment is not an integer.
+        """
+        if not items:
+            raise ValueError("Pesanan masih kosong!")
+
+        if bayar is not None and not is_whole_number(bayar):
+            raise ValueError("Uang bayar harus berupa bilangan bulat!")
+
+        cart = Cart()
+        for menu, jumlah in items:
+            menu = str(menu).strip()
+            if not is_whole_number(jumlah):
+                raise ValueError(f"Jumlah {menu} harus berupa bilangan bulat!")
+            if jumlah <= 0:
+                raise ValueError(f"Jumlah {menu} harus lebih dari 0!")
+            found = self._catalog.lookup(menu)
+            if found is None:
+                raise ValueError(f"Menu {menu} tidak tersedia!{self._search.hint(menu)}")
+            _, item = found
+            sisa_stok = (item['Stok'] - stok_keluar.get(menu, 0)
+                         - cart.taken(menu))
+            if jumlah > sisa_stok:
+                raise ValueError(f"Stok {menu} tidak cukup (sisa {sisa_stok})!")
+            cart.add(menu, item['Harga'], jumlah)
+        if bayar is not None and bayar < cart.total:
+            raise ValueError(f"Uang anda kurang (total {cart.total})!")
+
+        for menu, jumlah in cart.stock_taken().items():
+            stok_keluar[menu] = stok_keluar.get(menu, 0) + jumlah
+        return cart
 
-        orders = pd.DataFrame(columns=self._columns_name)
+    def save_cart(self, cart: Cart) -> None:
+        """
+        Give an order that was paid for its number and time, and save it.
+
+        With the journal, other terminals may have taken the stock while the
+        order was being paid for, so it is checked again under the journal
+        lock before it is committed.
+
+        Args:
+            - cart (Cart): The order.
+
+        Raises:
+            ValueError: If the stock of a menu item ran out meanwhile.
+        """
+        if self._journal is None:
+            cart.nomor = self._order_number.next()
+            cart.tanggal = self.transaction_date()
+            self.checkout(Cart.to_frame([cart]), cart.stock_taken())
+            return
+        with self._journal.lock():
+            self._check_order(list(cart.stock_taken().items()), self._journal.pending_stock())
+            cart.nomor = self._order_number.next()
+            cart.tanggal = self.transaction_date()
+            self._journal.commit([cart])
+
+    def transaction(self):
+        # The stock taken by this order is written to data_menu, and the
+        # order gets its number and time, only once it is paid for.
+        cart = Cart()
 
         while True:
             os.system("cls")
-            data_menu = self._data_menu.read_data()
-            self._data_menu.show_data()
+            print_table(["No."] + list(MENU_SCHEMA), self._catalog.rows())
             print("=" * 15)
             menu, jumlah = input(
                 "Masukkan menu dan jumlah yang ingin dibeli (pisahkan dengan koma): ").split(",")
-            if data_menu['Nama Menu'].str.contains(menu).any():
-                harga = data_menu.loc[data_menu['Nama Menu']
-                                      == menu, 'Harga'].iloc[0]
+            menu = menu.strip()
+            found = self._catalog.lookup(menu)
+            if found is not None:
+                _, item = found
+                harga = item['Harga']
                 jumlah = self._data_menu.convert_types(jumlah, int)
-                total_harga = harga * jumlah
-
-                orders.loc[len(orders)] = [nomor_order, menu,
-                                           harga, jumlah, total_harga, timestamp]
-
-                # Update stok
-                stok = data_menu.loc[data_menu['Nama Menu']
-                                     == menu, 'Stok'].iloc[0]
-                stok -= int(jumlah)
-                row_index = data_menu[data_menu['Nama Menu'] == menu].index[0]
-                self._data_menu.update_data(row_index, stok, 'Stok')
+                sisa_stok = item['Stok'] - cart.taken(menu) - (
+                    0 if self._journal is None
+                    else self._journal.pending_stock().get(menu, 0))
+                if jumlah > sisa_stok:
+                    print(f"Stok {menu} tidak cukup (sisa {sisa_stok})")
+                    input("Tekan enter untuk melanjutkan...")
+                    continue
+                cart.add(menu, harga, jumlah)
                 tambah_menu = input("Tambah menu? (y/n): ").upper()
                 if tambah_menu == "Y":
                     continue
                 else:
                     break
             else:
-                print("Menu tidak tersedia")
+                print(f"Menu tidak tersedia.{self._search.hint(menu)}")
+                input("Tekan enter untuk melanjutkan...")
                 continue
 
         print("\n{:^76}".format("Struk Pembelian"))
         print("-" * 76)
 
         table = PrettyTable()
-        orders_to_display = orders.groupby(by=['No. Pembelian', 'Nama Menu']).aggregate({
-            'Harga': 'first',
-            'Jumlah': 'sum',
-            'Total': 'sum',
-            'Tanggal': 'first'
-        }).reset_index()
+        orders_to_display = Cart.to_frame([cart]).drop(columns=["No. Pembelian", "Tanggal"])
 
         table.field_names = orders_to_display.columns
         for row in orders_to_display.values:
@@ -109,14 +333,22 @@ class Transaction:
         print(table)
         print("-" * 76)
 
-        total = orders_to_display['Total'].sum()
+        total = cart.total
         print(f"Total harga: {total}")
         print("-" * 76)
         bayar = int(input("Bayar: "))
         kembalian = self.transaction_change(total, bayar)
+        try:
+            self.save_cart(cart)
+        except ValueError as error:
+            print(f"Pesanan dibatalkan: {error}")
+            input("Tekan enter untuk melanjutkan...")
+            return
         print(f"Kembalian: {kembalian}")
+        print(f"No. Pembelian: {cart.nomor}")
         print("=" * 76)
 
-        save_orders = orders_to_display.values.tolist()
-        self._Transaction.add_data(save_orders)
+        peringatan = self._inventory.warning(self.stock_left(cart.stock_taken()))
+        if peringatan:
+            print(peringatan)
         input("Tekan enter untuk melanjutkan...")
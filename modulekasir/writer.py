@@ -0,0 +1,172 @@
+import json
+import os
+import time
+import uuid
+import pandas as pd
+from .db_controller import Controller
+from .schema import DATE_FORMAT
+
+
+class WriteQueue:
+    """
+    A class used to hand data changes to a single writer process.
+
+    Terminals in queue mode drop each change as a JSON file in data/queue/
+    and wait for the writer's result. The writer applies the changes one by
+    one, so only one process ever writes the data files.
+
+    Attributes:
+        - _data_path (str): The path to the data directory.
+        - _queue_path (str): The path to the queue directory.
+        - _controllers (dict): Controllers used by the writer, keyed by table.
+        - _methods (set): The Controller methods a request may call.
+
+    Methods:
+        - __init__(data_path: str): Initializes the WriteQueue class.
+        - submit(table: str, method: str, kwargs: dict): Send a change and wait for it.
+        - process_pending(): Apply every waiting change.
+        - serve(): Run the writer loop.
+    """
+
+    _methods = {
+        "add_data",
+        "update_many",
+        "adjust_many",
+        "delete_data",
+        "update_key",
+        "delete_key",
+        "compact",
+        "save_data",
+        "accumulate",
+    }
+
+    def __init__(self, data_path: str) -> None:
+        self._data_path = data_path
+        self._queue_path = os.path.join(data_path, "queue")
+        self._controllers = {}
+        os.makedirs(self._queue_path, exist_ok=True)
+
+    def _to_json(self, value):
+        if isinstance(value, pd.Timestamp):
+            return value.strftime(DATE_FORMAT)
+        if hasattr(value, "item"):
+            return value.item()
+        raise TypeError(f"{type(value).__name__} tidak dapat dikirim!")
+
+    def _write_json(self, path: str, content: dict) -> None:
+        """
+        Write a JSON file atomically, so the reader never sees half of it.
+        """
+        temp = path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(content, f, default=self._to_json)
+        os.replace(temp, path)
+
+    def submit(
+            self,
+            table: str,
+            method: str,
+            kwargs: dict,
+            timeout: float = 30.0) -> None:
+        """
+        Send a change to the writer and wait until it is applied.
+
+        Args:
+            - table (str): The name of the table.
+            - method (str): The Controller method to call.
+            - kwargs (dict): The arguments of the method.
+            - timeout (float): Seconds to wait for the writer.
+
+        Raises:
+            TimeoutError: If the writer doesn't answer in time.
+            RuntimeError: If the writer failed to apply the change.
+        """
+        if "newdata" in kwargs and isinstance(kwargs["newdata"], dict):
+            # JSON object keys are always strings, so send the pairs instead.
+            kwargs = dict(kwargs, newdata=list(kwargs["newdata"].items()))
+        request_id = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._write_json(
+            os.path.join(self._queue_path, request_id + ".json"),
+            {"table": table, "method": method, "kwargs": kwargs})
+
+        result_path = os.path.join(self._queue_path, request_id + ".done")
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(result_path):
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    "Proses penulis (python -m modulekasir.writer) tidak merespons!")
+            time.sleep(0.002)
+        with open(result_path, "r") as f:
+            result = json.load(f)
+        os.remove(result_path)
+        if not result["ok"]:
+            raise RuntimeError(result["error"])
+
+    def _apply(self, request: dict) -> None:
+        method = request["method"]
+        if method not in self._methods:
+            raise ValueError(f"Perintah {method} tidak dikenal!")
+        kwargs = request["kwargs"]
+        if method in ("update_many", "adjust_many"):
+            key = "newdata" if method == "update_many" else "deltas"
+            if isinstance(kwargs[key], list):
+                kwargs[key] = {k: v for k, v in kwargs[key]}
+
+        table = request["table"]
+        if table not in self._controllers:
+            self._controllers[table] = Controller(table, writer="direct")
+        getattr(self._controllers[table], method)(**kwargs)
+
+    def process_pending(self) -> int:
+        """
+        Apply every waiting change, oldest first.
+
+        Returns:
+            int: The number of changes processed.
+        """
+        requests = sorted(
+            filename for filename in os.listdir(self._queue_path)
+            if filename.endswith(".json"))
+        for filename in requests:
+            path = os.path.join(self._queue_path, filename)
+            with open(path, "r") as f:
+                request = json.load(f)
+            try:
+                self._apply(request)
+                result = {"ok": True}
+            except Exception as error:
+                result = {"ok": False, "error": str(error)}
+            self._write_json(path[:-len(".json")] + ".done", result)
+            os.remove(path)
+        return len(requests)
+
+    def serve(self, poll_interval: float = 0.002) -> None:
+        """
+        Run the writer loop until interrupted.
+
+        Args:
+            - poll_interval (float): Seconds to sleep when the queue is empty.
+        """
+        while True:
+            if not self.process_pending():
+                time.sleep(poll_interval)
+
+
+def main() -> None:
+    """
+    Run the single writer process for the data directory.
+
+    Usage: KASIR_WRITER=queue python Kasir.py (per terminal), and once:
+    python -m modulekasir.writer
+    """
+    data_path = os.environ.get("KASIR_DATA_DIR") or os.path.join(
+        os.path.split(os.path.dirname(os.path.abspath(__file__)))[0], "data")
+    print(f"Menunggu perubahan data di {data_path}...")
+    try:
+        WriteQueue(data_path).serve()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
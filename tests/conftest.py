@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    An empty data directory used by every Controller of the test.
+    """
+    monkeypatch.setenv("KASIR_DATA_DIR", str(tmp_path))
+    for name in ("KASIR_STORAGE", "KASIR_WRITER", "KASIR_PARTITION", "KASIR_JOURNAL"):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
@@ -0,0 +1,42 @@
+import numpy as np
+from modulekasir.cart import Cart
+from modulekasir.schema import TRANSACTION_SCHEMA
+
+TANGGAL = "01-10-2026 12:00:00"
+
+
+def test_lines_of_the_same_item_are_merged():
+    cart = Cart()
+    cart.add("Soto", 15000, 2)
+    cart.add("Es Teh", 5000, 1)
+    cart.add("Soto", 15000, 3)
+
+    assert len(cart) == 2
+    assert (cart.jumlah, cart.total) == (6, 80000)
+    assert cart.taken("Soto") == 5
+    assert cart.taken("Sate") == 0
+    assert cart.stock_taken() == {"Soto": 5, "Es Teh": 1}
+
+
+def test_prices_read_from_the_menu_are_python_ints():
+    cart = Cart()
+    cart.add("Soto", np.int32(15000), np.int32(200000))
+    assert cart.total == 3_000_000_000
+    assert type(cart.rows()[0][2]) is int
+
+
+def test_to_frame_keeps_the_order_of_carts_and_items():
+    first = Cart(1, TANGGAL)
+    first.add("Soto", 15000, 2)
+    first.add("Es Teh", 5000, 1)
+    second = Cart(2, TANGGAL)
+    second.add("Sate", 20000, 4)
+
+    frame = Cart.to_frame([first, second])
+    assert list(frame.columns) == list(TRANSACTION_SCHEMA)
+    assert frame.values.tolist() == first.rows() + second.rows() == [
+        [1, "Soto", 15000, 2, 30000, TANGGAL],
+        [1, "Es Teh", 5000, 1, 5000, TANGGAL],
+        [2, "Sate", 20000, 4, 80000, TANGGAL],
+    ]
+    assert Cart.to_frame([]).empty
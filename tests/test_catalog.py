@@ -0,0 +1,82 @@
+import os
+from modulekasir.catalog import MenuCatalog
+from modulekasir.db_controller import Controller
+from modulekasir.schema import MENU_SCHEMA
+
+
+def make_menu() -> Controller:
+    menu = Controller("data_menu")
+    menu.add_data([
+        ["Soto", "Makanan", 15000, 10],
+        ["Sate", "Makanan", 20000, 10],
+        ["Es Teh", "Minuman", 5000, 10],
+    ], list(MENU_SCHEMA))
+    return menu
+
+
+def test_stock_change_patches_the_catalog_in_place(data_dir):
+    menu = make_menu()
+    catalog = MenuCatalog()
+    version = catalog.version()
+    inode = os.stat(catalog.path).st_ino
+
+    catalog.update_stock(
+        lambda: menu.adjust_many({"Soto": -3, "Es Teh": -1}, "Stok", "Nama Menu"),
+        ["Soto", "Es Teh"])
+
+    assert catalog.lookup("Soto") == (0, {
+        "Nama Menu": "Soto", "Jenis Menu": "Makanan", "Harga": 15000, "Stok": 7})
+    assert catalog.lookup("Es Teh")[1]["Stok"] == 9
+    # The digest now matches the changed menu, so nobody rebuilds it.
+    current = catalog._attach()
+    assert catalog._digest_of(current) == catalog._digest(menu._file_signature())
+    MenuCatalog._maps.clear()
+    assert MenuCatalog().version() == version
+    assert os.stat(catalog.path).st_ino == inode
+
+
+def test_menu_edit_rebuilds_the_catalog(data_dir):
+    menu = make_menu()
+    catalog = MenuCatalog()
+    version = catalog.version()
+
+    menu.update_key("Sate", ["Sate Ayam", "Makanan", 22000, 10])
+    assert catalog.version() > version
+    assert catalog.lookup("Sate") is None
+    assert catalog.lookup("Sate Ayam") == (1, {
+        "Nama Menu": "Sate Ayam", "Jenis Menu": "Makanan", "Harga": 22000, "Stok": 10})
+    assert catalog.names() == ["Soto", "Sate Ayam", "Es Teh"]
+    assert [row[1] for row in catalog.rows()] == ["Soto", "Sate Ayam", "Es Teh"]
+
+
+def test_lookup_of_missing_and_duplicate_names(data_dir):
+    # A menu file written by hand may hold a name twice.
+    (data_dir / "data_menu.csv").write_text(
+        "Nama Menu,Jenis Menu,Harga,Stok\n"
+        "Soto,Makanan,15000,10\n"
+        "Bakso,Makanan,12000,10\n"
+        "Soto,Makanan,16000,5\n")
+    catalog = MenuCatalog()
+
+    assert catalog.lookup("Rawon") is None
+    assert catalog.lookup("") is None
+    assert catalog.lookup("Soto") == Controller("data_menu").lookup("Nama Menu", "Soto")
+    assert catalog.lookup("Soto")[1]["Harga"] == 15000
+
+
+def test_attach_maps_a_replaced_catalog(data_dir):
+    menu = make_menu()
+    catalog = MenuCatalog()
+    catalog.lookup("Soto")
+    old = MenuCatalog._maps[catalog.path]
+
+    # Another terminal changes the menu and rebuilds the catalog.
+    menu.update_key("Soto", ["Soto", "Makanan", 17000, 10])
+    del MenuCatalog._maps[catalog.path]
+    MenuCatalog().lookup("Soto")
+    MenuCatalog._maps[catalog.path] = old
+
+    current = catalog._attach()
+    assert current is not old
+    assert current["inode"] != old["inode"]
+    assert catalog.lookup("Soto")[1]["Harga"] == 17000
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.ingest import Ingest
+from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+
+ORDERS = """Order,Nama Menu,Jumlah,Tanggal
+A,Soto,2,01-10-2026 09:00:00
+A,Es Teh,1,01-10-2026 09:00:00
+B,Soto,abc,
+B,Sate,1,
+C,Soto,1.5,
+D,Sate,1,2026-10-01
+E,Rawon,1,
+F,Sate,8,02-10-2026 10:00:00
+G,Sate,3,02-10-2026 11:00:00
+H,Sate,2,02-10-2026 12:00:00
+H,Soto,1,02-10-2026 12:00:00
+"""
+
+REASONS = {
+    "B": ["Jumlah tidak valid", "Baris lain pada order tidak valid"],
+    "C": ["Jumlah tidak valid"],
+    "D": ["Tanggal tidak valid"],
+    "E": ["Menu tidak tersedia"],
+    "G": ["Stok tidak cukup"],
+}
+
+
+@pytest.fixture
+def orders_file(data_dir):
+    Controller("data_menu").add_data([
+        ["Soto", "Makanan", 15000, 10],
+        ["Sate", "Makanan", 20000, 10],
+        ["Es Teh", "Minuman", 5000, 10],
+    ], list(MENU_SCHEMA))
+    # An order taken at the till before the file.
+    Controller("data_transaksi").add_data(
+        [5, "Soto", 15000, 1, 15000, "30-09-2026 20:00:00"], list(TRANSACTION_SCHEMA))
+    path = data_dir / "pesanan.csv"
+    path.write_text(ORDERS)
+    return path
+
+
+def stock() -> dict:
+    Controller._cache.clear()
+    menu = Controller("data_menu").read_data()
+    return dict(zip(menu["Nama Menu"].astype(str), menu["Stok"]))
+
+
+def test_invalid_orders_are_rejected_with_their_reason(orders_file):
+    counts = Ingest().ingest_file(str(orders_file))
+    assert counts == {
+        "baris": 11,
+        "order": 8,
+        "baris_disimpan": 5,
+        "order_disimpan": 3,
+        "baris_ditolak": 6,
+        "order_ditolak": 5,
+    }
+    rejected = pd.read_csv(orders_file.with_suffix(".rejected.csv"), dtype=str)
+    assert rejected.groupby("Order")["Alasan"].agg(list).to_dict() == REASONS
+
+
+def test_accepted_orders_take_stock_and_numbers(orders_file):
+    Ingest().ingest_file(str(orders_file))
+
+    # Sate: 8 for F, then G finds 2 left and H takes them.
+    assert stock() == {"Soto": 7, "Sate": 0, "Es Teh": 9}
+    transaksi = Controller("data_transaksi").read_data()
+    saved = transaksi[transaksi["No. Pembelian"] > 5]
+    assert saved[["No. Pembelian", "Nama Menu", "Jumlah", "Total"]].astype(
+        {"Nama Menu": str}).values.tolist() == [
+        [6, "Soto", 2, 30000],
+        [6, "Es Teh", 1, 5000],
+        [7, "Sate", 8, 160000],
+        [8, "Sate", 2, 40000],
+        [8, "Soto", 1, 15000],
+    ]
+    assert saved["Tanggal"].dt.strftime("%d-%m %H").tolist() == [
+        "01-10 09", "01-10 09", "02-10 10", "02-10 12", "02-10 12"]
+    ledger = Controller("data_stok").read_data()
+    assert ledger["No. Pembelian"].tolist() == [6, 6, 7, 8, 8]
+    assert ledger["Alasan"].astype(str).unique().tolist() == ["impor"]
+
+
+def test_dry_run_saves_nothing(orders_file):
+    counts = Ingest().ingest_file(str(orders_file), dry_run=True)
+    assert (counts["order_disimpan"], counts["order_ditolak"]) == (3, 5)
+    assert stock() == {"Soto": 10, "Sate": 10, "Es Teh": 10}
+    assert Controller("data_transaksi").read_data()["No. Pembelian"].tolist() == [5]
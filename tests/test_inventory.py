@@ -0,0 +1,80 @@
+import math
+from datetime import datetime, timedelta
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.inventory import RATE_HOURS, REORDER_HOURS, Inventory
+from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+
+T0 = datetime(2026, 10, 1, 12)
+
+
+def sell(*sales) -> list:
+    """
+    Save (menu, quantity, time) sales to the transaction log and the ledger.
+    """
+    lines = [
+        [nomor, menu, 1000, jumlah, 1000 * jumlah, waktu]
+        for nomor, (menu, jumlah, waktu) in enumerate(sales, start=1)]
+    Controller("data_transaksi").add_data(lines, list(TRANSACTION_SCHEMA))
+    Inventory().record_sales(lines, {})
+    return lines
+
+
+def test_rate_decays_exponentially(data_dir):
+    sell(("Soto", 24, T0))
+    inventory = Inventory()
+
+    assert inventory.rate("Soto", T0) == pytest.approx(24 / RATE_HOURS)
+    assert inventory.rate("Soto", T0 + timedelta(hours=RATE_HOURS)) == pytest.approx(
+        24 / RATE_HOURS / math.e)
+    # A rate doesn't grow back before its last update.
+    assert inventory.rate("Soto", T0 - timedelta(hours=1)) == pytest.approx(24 / RATE_HOURS)
+    assert inventory.rate("Sate", T0) == 0.0
+
+
+def test_sales_add_up_like_a_rebuild(data_dir):
+    now = datetime.now().replace(microsecond=0)
+    # The last sale is older than the rate, like an imported order.
+    sell(("Soto", 12, now - timedelta(hours=24)),
+         ("Soto", 6, now - timedelta(hours=12)),
+         ("Sate", 4, now - timedelta(hours=2)),
+         ("Soto", 6, now - timedelta(hours=30)))
+    expected = {
+        "Soto": (12 * math.exp(-24 / RATE_HOURS) + 6 * math.exp(-12 / RATE_HOURS)
+                 + 6 * math.exp(-30 / RATE_HOURS)) / RATE_HOURS,
+        "Sate": 4 * math.exp(-2 / RATE_HOURS) / RATE_HOURS,
+    }
+    for menu, laju in expected.items():
+        assert Inventory().rate(menu, now) == pytest.approx(laju)
+
+    Inventory().rebuild()
+    Controller._cache.clear()
+    for menu, laju in expected.items():
+        assert Inventory().rate(menu, now) == pytest.approx(laju, rel=1e-3)
+
+
+def test_low_stock(data_dir):
+    # One Soto per hour.
+    sell(("Soto", int(RATE_HOURS), T0))
+    alerts = Inventory().low_stock({"Soto": 5, "Sate": 0, "Es Teh": 100}, T0)
+    assert alerts == [("Soto", 5, pytest.approx(5.0)), ("Sate", 0, None)]
+    assert Inventory().low_stock({"Soto": 100}, T0) == []
+
+
+def test_reorder(data_dir):
+    Controller("data_menu").add_data([
+        ["Soto", "Makanan", 15000, 5],
+        ["Sate", "Makanan", 20000, 200],
+        ["Es Teh", "Minuman", 5000, 0],
+    ], list(MENU_SCHEMA))
+    # One Soto and two Sate per hour.
+    sell(("Soto", int(RATE_HOURS), T0), ("Sate", int(2 * RATE_HOURS), T0))
+
+    report = Inventory().reorder(now=T0)
+    assert report["Nama Menu"].tolist() == ["Soto", "Es Teh"]
+    assert report["Habis (Jam)"].tolist()[0] == 5.0
+    assert report["Pesan"].tolist() == [math.ceil(REORDER_HOURS - 5), 0]
+
+    report = Inventory().reorder(semua=True, now=T0)
+    assert report["Nama Menu"].tolist() == ["Soto", "Sate", "Es Teh"]
+    assert report["Habis (Jam)"].tolist()[:2] == [5.0, 100.0]
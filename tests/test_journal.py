@@ -0,0 +1,186 @@
+import math
+from datetime import datetime
+import pytest
+from modulekasir.cart import Cart
+from modulekasir.catalog import MenuCatalog
+from modulekasir.db_controller import Controller
+from modulekasir.inventory import RATE_HOURS, Inventory, parse_time
+from modulekasir.journal import Journal
+from modulekasir.rollup import Rollup
+from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+from modulekasir import transaction
+from modulekasir.transaction import Transaction
+
+TANGGAL = "01-10-2026 12:00:00"
+
+ORDERS = [
+    (1, {"Soto": 2, "Sate": 1}),
+    (2, {"Soto": 3}),
+    (3, {"Sate": 4, "Soto": 1}),
+]
+
+
+def make_menu() -> None:
+    Controller("data_menu").add_data([
+        ["Soto", "Makanan", 15000, 20],
+        ["Sate", "Makanan", 20000, 20],
+    ], list(MENU_SCHEMA))
+
+
+def carts(orders: list) -> list:
+    result = []
+    for nomor, items in orders:
+        cart = Cart(nomor, TANGGAL)
+        for menu, jumlah in items.items():
+            cart.add(menu, 15000 if menu == "Soto" else 20000, jumlah)
+        result.append(cart)
+    return result
+
+
+def restart() -> Journal:
+    """
+    Forget what this process knows, like a terminal started after a crash,
+    and open the journal again, which recovers it.
+    """
+    Journal._started.clear()
+    Journal._views.clear()
+    Controller._cache.clear()
+    MenuCatalog._maps.clear()
+    return Journal()
+
+
+def stock() -> dict:
+    menu = Controller("data_menu").read_data(["Nama Menu", "Stok"])
+    return dict(zip(menu["Nama Menu"].astype(str), menu["Stok"]))
+
+
+def assert_applied_once(orders: list) -> None:
+    lines = [(nomor, menu) for nomor, items in orders for menu in items]
+    taken = {"Soto": 0, "Sate": 0}
+    for _, items in orders:
+        for menu, jumlah in items.items():
+            taken[menu] += jumlah
+
+    transaksi = Controller("data_transaksi").read_data()
+    assert sorted(zip(transaksi["No. Pembelian"], transaksi["Nama Menu"].astype(str))) == sorted(lines)
+    ledger = Controller("data_stok").read_data()
+    assert sorted(zip(ledger["No. Pembelian"], ledger["Nama Menu"].astype(str))) == sorted(lines)
+    assert stock() == {menu: 20 - jumlah for menu, jumlah in taken.items()}
+    per_menu = Rollup().get_per_menu()
+    assert dict(zip(per_menu["Nama Menu"].astype(str), per_menu["Jumlah"])) == taken
+    # Every sale counts once in the consumption rates too.
+    now = datetime.now()
+    decay = math.exp(-(now - parse_time(TANGGAL)).total_seconds() / 3600 / RATE_HOURS)
+    for menu, jumlah in taken.items():
+        assert Inventory().rate(menu, now) == pytest.approx(jumlah / RATE_HOURS * decay, rel=1e-3)
+
+
+def test_checkpoint_applies_the_journal(data_dir):
+    make_menu()
+    journal = restart()
+    journal.commit(carts(ORDERS))
+
+    assert journal.pending_stock() == {"Soto": 6, "Sate": 5}
+    assert stock() == {"Soto": 20, "Sate": 20}
+    assert journal.checkpoint() == 3
+    assert journal.pending_stock() == {}
+    assert_applied_once(ORDERS)
+
+
+def test_torn_tail_is_ignored_and_cut_off(data_dir):
+    make_menu()
+    journal = restart()
+    journal.commit(carts(ORDERS[:2]))
+    # A commit that crashed halfway through its write.
+    with open(data_dir / "journal.jsonl", "ab") as f:
+        f.write(b'0badc0de {"id": 3, "stok": {"Soto": 1')
+
+    # Read the journal again from the start, as another terminal would.
+    Journal._views.clear()
+    assert journal.pending_stock() == {"Soto": 5, "Sate": 1}
+    journal.commit(carts(ORDERS[2:]))
+
+    lines = (data_dir / "journal.jsonl").read_bytes().splitlines(keepends=True)
+    assert [journal._decode(line)["id"] for line in lines] == [1, 2, 3]
+    assert journal.checkpoint() == 3
+    assert_applied_once(ORDERS)
+
+
+@pytest.mark.parametrize("owner, method", [
+    (Journal, "_write_stock"),
+    (Inventory, "record_sales"),
+    (Inventory, "_update_rates"),
+    (Rollup, "add_orders"),
+    (Journal, "_start_over"),
+])
+def test_interrupted_checkpoint_applies_no_order_twice(data_dir, monkeypatch, owner, method):
+    make_menu()
+    journal = restart()
+    journal.commit(carts(ORDERS))
+
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(owner, method, crash)
+        with pytest.raises(KeyboardInterrupt):
+            journal.checkpoint()
+    assert "applying" in journal._read_state()
+
+    journal = restart()
+    assert journal._read_state() == {"applied": 3}
+    assert journal.pending_stock() == {}
+    assert_applied_once(ORDERS)
+
+    # Orders after the recovery are numbered and applied as usual.
+    later = [(4, {"Soto": 1})]
+    journal.commit(carts(later))
+    assert journal.checkpoint() == 1
+    assert_applied_once(ORDERS + later)
+
+
+def test_missing_skips_saved_orders(data_dir):
+    make_menu()
+    journal = restart()
+    lines = [line for cart in carts(ORDERS) for line in cart.rows()]
+    transaksi = Controller("data_transaksi")
+    transaksi.add_data(lines[:3], list(TRANSACTION_SCHEMA))
+
+    assert journal._missing(transaksi, lines) == lines[3:]
+    assert journal._missing(Controller("data_stok"), lines) == lines
+
+
+@pytest.fixture
+def journal_on(monkeypatch):
+    monkeypatch.setattr(transaction, "JOURNAL_ENABLED", True)
+
+
+def test_paid_order_is_checked_again_before_commit(data_dir, journal_on):
+    make_menu()
+    journal = restart()
+    terminals = [Transaction(), Transaction()]
+    cart = carts([(None, {"Soto": 15})])[0]
+
+    # Another terminal sells Soto while this order is being paid for.
+    terminals[1].save_cart(carts([(None, {"Soto": 10})])[0])
+    with pytest.raises(ValueError, match="Stok Soto tidak cukup"):
+        terminals[0].save_cart(cart)
+    assert journal.pending_stock() == {"Soto": 10}
+
+    terminals[0].save_cart(carts([(None, {"Soto": 10})])[0])
+    assert journal.checkpoint() == 2
+    assert stock() == {"Soto": 0, "Sate": 20}
+    assert Controller("data_transaksi").read_data()["No. Pembelian"].tolist() == [1, 2]
+
+
+def test_lost_sequence_counts_the_orders_in_the_journal(data_dir, journal_on):
+    make_menu()
+    journal = restart()
+    Transaction().place_order([("Soto", 1)])
+    Transaction().place_order([("Sate", 1)])
+    (data_dir / "data_transaksi.seq").unlink()
+
+    saved = Transaction().place_order([("Soto", 1)])
+    assert saved["No. Pembelian"].tolist() == [3]
+    assert journal.checkpoint() == 3
+    assert Controller("data_transaksi").read_data()["No. Pembelian"].tolist() == [1, 2, 3]
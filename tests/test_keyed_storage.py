@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+from modulekasir import db_controller
+from modulekasir.db_controller import Controller
+from modulekasir.schema import CONSUMPTION_SCHEMA, MENU_SCHEMA
+from modulekasir.storage import CsvStorage
+
+COLUMNS = list(MENU_SCHEMA)
+
+
+@pytest.fixture(autouse=True)
+def no_background_compaction(monkeypatch):
+    """
+    Keep the change log until a test compacts the table itself.
+    """
+    monkeypatch.setattr(db_controller, "COMPACT_RATIO", float("inf"))
+
+
+def make_menu() -> Controller:
+    menu = Controller("data_menu")
+    menu.add_data([
+        ["Soto", "Makanan", 15000, 10],
+        ["Sate", "Makanan", 20000, 10],
+        ["Es Teh", "Minuman", 5000, 10],
+        ["Bakso", "Makanan", 18000, 10],
+    ], COLUMNS)
+    return menu
+
+
+def change_menu(menu: Controller) -> None:
+    """
+    Leave every kind of record in the change log: an update, a chain of
+    renames, a tombstone, a deleted name added back and a new row.
+    """
+    menu.update_key("Soto", ["Soto", "Makanan", 16000, 8])
+    menu.update_key("Sate", ["Sate Ayam", "Makanan", 20000, 10])
+    menu.update_key("Sate Ayam", ["Sate Kambing", "Makanan", 25000, 10])
+    menu.delete_key("Es Teh")
+    menu.add_data(["Es Teh", "Minuman", 6000, 5], COLUMNS)
+    menu.add_data(["Mie Ayam", "Makanan", 17000, 7], COLUMNS)
+
+
+def rows(menu: Controller) -> list:
+    Controller._cache.clear()
+    return menu.read_data(COLUMNS).values.tolist()
+
+
+EXPECTED = [
+    ["Soto", "Makanan", 16000, 8],
+    ["Sate Kambing", "Makanan", 25000, 10],
+    ["Bakso", "Makanan", 18000, 10],
+    ["Es Teh", "Minuman", 6000, 5],
+    ["Mie Ayam", "Makanan", 17000, 7],
+]
+
+
+def test_replay_keeps_rows_in_place(data_dir):
+    menu = make_menu()
+    change_menu(menu)
+
+    assert (data_dir / "data_menu_log.csv").exists()
+    assert rows(menu) == EXPECTED
+
+
+def test_compaction_drops_the_log(data_dir):
+    menu = make_menu()
+    change_menu(menu)
+    menu.compact()
+
+    assert not (data_dir / "data_menu_log.csv").exists()
+    assert rows(menu) == EXPECTED
+
+
+@pytest.mark.parametrize("method, table", [
+    ("drop", "data_menu_log"),
+    ("write", "data_menu"),
+    ("drop", "data_menu_compact"),
+])
+def test_interrupted_compaction_applies_no_change_twice(data_dir, monkeypatch, method, table):
+    menu = make_menu()
+    change_menu(menu)
+    original = getattr(CsvStorage, method)
+
+    def crash(self, *args):
+        # The process dies at this step of the compaction.
+        if self.name == table:
+            raise KeyboardInterrupt
+        return original(self, *args)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(CsvStorage, method, crash)
+        with pytest.raises(KeyboardInterrupt):
+            menu.compact()
+
+    assert rows(menu) == EXPECTED
+
+    # The next change finishes the compaction before it is recorded.
+    menu.update_key("Bakso", ["Bakso", "Makanan", 18000, 9])
+    assert not (data_dir / "data_menu_compact.csv").exists()
+    assert rows(menu) == EXPECTED[:2] + [["Bakso", "Makanan", 18000, 9]] + EXPECTED[3:]
+
+
+def test_update_parses_dates_day_first(data_dir):
+    rates = Controller("rekap_stok")
+    rates.add_data([["Soto", 1.0, "01-10-2026 12:00:00"]], list(CONSUMPTION_SCHEMA))
+    rates.update_key("Soto", ["Soto", 2.0, "02-10-2026 12:00:00"])
+    rates.update_key("Soto", "03-10-2026 08:00:00", "Diperbarui")
+
+    Controller._cache.clear()
+    assert rates.read_data()["Diperbarui"].tolist() == [pd.Timestamp("2026-10-03 08:00:00")]
@@ -0,0 +1,65 @@
+import os
+import threading
+import pytest
+from modulekasir.locking import FileLock
+
+fcntl = pytest.importorskip("fcntl")
+
+
+def can_lock(path: str, mode: int) -> bool:
+    """
+    Try to take the lock file through another open file, as another
+    process would.
+    """
+    fd = os.open(path, os.O_RDWR)
+    try:
+        fcntl.flock(fd, mode | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+def test_exclusive_lock_is_reentrant(tmp_path):
+    lock = FileLock(str(tmp_path), "data_menu")
+    path = str(tmp_path / "data_menu.lock")
+    with lock.exclusive():
+        with FileLock(str(tmp_path), "data_menu").exclusive():
+            assert not can_lock(path, fcntl.LOCK_SH)
+        # Leaving the inner lock keeps the outer one.
+        assert not can_lock(path, fcntl.LOCK_SH)
+        with lock.shared():
+            assert not can_lock(path, fcntl.LOCK_SH)
+    assert can_lock(path, fcntl.LOCK_EX)
+    assert path not in FileLock._held
+
+
+def test_shared_lock_is_upgraded_and_downgraded(tmp_path):
+    lock = FileLock(str(tmp_path), "data_menu")
+    path = str(tmp_path / "data_menu.lock")
+    with lock.shared():
+        assert can_lock(path, fcntl.LOCK_SH)
+        assert not can_lock(path, fcntl.LOCK_EX)
+        with lock.exclusive():
+            assert not can_lock(path, fcntl.LOCK_SH)
+        assert can_lock(path, fcntl.LOCK_SH)
+    assert can_lock(path, fcntl.LOCK_EX)
+
+
+def test_other_threads_wait_for_the_lock(tmp_path):
+    lock = FileLock(str(tmp_path), "data_menu")
+    order = []
+
+    def other():
+        with lock.exclusive():
+            order.append("other")
+
+    with lock.exclusive():
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        order.append("first")
+    thread.join()
+    assert order == ["first", "other"]
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.metrics import Metrics
+from modulekasir.schema import TRANSACTION_SCHEMA
+
+
+@pytest.fixture
+def metrics():
+    Metrics.reset()
+    Metrics.enable()
+    yield Metrics
+    Metrics.disable()
+    Metrics.reset()
+
+
+def test_scans_count_rows_per_chunk(data_dir, metrics):
+    transaksi = Controller("data_transaksi")
+    transaksi.add_data([
+        [i, "Soto", 15000, 1, 15000, pd.Timestamp("2026-10-01") + pd.Timedelta(hours=i)]
+        for i in range(1, 101)], list(TRANSACTION_SCHEMA))
+    Controller._cache.clear()
+
+    chunks = list(transaksi.iter_data(chunksize=30))
+    stats = metrics.snapshot()["tables"]["data_transaksi"]["storage.iter_range"]
+    assert stats["rows"] == sum(len(chunk) for chunk in chunks) == 100
+    assert stats["calls"] > 1
+    assert stats["bytes_read"] == sum(
+        path.stat().st_size for path in data_dir.glob("data_transaksi_*.csv"))
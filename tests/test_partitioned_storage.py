@@ -0,0 +1,87 @@
+import os
+import pandas as pd
+import pytest
+from modulekasir.locking import FileLock
+from modulekasir.schema import TRANSACTION_SCHEMA
+from modulekasir.storage import CsvStorage, PartitionedStorage
+
+COLUMNS = list(TRANSACTION_SCHEMA)
+
+
+def orders(*dates) -> pd.DataFrame:
+    return pd.DataFrame(
+        [[i, "Soto", 15000, 1, 15000, pd.Timestamp(date)] for i, date in enumerate(dates, start=1)],
+        columns=COLUMNS)
+
+
+@pytest.fixture
+def opened(monkeypatch) -> list:
+    """
+    The names of the partitions read from disk.
+    """
+    names = []
+    read = CsvStorage.read
+
+    def record(self, *args):
+        names.append(self.name)
+        return read(self, *args)
+
+    monkeypatch.setattr(CsvStorage, "read", record)
+    return names
+
+
+@pytest.mark.parametrize("granularity, start, end, expected", [
+    ("month", "2026-08-15", "2026-09-15", ["data_transaksi_2026-08", "data_transaksi_2026-09"]),
+    ("month", "2026-10-01", None, ["data_transaksi_2026-10"]),
+    ("day", "2026-09-01", "2026-09-02", ["data_transaksi_2026-09-01"]),
+    ("day", None, "2026-08-11", ["data_transaksi_2026-08-10"]),
+])
+def test_read_range_opens_only_overlapping_partitions(data_dir, opened, granularity, start, end, expected):
+    storage = PartitionedStorage(
+        str(data_dir), "data_transaksi", TRANSACTION_SCHEMA, granularity=granularity)
+    storage.append(orders(
+        "2026-08-10 09:00", "2026-08-20 09:00", "2026-09-01 09:00",
+        "2026-09-02 09:00", "2026-10-05 09:00"))
+    opened.clear()
+
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    data = storage.read_range(start=start, end=end)
+    assert opened == expected
+    tanggal = pd.to_datetime(data["Tanggal"], format="%d-%m-%Y %H:%M:%S")
+    # Partitions are whole, so rows outside the range may come along, but
+    # every row in it does.
+    assert ((start is None or tanggal.max() >= start)
+            and (end is None or tanggal.min() < end))
+
+
+def test_legacy_table_is_split_once_under_the_exclusive_lock(data_dir, monkeypatch):
+    CsvStorage(str(data_dir), "data_transaksi", TRANSACTION_SCHEMA).write(orders(
+        "2026-08-10 09:00", "2026-09-01 09:00", "2026-09-02 09:00"))
+    storage = PartitionedStorage(str(data_dir), "data_transaksi", TRANSACTION_SCHEMA)
+    other = PartitionedStorage(str(data_dir), "data_transaksi", TRANSACTION_SCHEMA)
+    lock_path = os.path.join(str(data_dir), "data_transaksi.lock")
+
+    read = CsvStorage.read
+
+    def read_locked(self, *args):
+        if self.name == "data_transaksi":
+            assert FileLock._held[lock_path]["exclusive"]
+        return read(self, *args)
+
+    exclusive = FileLock.exclusive
+    waited = []
+
+    def exclusive_after_other(self):
+        # Another terminal splits the table while this one waits for the lock.
+        if not waited:
+            waited.append(True)
+            other._split_legacy()
+        return exclusive(self)
+
+    monkeypatch.setattr(CsvStorage, "read", read_locked)
+    monkeypatch.setattr(FileLock, "exclusive", exclusive_after_other)
+    assert storage.periods() == ["2026-08", "2026-09"]
+
+    assert not (data_dir / "data_transaksi.csv").exists()
+    assert len(storage.read()) == 3
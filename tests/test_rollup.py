@@ -0,0 +1,43 @@
+import pandas as pd
+from modulekasir import rollup
+from modulekasir.db_controller import Controller
+from modulekasir.rollup import Rollup
+from modulekasir.schema import TRANSACTION_SCHEMA
+
+
+def make_orders() -> int:
+    lines = []
+    for i, day in enumerate(pd.date_range("2026-07-28", "2026-10-03", freq="37h")):
+        menu = ["Soto", "Sate", "Es Teh"][i % 3]
+        lines.append([i + 1, menu, 5000, i % 4 + 1, 5000 * (i % 4 + 1), day])
+    Controller("data_transaksi").add_data(lines, list(TRANSACTION_SCHEMA))
+    # A cached log is summarized in this process, so read it from the files.
+    Controller._cache.clear()
+    return sum(line[3] for line in lines)
+
+
+def test_parallel_summary_equals_serial(data_dir, monkeypatch):
+    monkeypatch.setattr(rollup, "PARALLEL_BYTES", 0)
+    monkeypatch.setattr(Rollup, "_pools", {})
+    sold = make_orders()
+    assert len(Controller("data_transaksi").split_range()) == 4
+
+    serial = Rollup().summarize(workers=1)
+    assert Rollup._pools == {}
+    parallel = Rollup().summarize(workers=2)
+    pool = Rollup._pools[2]
+    # The processes are kept for the next call.
+    again = Rollup().summarize(workers=2)
+    assert Rollup._pools[2] is pool
+
+    for result in (parallel, again):
+        for expected, actual in zip(serial, result):
+            pd.testing.assert_frame_equal(actual, expected)
+    assert serial[1]["Jumlah"].sum() == sold
+
+
+def test_small_log_is_summarized_in_this_process(data_dir, monkeypatch):
+    monkeypatch.setattr(Rollup, "_pools", {})
+    make_orders()
+    Rollup().summarize(workers=2)
+    assert Rollup._pools == {}
@@ -0,0 +1,68 @@
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.schema import MENU_SCHEMA
+from modulekasir.search import MenuSearch, edit_distance
+
+MENU = [
+    "Soto Ayam", "Soto Babat", "Nasi Goreng", "Nasi Goreng Seafood",
+    "Es Teh", "Es Teh Manis", "Mie Ayam", "Ayam Bakar", "Teh Tarik",
+]
+
+
+@pytest.fixture
+def search(data_dir):
+    Controller("data_menu").add_data(
+        [[name, "Makanan", 10000, 10] for name in MENU], list(MENU_SCHEMA))
+    return MenuSearch()
+
+
+@pytest.mark.parametrize("query, expected", [
+    # The start of the name, the exact name first, in any case.
+    ("soto", ["Soto Ayam", "Soto Babat"]),
+    ("ES TEH", ["Es Teh", "Es Teh Manis"]),
+    # Then names in which a later word starts with the query.
+    ("ayam", ["Ayam Bakar", "Mie Ayam", "Soto Ayam"]),
+    ("teh", ["Teh Tarik", "Es Teh", "Es Teh Manis"]),
+    # Then names with every word, in any order, shortest first.
+    ("goreng nasi", ["Nasi Goreng", "Nasi Goreng Seafood"]),
+    ("ayam s", ["Soto Ayam"]),
+])
+def test_prefix_matches(search, query, expected):
+    assert search.search(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    # A long word within two typos, found through its trigrams.
+    ("nasi goremg", ["Nasi Goreng", "Nasi Goreng Seafood"]),
+    ("seafod", ["Nasi Goreng Seafood"]),
+    # A short word whose only typo breaks every trigram.
+    ("es the", ["Es Teh", "Es Teh Manis"]),
+    # Too far from every word.
+    ("rawon", []),
+])
+def test_typos_are_corrected(search, query, expected):
+    assert search.search(query) == expected
+
+
+def test_edit_distance():
+    assert edit_distance("teh", "teh", 1) == 0
+    assert edit_distance("the", "teh", 1) == 1
+    assert edit_distance("goremg", "goreng", 2) == 1
+    assert edit_distance("soto", "sate", 2) == 2
+    # Stops once the distance is over the limit.
+    assert edit_distance("bakso", "rawon", 1) == 2
+    assert edit_distance("es", "seafood", 2) == 3
+
+
+def test_hint(search):
+    assert search.hint("sotto") == " Mungkin maksud Anda: Soto Ayam, Soto Babat?"
+    assert search.hint("rawon") == ""
+
+
+def test_index_follows_menu_changes(search):
+    menu = Controller("data_menu")
+    search.search("soto")
+    menu.add_data(["Soto Betawi", "Makanan", 18000, 5], list(MENU_SCHEMA))
+    menu.delete_key("Soto Ayam")
+    assert search.search("soto") == ["Soto Babat", "Soto Betawi"]
+    assert MenuSearch().search("ayam") == ["Ayam Bakar", "Mie Ayam"]
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.schema import MENU_SCHEMA
+from modulekasir.server import Server
+from modulekasir.transaction import Transaction
+
+
+@pytest.fixture
+def server(data_dir):
+    Controller("data_menu").add_data([
+        ["Soto", "Makanan", 15000, 10],
+        ["Es Teh", "Minuman", 5000, 10],
+    ], list(MENU_SCHEMA))
+    return Server()
+
+
+def post_orders(server: Server, *bodies) -> list:
+    """
+    Send the orders at once, as concurrent clients would, and return the
+    status and payload of each.
+    """
+    async def run():
+        server._writes = asyncio.Queue()
+        writer = asyncio.create_task(server._writer())
+        try:
+            return await asyncio.gather(*(
+                server._dispatch("POST", "/orders", json.dumps(body).encode())
+                for body in bodies))
+        finally:
+            writer.cancel()
+    return asyncio.run(run())
+
+
+def test_order_is_created(server):
+    [(status, payload)] = post_orders(server, {
+        "items": [{"menu": "Soto", "jumlah": 2}, {"menu": "Es Teh", "jumlah": 1}],
+        "bayar": 40000,
+    })
+    assert status == 201
+    assert payload["No. Pembelian"] == 1
+    assert payload["total"] == 35000
+    assert payload["kembalian"] == 5000
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"items": "Soto"},
+    {"items": []},
+    {"items": [{"menu": "Soto"}]},
+    {"items": [{"menu": "Soto", "jumlah": 1.7}]},
+    {"items": [{"menu": "Soto", "jumlah": True}]},
+    {"items": [{"menu": "Soto", "jumlah": "2"}]},
+    {"items": [{"menu": "Soto", "jumlah": 0}]},
+    {"items": [{"menu": "Soto", "jumlah": 11}]},
+    {"items": [{"menu": "Rawon", "jumlah": 1}]},
+    {"items": [{"menu": "Soto", "jumlah": 1}], "bayar": None},
+    {"items": [{"menu": "Soto", "jumlah": 1}], "bayar": 15000.5},
+    {"items": [{"menu": "Soto", "jumlah": 1}], "bayar": 10000},
+])
+def test_invalid_order_is_rejected(server, body):
+    [(status, payload)] = post_orders(server, body)
+    assert status == 400
+    assert payload["error"]
+
+    # Nothing is saved and no order number is used up.
+    [(status, payload)] = post_orders(server, {"items": [{"menu": "Soto", "jumlah": 1}]})
+    assert (status, payload["No. Pembelian"]) == (201, 1)
+
+
+def test_concurrent_orders_are_saved_together(server, monkeypatch):
+    batches = []
+    place_orders = Transaction.place_orders
+
+    def record(self, orders, payments=None):
+        batches.append(len(orders))
+        return place_orders(self, orders, payments)
+
+    monkeypatch.setattr(Transaction, "place_orders", record)
+    results = post_orders(server, *(
+        {"items": [{"menu": "Soto", "jumlah": 3}]} for _ in range(4)))
+
+    # The fourth order finds the stock taken by the three before it.
+    assert [status for status, _ in results] == [201, 201, 201, 400]
+    assert [payload["No. Pembelian"] for _, payload in results[:3]] == [1, 2, 3]
+    assert batches == [4]
+    Controller._cache.clear()
+    assert Controller("data_menu").read_data()["Stok"].tolist() == [1, 10]
@@ -0,0 +1,94 @@
+import sqlite3
+import pandas as pd
+import pytest
+from modulekasir import db_controller
+from modulekasir.db_controller import Controller
+from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+from modulekasir.storage import SqliteStorage
+
+TANGGAL = "01-10-2026 12:00:00"
+
+
+@pytest.fixture
+def sqlite_dir(data_dir, monkeypatch):
+    monkeypatch.setenv("KASIR_STORAGE", "sqlite")
+    monkeypatch.setattr(db_controller, "COMPACT_RATIO", float("inf"))
+    return data_dir
+
+
+def make_orders(count: int) -> Controller:
+    transaksi = Controller("data_transaksi", partition="none")
+    transaksi.add_data(
+        [[i, "Soto", 15000, i, 15000 * i, TANGGAL] for i in range(1, count + 1)],
+        list(TRANSACTION_SCHEMA))
+    return transaksi
+
+
+def rowids(data_dir, table: str) -> list:
+    with sqlite3.connect(data_dir / "kasir.db") as connection:
+        return connection.execute(
+            f'SELECT rowid, "No. Pembelian" FROM "{table}" ORDER BY rowid').fetchall()
+
+
+def numbers(controller: Controller, column: str = "No. Pembelian") -> list:
+    Controller._cache.clear()
+    return controller.read_data()[column].tolist()
+
+
+def test_delete_renumbers_the_rows_after_it(sqlite_dir):
+    transaksi = make_orders(5)
+    transaksi.delete_data(1)
+    assert rowids(sqlite_dir, "data_transaksi") == [(1, 1), (2, 3), (3, 4), (4, 5)]
+
+    # Row 2 is now order 4, and an update by position finds it.
+    transaksi.update_data(2, 40, "No. Pembelian")
+    assert numbers(transaksi) == [1, 3, 40, 5]
+
+
+def test_rows_written_with_gaps_are_renumbered(sqlite_dir):
+    transaksi = make_orders(4)
+    # A table left with gaps by a version that didn't keep rowids in order.
+    with sqlite3.connect(sqlite_dir / "kasir.db") as connection:
+        connection.execute('DELETE FROM "data_transaksi" WHERE rowid = 2')
+    SqliteStorage._numbered.clear()
+    Controller._cache.clear()
+
+    transaksi.update_data(1, 30, "No. Pembelian")
+    assert rowids(sqlite_dir, "data_transaksi") == [(1, 1), (2, 30), (3, 4)]
+    assert numbers(transaksi) == [1, 30, 4]
+
+
+def test_versions_invalidate_only_the_changed_table(sqlite_dir):
+    menu = Controller("data_menu")
+    menu.add_data([["Soto", "Makanan", 15000, 10]], list(MENU_SCHEMA))
+    transaksi = make_orders(2)
+    menu.read_data()
+    transaksi.read_data()
+    before = Controller.cache_info()
+
+    # Another terminal appends to data_transaksi behind this process's cache.
+    SqliteStorage(str(sqlite_dir), "data_transaksi", TRANSACTION_SCHEMA).append(
+        pd.DataFrame([[3, "Soto", 15000, 1, 15000, TANGGAL]], columns=list(TRANSACTION_SCHEMA)))
+
+    assert transaksi.read_data()["No. Pembelian"].tolist() == [1, 2, 3]
+    menu.read_data()
+    after = Controller.cache_info()
+    assert after["data_transaksi"]["misses"] == before["data_transaksi"]["misses"] + 1
+    assert after["data_menu"]["misses"] == before["data_menu"]["misses"]
+    assert "_versions" not in SqliteStorage(str(sqlite_dir), "data_menu").list_tables()
+
+
+def test_update_many_and_adjust_many(sqlite_dir):
+    transaksi = make_orders(4)
+    transaksi.update_many({0: 10, 3: 40}, "No. Pembelian")
+    assert numbers(transaksi) == [10, 2, 3, 40]
+
+    menu = Controller("data_menu")
+    menu.add_data([
+        ["Soto", "Makanan", 15000, 10],
+        ["Sate", "Makanan", 20000, 10],
+        ["Es Teh", "Minuman", 5000, 10],
+    ], list(MENU_SCHEMA))
+    menu.adjust_many({"Soto": -3, "Es Teh": 5, "Rawon": 1}, "Stok", "Nama Menu")
+    menu.adjust_many({"Soto": -2}, "Stok", "Nama Menu")
+    assert numbers(menu, "Stok") == [5, 10, 15]
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA, apply_schema
+from modulekasir.transaction import Transaction
+
+
+def test_totals_above_int32_are_saved_exactly(data_dir):
+    Controller("data_menu").add_data([["Soto", "Makanan", 15000, 300000]], list(MENU_SCHEMA))
+    saved = Transaction().place_order([("Soto", 200000)])
+    assert saved["Total"].tolist() == [3_000_000_000]
+
+    Controller._cache.clear()
+    transaksi = Controller("data_transaksi").read_data()
+    assert transaksi["Total"].tolist() == [3_000_000_000]
+    assert Controller("data_menu").read_data()["Stok"].tolist() == [100000]
+
+
+def test_out_of_range_cast_raises():
+    lines = pd.DataFrame(
+        [[1, "Soto", 15000, 2**31, 15000 * 2**31, "01-10-2026 12:00:00"]],
+        columns=list(TRANSACTION_SCHEMA))
+    with pytest.raises(ValueError):
+        apply_schema(lines, TRANSACTION_SCHEMA)
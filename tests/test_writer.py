@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from modulekasir.db_controller import Controller
+from modulekasir.schema import MENU_SCHEMA, TRANSACTION_SCHEMA
+from modulekasir.writer import WriteQueue
+
+TANGGAL = "01-10-2026 12:00:00"
+
+
+@pytest.fixture
+def writer(data_dir, monkeypatch):
+    """
+    The single writer process, run on a thread, with every Controller of
+    the test in queue mode.
+    """
+    Controller("data_menu", writer="direct").add_data([
+        ["Soto", "Makanan", 15000, 100],
+        ["Sate", "Makanan", 20000, 100],
+    ], list(MENU_SCHEMA))
+    monkeypatch.setenv("KASIR_WRITER", "queue")
+    queue = WriteQueue(str(data_dir))
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            if not queue.process_pending():
+                stop.wait(0.002)
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    yield queue
+    stop.set()
+    thread.join()
+
+
+def sell(terminal: int) -> None:
+    menu = Controller("data_menu")
+    transaksi = Controller("data_transaksi")
+    for i in range(10):
+        menu.adjust_many({"Soto": -1, "Sate": -2}, "Stok", "Nama Menu")
+        transaksi.add_data(
+            [terminal * 100 + i, "Soto", 15000, 1, 15000, TANGGAL], list(TRANSACTION_SCHEMA))
+
+
+def test_queued_changes_are_all_applied(writer, data_dir):
+    with ThreadPoolExecutor(4) as terminals:
+        list(terminals.map(sell, range(4)))
+
+    assert not list((data_dir / "queue").iterdir())
+    Controller._cache.clear()
+    menu = Controller("data_menu").read_data()
+    assert dict(zip(menu["Nama Menu"].astype(str), menu["Stok"])) == {"Soto": 60, "Sate": 20}
+    transaksi = Controller("data_transaksi").read_data()
+    assert sorted(transaksi["No. Pembelian"]) == [t * 100 + i for t in range(4) for i in range(10)]
+
+
+def test_failed_change_is_reported(writer):
+    with pytest.raises(RuntimeError, match="tidak ditemukan"):
+        Controller("data_menu").update_key("Rawon", ["Rawon", "Makanan", 1, 1])